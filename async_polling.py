@@ -0,0 +1,259 @@
+import asyncio
+import logging
+import sys
+import time
+from typing import AsyncIterator, Iterable, List, Mapping, Tuple
+
+import aiohttp
+
+import homework
+import json_decoding
+import metrics
+import tracing
+from checkpoints import CheckpointStore, open_checkpoint_store
+from circuit_breaker import CircuitBreaker
+from commands import BOT_COMMANDS, CommandListener
+from deadlines import API_CONNECT_TIMEOUT, API_READ_TIMEOUT, Deadline, exceeded
+from error_aggregator import ErrorAggregator, operator_notifier
+from exceptions import NoNewStatuses, RequestToAPIError
+from log_config import setup_logging
+from notification_cache import NotificationCache
+from rate_limit import TokenBucket
+from response_cache import ResponseCache
+from scheduler import API_REQUESTS_PER_SECOND, AdaptiveScheduler
+from send_queue import OutboundQueue
+from settings import getenv
+from subscribers import Subscriber, load_subscribers
+
+CONCURRENCY = int(getenv("ASYNC_CONCURRENCY", 200))
+
+logger = logging.getLogger(__name__)
+
+
+async def _get(
+    session: aiohttp.ClientSession,
+    headers: dict,
+    timestamp: int,
+    breaker: CircuitBreaker,
+    timeout: aiohttp.ClientTimeout,
+) -> Tuple[int, Mapping[str, str], bytes]:
+    """Отправляет запрос и читает тело ответа целиком."""
+    probe = breaker.before_call() if breaker is not None else False
+    try:
+        response = await session.get(
+            homework.ENDPOINT,
+            headers=headers,
+            params={"from_date": timestamp},
+            timeout=timeout,
+        )
+    except BaseException:
+        # отмена задачи тоже должна освободить пробный запрос
+        if breaker is not None:
+            breaker.record(False, probe)
+        raise
+    if breaker is not None:
+        breaker.record(response.status < 500, probe)
+    async with response:
+        return response.status, response.headers, await response.read()
+
+
+async def async_get_api_answer(
+    session: aiohttp.ClientSession,
+    headers: dict,
+    timestamp: int,
+    cache: ResponseCache = None,
+    cache_key: str = "",
+    breaker: CircuitBreaker = None,
+    deadline: Deadline = None,
+) -> dict:
+    """Асинхронно получает данные с удалённого сервера.
+
+    Кэш ответов, автомат защиты и срок deadline работают так же, как в
+    fetch_api_answer; запрос, не уложившийся в срок, отменяется вместе с
+    чтением тела ответа.
+    """
+    started = time.perf_counter()
+    try:
+        if deadline is not None:
+            deadline.check()
+        logger.debug(
+            'Отправляем запрос к API. Эндпоинт: %s. '
+            'Параметры: ["from_date": %s]',
+            homework.ENDPOINT,
+            timestamp,
+        )
+        if cache is not None:
+            headers = cache.conditional_headers(cache_key, headers)
+        connect, read = (
+            (API_CONNECT_TIMEOUT, API_READ_TIMEOUT)
+            if deadline is None else deadline.timeout()
+        )
+        status, response_headers, body = await asyncio.wait_for(
+            _get(
+                session, headers, timestamp, breaker,
+                aiohttp.ClientTimeout(sock_connect=connect, sock_read=read),
+            ),
+            None if deadline is None else deadline.remaining(),
+        )
+        if cache is not None and cache.unchanged(
+            cache_key, status, response_headers, body
+        ):
+            raise NoNewStatuses
+        homework.check_status_code(status)
+        return json_decoding.loads(body)
+    except asyncio.TimeoutError:
+        # ServerTimeoutError aiohttp — тоже asyncio.TimeoutError
+        if deadline is None:
+            raise exceeded("api")
+        raise deadline.exceeded()
+    except aiohttp.ClientError:
+        raise RequestToAPIError
+    finally:
+        metrics.API_LATENCY.observe(time.perf_counter() - started)
+
+
+async def async_check_response(
+    response: dict,
+) -> List[homework.HomeworkRecord]:
+    """Проверяет ответ сервера так же, как check_response."""
+    return homework.check_response(response)
+
+
+async def async_parse_status(homework_data: dict) -> str:
+    """Готовит сообщение о статусе так же, как parse_status."""
+    return homework.parse_status(homework_data)
+
+
+async def async_iter_status_messages(
+    homeworks: Iterable[homework.HomeworkRecord],
+    cache: NotificationCache = None,
+    subscriber_key: str = "",
+) -> AsyncIterator[str]:
+    """Готовит сообщения по всем домашкам так же, как iter_status_messages."""
+    for message in homework.iter_status_messages(
+        homeworks, cache, subscriber_key
+    ):
+        yield message
+
+
+async def async_send_message(bot: object, chat_id: str, message: str) -> None:
+    """Отправляет сообщение в Telegram, не блокируя цикл событий."""
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(
+        None, homework.deliver_message, bot, chat_id, message
+    )
+
+
+async def poll_subscriber(
+    session: aiohttp.ClientSession,
+    subscriber: Subscriber,
+    semaphore: asyncio.Semaphore,
+    budget: TokenBucket,
+    polling: homework.PollingContext,
+    breaker: CircuitBreaker = None,
+) -> None:
+    """Бесконечно опрашивает API для одного подписчика.
+
+    Срок цикла отсчитывается после ожидания в лимите запросов и включает
+    ожидание свободного места под семафором.
+    """
+    timestamp = polling.store.load(subscriber.key, int(time.time()))
+    while True:
+        try:
+            await budget.acquire_async()
+            deadline = Deadline()
+            async with semaphore:
+                api_answer = await async_get_api_answer(
+                    session,
+                    subscriber.headers,
+                    timestamp,
+                    polling.responses,
+                    subscriber.key,
+                    breaker,
+                    deadline,
+                )
+            timestamp = polling.record_homeworks(
+                subscriber,
+                await async_check_response(api_answer),
+                api_answer.get("current_date"),
+            )
+        except NoNewStatuses:
+            polling.record_no_new_statuses(subscriber)
+        except Exception as error:
+            polling.record_error(subscriber, error)
+        polling.errors.flush()
+        await asyncio.sleep(polling.scheduler.next_delay(subscriber.key))
+
+
+async def run_subscriptions(
+    bot: object,
+    subscribers: Iterable[Subscriber],
+    store: CheckpointStore,
+    concurrency: int = CONCURRENCY,
+    commands: bool = BOT_COMMANDS,
+) -> None:
+    """Опрашивает API для всех подписчиков с ограничением параллельности.
+
+    С BOT_COMMANDS в отдельном потоке запускается обработчик команд бота.
+    """
+    subscribers = list(subscribers)
+    semaphore = asyncio.Semaphore(concurrency)
+    budget = TokenBucket(API_REQUESTS_PER_SECOND)
+    breaker = CircuitBreaker()
+    outbox = OutboundQueue(bot)
+    outbox.start()
+    polling = homework.PollingContext(
+        outbox.put,
+        store,
+        AdaptiveScheduler(homework.RETRY_PERIOD),
+        ErrorAggregator(operator_notifier(outbox)),
+    )
+    listener = None
+    if commands:
+        listener = CommandListener(
+            bot,
+            polling.board,
+            outbox.put,
+            [subscriber.chat_id for subscriber in subscribers],
+            homework.RENDERER,
+        )
+        listener.start()
+    connector = aiohttp.TCPConnector(limit=concurrency, ttl_dns_cache=300)
+    try:
+        async with aiohttp.ClientSession(connector=connector) as session:
+            await asyncio.gather(*(
+                poll_subscriber(
+                    session, subscriber, semaphore, budget, polling, breaker
+                )
+                for subscriber in subscribers
+            ))
+    finally:
+        if listener is not None:
+            listener.stop()
+        polling.errors.flush(force=True)
+        outbox.stop()
+
+
+def main() -> None:
+    """Запускает асинхронный опрос API для всех подписчиков."""
+    subscribers = load_subscribers()
+    if not homework.TELEGRAM_TOKEN or not subscribers:
+        logger.critical(
+            "Не заданы токен бота или подписчики. "
+            "Нет смысла продолжать работу дальше."
+        )
+        sys.exit()
+    metrics.maybe_start_metrics_server()
+    tracing.install_signal_handler()
+    bot = homework.build_bot()
+    store = open_checkpoint_store()
+    try:
+        asyncio.run(run_subscriptions(bot, subscribers, store))
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    homework.init()
+    setup_logging()
+    main()
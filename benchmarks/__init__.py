@@ -0,0 +1 @@
+"""Офлайн-бенчмарки цикла опроса API."""
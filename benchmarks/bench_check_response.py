@@ -0,0 +1,161 @@
+import argparse
+import time
+from typing import Callable, Iterable, Iterator, List
+
+import homework
+from benchmarks.common import write_results
+from exceptions import (
+    MissingHomeworkName,
+    MissingHomeworkStatus,
+    NoNewStatuses,
+    RequiredKeysAreMissing,
+    UnknownHomeworkStatus,
+)
+from mock_api import STATUS_CYCLE
+from notification_cache import NotificationCache
+
+HOMEWORK_COUNTS = (10, 1_000, 100_000)
+REPEATS = 5
+
+
+def legacy_check_response(response: dict) -> None:
+    """Прежняя проверка ответа: несколько обращений к ключам по очереди."""
+    if not isinstance(response, dict):
+        raise TypeError("Ответ пришёл не в виде словаря")
+    if not isinstance(response.get("homeworks"), list):
+        raise TypeError(
+            'В ответе API домашки под ключом "homeworks" '
+            "данные приходят не в виде списка"
+        )
+    if "homeworks" not in response or "current_date" not in response:
+        raise RequiredKeysAreMissing
+    if len(response.get("homeworks")) == 0:
+        raise NoNewStatuses
+
+
+def legacy_parse_status(homework_data: dict) -> str:
+    """Прежний разбор домашки: проверка и поиск вердикта по словарю."""
+    if "homework_name" not in homework_data:
+        raise MissingHomeworkName
+    if "status" not in homework_data:
+        raise MissingHomeworkStatus
+    if homework_data.get("status") not in homework.HOMEWORK_VERDICTS:
+        raise UnknownHomeworkStatus
+    homework_name = homework_data.get("homework_name")
+    verdict = homework.HOMEWORK_VERDICTS.get(homework_data.get("status"))
+    return f'Изменился статус проверки работы "{homework_name}". {verdict}'
+
+
+def legacy_iter_status_messages(
+    homeworks: List[dict], cache: NotificationCache
+) -> Iterator[str]:
+    """Прежний генератор сообщений: разбор до проверки кэша."""
+    for homework_data in reversed(homeworks):
+        message = legacy_parse_status(homework_data)
+        key = (
+            "",
+            homework_data.get("id", homework_data.get("homework_name")),
+            homework_data.get("status"),
+            homework_data.get("date_updated"),
+        )
+        if cache.seen(key):
+            continue
+        yield message
+
+
+def legacy_path(response: dict, cache: NotificationCache) -> List[str]:
+    """Проверяет ответ и готовит сообщения так, как это делалось раньше."""
+    legacy_check_response(response)
+    return list(legacy_iter_status_messages(response.get("homeworks"), cache))
+
+
+def records_path(response: dict, cache: NotificationCache) -> List[str]:
+    """Проверяет ответ за один проход и готовит сообщения из записей."""
+    return list(homework.record_messages(
+        homework.check_response(response), cache
+    ))
+
+
+def make_response(count: int) -> dict:
+    """Собирает ответ API с count домашками."""
+    return {
+        "homeworks": [
+            {
+                "id": index,
+                "status": STATUS_CYCLE[index % len(STATUS_CYCLE)],
+                "homework_name": f"student__hw{index}.zip",
+                "reviewer_comment": "",
+                "date_updated": "2020-02-13T14:40:57Z",
+                "lesson_name": "Итоговый проект",
+            }
+            for index in range(count)
+        ],
+        "current_date": 1581604970,
+    }
+
+
+def best_time(
+    path: Callable[[dict, NotificationCache], List[str]],
+    response: dict,
+    repeats: int,
+    warm: bool,
+) -> float:
+    """Возвращает лучшее время из нескольких прогонов.
+
+    С warm=True кэш уведомлений заранее заполнен, как при повторном опросе
+    тех же домашек; иначе каждое сообщение новое.
+    """
+    timings = []
+    for _ in range(repeats):
+        cache = NotificationCache(maxsize=len(response["homeworks"]))
+        if warm:
+            path(response, cache)
+        started = time.perf_counter()
+        path(response, cache)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def run_benchmark(
+    counts: Iterable[int] = HOMEWORK_COUNTS, repeats: int = REPEATS
+) -> List[dict]:
+    """Сравнивает прежнюю и однопроходную проверку ответа."""
+    results = []
+    for count in counts:
+        response = make_response(count)
+        assert legacy_path(response, NotificationCache()) == records_path(
+            response, NotificationCache()
+        )
+        for warm in (False, True):
+            legacy = best_time(legacy_path, response, repeats, warm)
+            records = best_time(records_path, response, repeats, warm)
+            results.append({
+                "homeworks": count,
+                "cache": "warm" if warm else "cold",
+                "legacy_ms": legacy * 1000,
+                "records_ms": records * 1000,
+                "speedup": legacy / records if records else 0.0,
+            })
+    return results
+
+
+def main() -> None:
+    """Разбирает аргументы и печатает результаты в JSON."""
+    parser = argparse.ArgumentParser(
+        description="Бенчмарк проверки ответа API и разбора домашек."
+    )
+    parser.add_argument(
+        "--homeworks", type=int, nargs="+", default=HOMEWORK_COUNTS
+    )
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--output", help="куда сохранить JSON с результатами")
+    args = parser.parse_args()
+    write_results(
+        "check_response",
+        run_benchmark(args.homeworks, args.repeats),
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
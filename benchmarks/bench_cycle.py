@@ -0,0 +1,135 @@
+import argparse
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List
+
+import homework
+from benchmarks.common import summarize_latencies, write_results
+from http_client import build_session
+from mock_api import MockPracticumAPI
+from rate_limit import TokenBucket
+from send_queue import OutboundQueue
+from subscribers import Subscriber
+from threaded_polling import ThreadedPoller
+
+SUBSCRIBER_COUNTS = (1, 100, 10_000)
+WORKERS = 16
+UNLIMITED = 1e9
+
+
+class FakeBot:
+    """Бот, который только считает отправленные сообщения."""
+
+    def __init__(self) -> None:
+        """Создаёт бота без сообщений."""
+        self.sent = 0
+
+    def send_message(self, chat_id: str, text: str, **kwargs) -> None:
+        """Засчитывает сообщение, никуда его не отправляя."""
+        self.sent += 1
+
+
+def run_cycle(session: object, bot: object, subscriber: Subscriber) -> float:
+    """Проходит цикл опрос-проверка-разбор-отправка и возвращает время."""
+    started = time.perf_counter()
+    api_answer = homework.fetch_api_answer(session, subscriber.headers, 0)
+    homeworks = homework.check_response(api_answer)
+    for message in homework.iter_status_messages(homeworks):
+        homework.deliver_message(bot, subscriber.chat_id, message)
+    return time.perf_counter() - started
+
+
+def measure_throughput(subscribers: List[Subscriber], workers: int) -> dict:
+    """Прогоняет по циклу на подписчика и считает скорость и задержки."""
+    session = build_session(pool_maxsize=workers)
+    bot = FakeBot()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        started = time.perf_counter()
+        latencies = list(pool.map(
+            lambda subscriber: run_cycle(session, bot, subscriber),
+            subscribers,
+        ))
+        elapsed = time.perf_counter() - started
+    result = {
+        "cycles": len(latencies),
+        "cycles_per_sec": len(latencies) / elapsed,
+    }
+    result.update(summarize_latencies(latencies))
+    return result
+
+
+def measure_memory(subscribers: List[Subscriber], workers: int) -> float:
+    """Считает память, которую раннер держит на одного подписчика."""
+    bot = FakeBot()
+    outbox = OutboundQueue(
+        bot, global_rate=UNLIMITED, chat_rate=UNLIMITED, coalesce_window=0
+    )
+    outbox.start()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    poller = ThreadedPoller(
+        bot, subscribers, workers=workers,
+        budget=TokenBucket(UNLIMITED), outbox=outbox,
+    )
+    poller.run_round()
+    outbox.stop()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    poller.shutdown()
+    return used / len(subscribers)
+
+
+def run_benchmark(
+    counts: Iterable[int] = SUBSCRIBER_COUNTS,
+    workers: int = WORKERS,
+    api: MockPracticumAPI = None,
+) -> List[dict]:
+    """Запускает бенчмарк для каждого числа подписчиков."""
+    api = (api or MockPracticumAPI(homeworks_per_token=1)).start()
+    endpoint = homework.ENDPOINT
+    homework.ENDPOINT = api.endpoint
+    results = []
+    try:
+        for count in counts:
+            subscribers = [
+                Subscriber(f"token{index}", str(index))
+                for index in range(count)
+            ]
+            result = {"subscribers": count, "workers": workers}
+            result.update(measure_throughput(subscribers, workers))
+            result["memory_per_subscriber_bytes"] = measure_memory(
+                subscribers, workers
+            )
+            results.append(result)
+    finally:
+        homework.ENDPOINT = endpoint
+        api.stop()
+    return results
+
+
+def main() -> None:
+    """Разбирает аргументы и печатает результаты в JSON."""
+    parser = argparse.ArgumentParser(
+        description="Бенчмарк цикла опрос-проверка-разбор-отправка."
+    )
+    parser.add_argument(
+        "--subscribers", type=int, nargs="+", default=SUBSCRIBER_COUNTS
+    )
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument(
+        "--latency", type=float, default=0.0,
+        help="задержка ответа заменителя API в секундах",
+    )
+    parser.add_argument("--output", help="куда сохранить JSON с результатами")
+    args = parser.parse_args()
+    api = MockPracticumAPI(homeworks_per_token=1, latency=args.latency)
+    write_results(
+        "cycle",
+        run_benchmark(args.subscribers, args.workers, api),
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
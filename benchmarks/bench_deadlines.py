@@ -0,0 +1,124 @@
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+import homework
+import metrics
+from benchmarks.common import summarize_latencies, write_results
+from deadlines import Deadline
+from exceptions import DeadlineExceeded
+from http_client import build_session
+from mock_api import MockPracticumAPI
+from subscribers import Subscriber
+
+CYCLES = 400
+WORKERS = 16
+TIMEOUT_RATE = 0.05
+TIMEOUT_DELAY = 2.0
+DEADLINE = 0.5
+SEED = 25
+
+
+def run_cycle(
+    session: object, subscriber: Subscriber, total: Optional[float]
+) -> float:
+    """Проходит цикл опроса со сроком total и возвращает его время."""
+    started = time.perf_counter()
+    try:
+        homework.check_response(homework.fetch_api_answer(
+            session,
+            subscriber.headers,
+            0,
+            deadline=None if total is None else Deadline(total),
+        ))
+    except DeadlineExceeded:
+        pass
+    return time.perf_counter() - started
+
+
+def measure(
+    total: Optional[float],
+    cycles: int,
+    workers: int,
+    timeout_rate: float,
+    timeout_delay: float,
+) -> dict:
+    """Гоняет циклы против заменителя API, который иногда зависает."""
+    api = MockPracticumAPI(
+        homeworks_per_token=1,
+        timeout_rate=timeout_rate,
+        timeout_delay=timeout_delay,
+        seed=SEED,
+    ).start()
+    endpoint = homework.ENDPOINT
+    homework.ENDPOINT = api.endpoint
+    session = build_session(pool_maxsize=workers)
+    subscribers = [
+        Subscriber(f"token{index}", str(index)) for index in range(cycles)
+    ]
+    exceeded = metrics.DEADLINE_EXCEEDED.value("api")
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            started = time.perf_counter()
+            latencies = list(pool.map(
+                lambda subscriber: run_cycle(session, subscriber, total),
+                subscribers,
+            ))
+            elapsed = time.perf_counter() - started
+    finally:
+        homework.ENDPOINT = endpoint
+        api.stop()
+    result = {
+        "deadline_s": total,
+        "cycles": cycles,
+        "hung": api.injected["timeout"],
+        "exceeded": metrics.DEADLINE_EXCEEDED.value("api") - exceeded,
+        "cycles_per_sec": cycles / elapsed,
+        "max_ms": max(latencies) * 1000,
+    }
+    result.update(summarize_latencies(latencies))
+    return result
+
+
+def run_benchmark(
+    deadline: float = DEADLINE,
+    cycles: int = CYCLES,
+    workers: int = WORKERS,
+    timeout_rate: float = TIMEOUT_RATE,
+    timeout_delay: float = TIMEOUT_DELAY,
+) -> List[dict]:
+    """Сравнивает хвост задержек без общего срока и со сроком deadline."""
+    return [
+        measure(total, cycles, workers, timeout_rate, timeout_delay)
+        for total in (None, deadline)
+    ]
+
+
+def main() -> None:
+    """Разбирает аргументы и печатает результаты в JSON."""
+    parser = argparse.ArgumentParser(
+        description="Бенчмарк хвоста задержек при зависаниях API."
+    )
+    parser.add_argument("--deadline", type=float, default=DEADLINE)
+    parser.add_argument("--cycles", type=int, default=CYCLES)
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--timeout-rate", type=float, default=TIMEOUT_RATE)
+    parser.add_argument("--timeout-delay", type=float, default=TIMEOUT_DELAY)
+    parser.add_argument("--output", help="куда сохранить JSON с результатами")
+    args = parser.parse_args()
+    write_results(
+        "deadlines",
+        run_benchmark(
+            args.deadline,
+            args.cycles,
+            args.workers,
+            args.timeout_rate,
+            args.timeout_delay,
+        ),
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
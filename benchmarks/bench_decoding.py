@@ -0,0 +1,93 @@
+import argparse
+import json
+import time
+import tracemalloc
+from typing import Callable, Iterable, List
+
+import json_decoding
+from benchmarks.common import write_results
+from mock_api import STATUS_CYCLE
+
+HOMEWORK_COUNTS = (100, 10_000, 100_000)
+COMMENT = "Хорошая работа, но есть пара замечаний по стилю кода. " * 4
+
+
+def make_body(count: int) -> bytes:
+    """Собирает тело ответа API с историей из count домашек."""
+    return json.dumps({
+        "homeworks": [
+            {
+                "id": index,
+                "status": STATUS_CYCLE[index % len(STATUS_CYCLE)],
+                "homework_name": f"student__hw{index}.zip",
+                "reviewer_comment": COMMENT,
+                "date_updated": "2020-02-13T14:40:57Z",
+                "lesson_name": "Итоговый проект",
+            }
+            for index in range(count)
+        ],
+        "current_date": 1581604970,
+    }, ensure_ascii=False).encode()
+
+
+def measure(decode: Callable[[], object]) -> dict:
+    """Меряет время и пик памяти одного разбора."""
+    started = time.perf_counter()
+    decode()
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    decode()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"ms": elapsed * 1000, "peak_bytes": peak}
+
+
+def run_benchmark(
+    counts: Iterable[int] = HOMEWORK_COUNTS,
+    chunk_size: int = json_decoding.STREAM_CHUNK_SIZE,
+) -> List[dict]:
+    """Сравнивает json, выбранный модуль и потоковый разбор."""
+    results = []
+    for count in counts:
+        body = make_body(count)
+        chunks = [
+            body[index:index + chunk_size]
+            for index in range(0, len(body), chunk_size)
+        ]
+        for name, decode in (
+            ("json", lambda: json.loads(body)),
+            (json_decoding.BACKEND, lambda: json_decoding.loads(body)),
+            ("streaming", lambda: json_decoding.extract_statuses(chunks)),
+        ):
+            result = {
+                "homeworks": count,
+                "body_bytes": len(body),
+                "decoder": name,
+            }
+            result.update(measure(decode))
+            results.append(result)
+    return results
+
+
+def main() -> None:
+    """Разбирает аргументы и печатает результаты в JSON."""
+    parser = argparse.ArgumentParser(
+        description="Бенчмарк разбора JSON-ответов API."
+    )
+    parser.add_argument(
+        "--homeworks", type=int, nargs="+", default=HOMEWORK_COUNTS
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=json_decoding.STREAM_CHUNK_SIZE
+    )
+    parser.add_argument("--output", help="куда сохранить JSON с результатами")
+    args = parser.parse_args()
+    write_results(
+        "decoding",
+        run_benchmark(args.homeworks, args.chunk_size),
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+from typing import Iterable, List, Tuple
+
+from benchmarks.common import write_results
+
+MODULES = (
+    "homework", "threaded_polling", "async_polling", "sharding", "bootstrap"
+)
+HEAVY_DEPENDENCIES = ("requests", "telegram", "dotenv", "aiohttp")
+REPEATS = 5
+TOP = 5
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_times(module: str) -> Tuple[List[Tuple[str, int, int]], float]:
+    """Импортирует модуль в новом процессе с -X importtime.
+
+    Возвращает строки отчёта (имя, глубину вложенности и накопленное время
+    в микросекундах) и время жизни процесса в секундах.
+    """
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    elapsed = time.perf_counter() - started
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), depth, int(cumulative)))
+    return rows, elapsed
+
+
+def measure(module: str, repeats: int = REPEATS) -> dict:
+    """Берёт лучший из repeats холодных импортов модуля."""
+    best = None
+    for _ in range(repeats):
+        rows, elapsed = import_times(module)
+        total = next(
+            cumulative for name, _, cumulative in reversed(rows)
+            if name == module
+        )
+        if best is None or total < best[1]:
+            best = rows, total, elapsed
+    rows, total, elapsed = best
+    # отчёт печатает зависимости перед модулем, поэтому его поддерево —
+    # строки после предыдущего импорта верхнего уровня
+    end = max(
+        index for index, (name, depth, _) in enumerate(rows)
+        if name == module and depth == 0
+    )
+    start = max(
+        (index + 1 for index, row in enumerate(rows[:end]) if row[1] == 0),
+        default=0,
+    )
+    subtree = rows[start:end]
+    names = {name for name, _, _ in subtree}
+    heaviest = sorted(
+        (row for row in subtree if row[1] == 1), key=lambda row: -row[2]
+    )[:TOP]
+    return {
+        "module": module,
+        "import_ms": total / 1000,
+        "process_ms": elapsed * 1000,
+        "heaviest": {name: us / 1000 for name, _, us in heaviest},
+        "loaded": [
+            dependency for dependency in HEAVY_DEPENDENCIES
+            if dependency in names
+        ],
+    }
+
+
+def run_benchmark(
+    modules: Iterable[str] = MODULES, repeats: int = REPEATS
+) -> List[dict]:
+    """Меряет время импорта каждого модуля в отдельном процессе."""
+    return [measure(module, repeats) for module in modules]
+
+
+def main() -> None:
+    """Разбирает аргументы и печатает результаты в JSON."""
+    parser = argparse.ArgumentParser(
+        description="Бенчмарк времени импорта точек входа."
+    )
+    parser.add_argument("--modules", nargs="+", default=MODULES)
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--output", help="куда сохранить JSON с результатами")
+    args = parser.parse_args()
+    write_results(
+        "import", run_benchmark(args.modules, args.repeats), args.output
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import argparse
+import time
+import tracemalloc
+from typing import Iterable, List
+
+import homework
+from benchmarks.common import write_results
+from mock_api import STATUS_CYCLE
+from state_index import HomeworkStateIndex
+
+HOMEWORK_COUNTS = (1_000, 100_000)
+HOMEWORKS_PER_SUBSCRIBER = 10
+
+
+def make_records(count: int, shift: int = 0) -> List[homework.HomeworkRecord]:
+    """Собирает записи домашек; shift сдвигает статусы по кругу."""
+    return [
+        homework.HomeworkRecord(
+            index,
+            f"student__hw{index}.zip",
+            STATUS_CYCLE[(index + shift) % len(STATUS_CYCLE)],
+            f"2020-02-13T14:{shift % 60:02d}:57Z",
+        )
+        for index in range(count)
+    ]
+
+
+def apply_all(
+    index: HomeworkStateIndex, records: List[homework.HomeworkRecord]
+) -> int:
+    """Накладывает записи по подписчикам и считает смены статусов."""
+    changed = 0
+    for start in range(0, len(records), HOMEWORKS_PER_SUBSCRIBER):
+        changed += len(index.apply(
+            f"subscriber{start}",
+            records[start:start + HOMEWORKS_PER_SUBSCRIBER],
+        ))
+    return changed
+
+
+def run_benchmark(counts: Iterable[int] = HOMEWORK_COUNTS) -> List[dict]:
+    """Меряет наполнение индекса, повторный и изменённый ответы."""
+    results = []
+    for count in counts:
+        initial, changed = make_records(count), make_records(count, 1)
+        tracemalloc.start()
+        index = HomeworkStateIndex()
+        apply_all(index, initial)
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        # замер времени без накладных расходов tracemalloc
+        index = HomeworkStateIndex()
+        started = time.perf_counter()
+        apply_all(index, initial)
+        fill = time.perf_counter() - started
+        started = time.perf_counter()
+        unchanged = apply_all(index, initial)
+        repeat = time.perf_counter() - started
+        started = time.perf_counter()
+        transitions = apply_all(index, changed)
+        diff = time.perf_counter() - started
+        results.append({
+            "homeworks": count,
+            "fill_ms": fill * 1000,
+            "repeat_ms": repeat * 1000,
+            "diff_ms": diff * 1000,
+            "repeat_transitions": unchanged,
+            "diff_transitions": transitions,
+            "index_bytes": size,
+            "bytes_per_homework": size / count,
+        })
+    return results
+
+
+def main() -> None:
+    """Разбирает аргументы и печатает результаты в JSON."""
+    parser = argparse.ArgumentParser(
+        description="Бенчмарк индекса состояний домашек."
+    )
+    parser.add_argument(
+        "--homeworks", type=int, nargs="+", default=HOMEWORK_COUNTS
+    )
+    parser.add_argument("--output", help="куда сохранить JSON с результатами")
+    args = parser.parse_args()
+    write_results("state_index", run_benchmark(args.homeworks), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+import json
+import platform
+import sys
+from typing import List, Optional, Sequence
+
+
+def percentile(values: Sequence[float], fraction: float) -> float:
+    """Возвращает перцентиль отсортированной выборки."""
+    if not values:
+        return 0.0
+    index = min(int(round(fraction * (len(values) - 1))), len(values) - 1)
+    return values[index]
+
+
+def summarize_latencies(latencies: List[float]) -> dict:
+    """Считает p50 и p99 задержек в миллисекундах."""
+    latencies = sorted(latencies)
+    return {
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+def write_results(
+    name: str, results: List[dict], output: Optional[str] = None
+) -> dict:
+    """Печатает результаты в JSON и при необходимости сохраняет их в файл."""
+    report = {
+        "benchmark": name,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if output:
+        with open(output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    sys.stdout.write(text + "\n")
+    return report
@@ -0,0 +1,167 @@
+import argparse
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterable, List, Tuple
+
+import homework
+from checkpoints import CheckpointStore, open_checkpoint_store
+from circuit_breaker import CircuitBreaker
+from exceptions import NoNewStatuses
+from http_client import build_session
+from log_config import setup_logging
+from rate_limit import TokenBucket
+from scheduler import API_REQUESTS_PER_SECOND
+from send_queue import MAX_MESSAGE_LENGTH, OutboundQueue
+from settings import getenv
+from subscribers import Subscriber, load_subscribers
+
+BOOTSTRAP_CONCURRENCY = int(getenv("BOOTSTRAP_CONCURRENCY", 16))
+DIGEST_TITLE = "История проверок ваших работ:"
+NO_HISTORY = "Проверенных работ пока нет. Бот сообщит о новых статусах."
+
+logger = logging.getLogger(__name__)
+
+
+def fetch_history(
+    session: object,
+    subscriber: Subscriber,
+    budget: TokenBucket,
+    breaker: CircuitBreaker,
+) -> Tuple[List[homework.HomeworkRecord], int]:
+    """Забирает всю историю подписчика с from_date=0.
+
+    Тело ответа разбирается потоково, так что в памяти остаются только
+    поля, нужные боту. Возвращает записи и current_date ответа.
+    """
+    budget.acquire()
+    answer = homework.fetch_api_answer(
+        session, subscriber.headers, 0, streaming=True, breaker=breaker
+    )
+    try:
+        records = homework.check_response(answer)
+    except NoNewStatuses:
+        records = []
+    return records, answer["current_date"]
+
+
+def digest(records: List[homework.HomeworkRecord]) -> str:
+    """Собирает одно сообщение со статусами всех работ, от старых к новым.
+
+    Строки готовит homework.RENDERER, поэтому язык, разметка и шаблоны
+    оператора те же, что у обычных уведомлений. Если строки не влезают в
+    одно сообщение Telegram, хвост заменяется припиской с числом
+    оставшихся работ.
+    """
+    if not records:
+        return NO_HISTORY
+    lines = [DIGEST_TITLE]
+    length = len(DIGEST_TITLE)
+    message_type = str
+    for shown, record in enumerate(reversed(records)):
+        line = homework.RENDERER.render(record.name, record.status)
+        message_type = type(line)
+        rest = f"…и ещё {len(records) - shown}"
+        if length + len(line) + len(rest) + 2 > MAX_MESSAGE_LENGTH:
+            lines.append(rest)
+            break
+        lines.append(line)
+        length += len(line) + 1
+    # тип строки несёт parse_mode разметки, он нужен и всей сводке
+    return message_type("\n".join(lines))
+
+
+def run_bootstrap(
+    subscribers: Iterable[Subscriber],
+    outbox: OutboundQueue,
+    store: CheckpointStore,
+    concurrency: int = BOOTSTRAP_CONCURRENCY,
+    session: object = None,
+) -> dict:
+    """Загружает историю подписчиков и шлёт каждому чату по сводке.
+
+    Запросы идут параллельно не более чем в concurrency потоков и в общем
+    лимите API; сводки уходят через очередь с лимитами Telegram. После
+    загрузки from_date подписчика сдвигается на current_date, поэтому
+    обычный опрос не повторяет историю.
+    """
+    session = session or build_session(pool_maxsize=concurrency)
+    budget = TokenBucket(API_REQUESTS_PER_SECOND)
+    breaker = CircuitBreaker()
+    stats = {"subscribers": 0, "homeworks": 0, "failed": 0}
+    started = time.monotonic()
+    with ThreadPoolExecutor(
+        max_workers=concurrency, thread_name_prefix="bootstrap"
+    ) as executor:
+        futures = {
+            executor.submit(
+                fetch_history, session, subscriber, budget, breaker
+            ): subscriber
+            for subscriber in subscribers
+        }
+        for future in as_completed(futures):
+            subscriber = futures[future]
+            try:
+                records, current_date = future.result()
+            except Exception as error:
+                stats["failed"] += 1
+                logger.error(
+                    "%s: %s", subscriber.key, homework.describe_error(error),
+                    extra={"subscriber": subscriber.key},
+                )
+                continue
+            outbox.put(subscriber.chat_id, digest(records))
+            store.save(subscriber.key, current_date)
+            stats["subscribers"] += 1
+            stats["homeworks"] += len(records)
+    store.flush()
+    stats["seconds"] = time.monotonic() - started
+    return stats
+
+
+def main() -> None:
+    """Загружает историю для подписчиков без сохранённого from_date."""
+    parser = argparse.ArgumentParser(
+        description="Загрузка истории проверок для новых подписчиков."
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=BOOTSTRAP_CONCURRENCY
+    )
+    parser.add_argument(
+        "--all", action="store_true",
+        help="загрузить историю и тем, у кого уже есть from_date",
+    )
+    args = parser.parse_args()
+    store = open_checkpoint_store()
+    if not store.persistent:
+        # from_date в памяти пропадёт при выходе, и история придёт снова
+        logger.critical(
+            "Загрузке истории нужно постоянное хранилище контрольных точек, "
+            "задайте CHECKPOINT_STORE=sqlite:<путь>."
+        )
+        sys.exit()
+    subscribers = [
+        subscriber for subscriber in load_subscribers()
+        if args.all or store.load(subscriber.key) is None
+    ]
+    if not homework.TELEGRAM_TOKEN or not subscribers:
+        logger.critical("Не заданы токен бота или новые подписчики.")
+        store.close()
+        sys.exit()
+    outbox = OutboundQueue(homework.build_bot(con_pool_size=args.concurrency))
+    outbox.start()
+    try:
+        stats = run_bootstrap(
+            subscribers, outbox, store, concurrency=args.concurrency
+        )
+    finally:
+        outbox.stop(timeout=None)
+        store.close()
+    logger.info("Загрузка истории завершена: %s", stats)
+
+
+if __name__ == "__main__":
+    homework.init()
+    setup_logging()
+    main()
@@ -0,0 +1,217 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+from settings import getenv
+
+CHECKPOINT_STORE = getenv("CHECKPOINT_STORE")
+FLUSH_INTERVAL = float(getenv("CHECKPOINT_FLUSH_INTERVAL", 30))
+
+
+class CheckpointStore:
+    """Хранит from_date подписчиков в памяти и пачками сбрасывает на диск.
+
+    Наследники переопределяют только _write, поэтому тысячи вызовов save
+    за цикл превращаются в одну запись на диск раз в flush_interval.
+    """
+
+    # переживают ли значения перезапуск процесса
+    persistent = False
+
+    def __init__(self, flush_interval: float = FLUSH_INTERVAL) -> None:
+        """Создаёт пустое хранилище."""
+        self.flush_interval = flush_interval
+        self._values: Dict[str, int] = {}
+        self._dirty: Dict[str, int] = {}
+        self._meta: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def load(self, key: str, default: Optional[int] = None) -> Optional[int]:
+        """Возвращает сохранённый from_date подписчика."""
+        return self._values.get(key, default)
+
+    def save(self, key: str, timestamp: int) -> None:
+        """Запоминает from_date и при необходимости сбрасывает изменения."""
+        with self._lock:
+            self._values[key] = timestamp
+            self._dirty[key] = timestamp
+        self.maybe_flush()
+
+    def maybe_flush(self) -> None:
+        """Сбрасывает изменения, если с прошлой записи прошёл интервал."""
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        """Записывает накопленные изменения одной пачкой."""
+        with self._lock:
+            dirty, self._dirty = self._dirty, {}
+            self._last_flush = time.monotonic()
+            if dirty:
+                self._write(dirty)
+
+    def close(self) -> None:
+        """Сбрасывает изменения перед остановкой."""
+        self.flush()
+
+    def load_meta(self, name: str, default: str = None) -> Optional[str]:
+        """Возвращает служебное значение, например раскладку шардов."""
+        return self._meta.get(name, default)
+
+    def save_meta(self, name: str, value: str) -> None:
+        """Сразу записывает служебное значение, минуя пачки from_date."""
+        with self._lock:
+            self._meta[name] = value
+            self._write_meta(name, value)
+
+    def _write(self, entries: Dict[str, int]) -> None:
+        """В памяти записывать некуда."""
+
+    def _write_meta(self, name: str, value: str) -> None:
+        """В памяти записывать некуда."""
+
+
+class SQLiteCheckpointStore(CheckpointStore):
+    """Хранит from_date подписчиков в базе SQLite."""
+
+    persistent = True
+
+    def __init__(self, path: str, flush_interval: float = FLUSH_INTERVAL):
+        """Открывает базу и загружает сохранённые значения."""
+        super().__init__(flush_interval)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoints "
+            "(key TEXT PRIMARY KEY, from_date INTEGER NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS meta "
+            "(name TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+        self._values.update(
+            self._connection.execute("SELECT key, from_date FROM checkpoints")
+        )
+
+    def _write(self, entries: Dict[str, int]) -> None:
+        """Обновляет все изменённые строки одной транзакцией."""
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO checkpoints (key, from_date) "
+                "VALUES (?, ?)",
+                entries.items(),
+            )
+
+    def load_meta(self, name: str, default: str = None) -> Optional[str]:
+        """Читает значение из базы: его мог записать другой процесс."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value FROM meta WHERE name = ?", (name,)
+            ).fetchone()
+        return default if row is None else row[0]
+
+    def _write_meta(self, name: str, value: str) -> None:
+        """Записывает служебное значение отдельной транзакцией."""
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)",
+                (name, value),
+            )
+
+    def close(self) -> None:
+        """Сбрасывает изменения и закрывает базу."""
+        super().close()
+        self._connection.close()
+
+
+class FileCheckpointStore(CheckpointStore):
+    """Хранит from_date подписчиков в журнале, куда строки только дописываются.
+
+    Каждая строка журнала — "ключ<TAB>from_date", при загрузке побеждает
+    последняя. Когда журнал разрастается, он переписывается начисто.
+    Служебные значения лежат рядом в <путь>.meta в виде JSON.
+    """
+
+    COMPACT_RATIO = 4
+    persistent = True
+
+    def __init__(self, path: str, flush_interval: float = FLUSH_INTERVAL):
+        """Открывает журнал и восстанавливает по нему значения."""
+        super().__init__(flush_interval)
+        self.path = path
+        self._lines = 0
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as log:
+                for line in log:
+                    key, _, timestamp = line.rstrip("\n").rpartition("\t")
+                    if key and timestamp.isdigit():
+                        self._values[key] = int(timestamp)
+                        self._lines += 1
+        self._log = open(path, "a", encoding="utf-8")
+        self.meta_path = f"{path}.meta"
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, encoding="utf-8") as meta:
+                self._meta.update(json.load(meta))
+
+    def _write(self, entries: Dict[str, int]) -> None:
+        """Дописывает изменения в журнал и делает один fsync."""
+        if self._lines + len(entries) > self.COMPACT_RATIO * max(
+            len(self._values), 1
+        ):
+            self._compact()
+            return
+        self._log.writelines(
+            f"{key}\t{timestamp}\n" for key, timestamp in entries.items()
+        )
+        self._log.flush()
+        os.fsync(self._log.fileno())
+        self._lines += len(entries)
+
+    def _compact(self) -> None:
+        """Переписывает журнал, оставляя по строке на подписчика."""
+        self._log.close()
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as log:
+            log.writelines(
+                f"{key}\t{timestamp}\n"
+                for key, timestamp in self._values.items()
+            )
+            log.flush()
+            os.fsync(log.fileno())
+        os.replace(tmp_path, self.path)
+        self._lines = len(self._values)
+        self._log = open(self.path, "a", encoding="utf-8")
+
+    def _write_meta(self, name: str, value: str) -> None:
+        """Переписывает файл служебных значений целиком."""
+        tmp_path = f"{self.meta_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as meta:
+            json.dump(self._meta, meta, ensure_ascii=False)
+        os.replace(tmp_path, self.meta_path)
+
+    def close(self) -> None:
+        """Сбрасывает изменения и закрывает журнал."""
+        super().close()
+        self._log.close()
+
+
+def open_checkpoint_store(
+    url: Optional[str] = CHECKPOINT_STORE,
+    flush_interval: float = FLUSH_INTERVAL,
+) -> CheckpointStore:
+    """Открывает хранилище по адресу вида sqlite:<путь> или file:<путь>.
+
+    Без адреса from_date хранится только в памяти, как раньше.
+    """
+    if not url:
+        return CheckpointStore(flush_interval)
+    backend, _, path = url.partition(":")
+    if backend == "sqlite":
+        return SQLiteCheckpointStore(path, flush_interval)
+    if backend == "file":
+        return FileCheckpointStore(path, flush_interval)
+    raise ValueError(f"Неизвестное хранилище контрольных точек: {url}")
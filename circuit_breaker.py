@@ -0,0 +1,105 @@
+import threading
+import time
+from collections import deque
+from typing import Callable
+
+import metrics
+from exceptions import CircuitOpen
+from settings import getenv
+
+FAILURE_RATE = float(getenv("CIRCUIT_FAILURE_RATE", 0.5))
+WINDOW = int(getenv("CIRCUIT_WINDOW", 20))
+MIN_CALLS = int(getenv("CIRCUIT_MIN_CALLS", 10))
+RESET_TIMEOUT = float(getenv("CIRCUIT_RESET_TIMEOUT", 60))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+STATE_CODES = {CLOSED: 0, OPEN: 1, HALF_OPEN: 2}
+
+
+class CircuitBreaker:
+    """Автомат защиты API, общий для всех подписчиков процесса.
+
+    В закрытом состоянии запросы идут как обычно, а автомат помнит исходы
+    последних window запросов. Когда доля сбоев среди них достигает
+    failure_rate, автомат открывается и на reset_timeout секунд отклоняет
+    запросы. Затем он пропускает ровно один пробный запрос: успех снова
+    закрывает автомат, сбой открывает его ещё на reset_timeout.
+    """
+
+    def __init__(
+        self,
+        failure_rate: float = FAILURE_RATE,
+        window: int = WINDOW,
+        min_calls: int = MIN_CALLS,
+        reset_timeout: float = RESET_TIMEOUT,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Создаёт закрытый автомат."""
+        self.failure_rate = failure_rate
+        self.min_calls = min(min_calls, window)
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._outcomes = deque(maxlen=window)
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        metrics.CIRCUIT_STATE.set(STATE_CODES[CLOSED])
+
+    def _switch(self, state: str) -> None:
+        """Переводит автомат в новое состояние."""
+        self.state = state
+        self._probing = False
+        if state == OPEN:
+            self._opened_at = self._clock()
+        if state == CLOSED:
+            self._outcomes.clear()
+            self._failures = 0
+        metrics.CIRCUIT_STATE.set(STATE_CODES[state])
+
+    def before_call(self) -> bool:
+        """Разрешает запрос или выбрасывает CircuitOpen.
+
+        Возвращает True, если запрос пробный: его исход решает, закрыть
+        автомат или открыть снова.
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return False
+            if self.state == OPEN:
+                if self._clock() - self._opened_at < self.reset_timeout:
+                    raise CircuitOpen
+                self._switch(HALF_OPEN)
+            if self._probing:
+                raise CircuitOpen
+            self._probing = True
+            return True
+
+    def record(self, success: bool, probe: bool = False) -> None:
+        """Учитывает исход запроса, разрешённого before_call."""
+        with self._lock:
+            if self.state != CLOSED:
+                # исходы запросов, начатых до открытия, уже не важны
+                if probe and self.state == HALF_OPEN:
+                    self._switch(CLOSED if success else OPEN)
+                return
+            if len(self._outcomes) == self._outcomes.maxlen:
+                self._failures -= not self._outcomes[0]
+            self._outcomes.append(success)
+            self._failures += not success
+            if (
+                len(self._outcomes) >= self.min_calls
+                and self._failures >= self.failure_rate * len(self._outcomes)
+            ):
+                self._switch(OPEN)
+
+    def retry_after(self) -> float:
+        """Возвращает, сколько секунд осталось до пробного запроса."""
+        if self.state != OPEN:
+            return 0.0
+        return max(
+            0.0, self.reset_timeout - (self._clock() - self._opened_at)
+        )
@@ -0,0 +1,195 @@
+import logging
+import threading
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from messages import MessageRenderer
+from settings import getenv
+
+BOT_COMMANDS = getenv("BOT_COMMANDS", "") == "1"
+LONG_POLL_TIMEOUT = int(getenv("BOT_LONG_POLL_TIMEOUT", 30))
+HISTORY_SIZE = int(getenv("BOT_HISTORY_SIZE", 10))
+ERROR_BACKOFF = 5.0
+
+NOT_SUBSCRIBED = "Этот чат не подписан на статусы домашек."
+NO_STATUSES = "Статусы домашек пока не получены."
+PAUSED = "Уведомления приостановлены. Повторите /pause, чтобы возобновить."
+RESUMED = "Уведомления снова включены."
+HELP = (
+    "/status — текущие статусы работ\n"
+    "/history — последние изменения статусов\n"
+    "/pause — приостановить или возобновить уведомления"
+)
+
+logger = logging.getLogger(__name__)
+
+
+class StatusBoard:
+    """Последние статусы домашек и история их смены по чатам.
+
+    Его пополняют циклы опроса, а команды бота читают только его, поэтому
+    ответ на /status не требует запроса к API Практикума.
+    """
+
+    def __init__(self, history_size: int = HISTORY_SIZE) -> None:
+        """Создаёт пустое табло."""
+        self.history_size = history_size
+        self._statuses: Dict[str, Dict[str, Tuple[str, object]]] = {}
+        self._history: Dict[str, deque] = {}
+        self._paused = set()
+        self._lock = threading.Lock()
+
+    def update(self, chat_id: str, records: Sequence[tuple]) -> None:
+        """Запоминает статусы из ответа API, от новых к старым."""
+        with self._lock:
+            statuses = self._statuses.setdefault(chat_id, {})
+            history = self._history.setdefault(
+                chat_id, deque(maxlen=self.history_size)
+            )
+            for record in reversed(records):
+                if statuses.get(record.name, (None,))[0] != record.status:
+                    history.append(
+                        (record.name, record.status, record.date_updated)
+                    )
+                statuses[record.name] = (record.status, record.date_updated)
+
+    def statuses(self, chat_id: str) -> Dict[str, Tuple[str, object]]:
+        """Возвращает последние статусы работ чата."""
+        with self._lock:
+            return dict(self._statuses.get(chat_id, {}))
+
+    def history(self, chat_id: str) -> List[Tuple[str, str, object]]:
+        """Возвращает последние смены статусов, от старых к новым."""
+        with self._lock:
+            return list(self._history.get(chat_id, ()))
+
+    def paused(self, chat_id: str) -> bool:
+        """Проверяет, приостановил ли чат уведомления."""
+        return chat_id in self._paused
+
+    def toggle_pause(self, chat_id: str) -> bool:
+        """Приостанавливает или возобновляет уведомления чата."""
+        with self._lock:
+            if chat_id in self._paused:
+                self._paused.discard(chat_id)
+                return False
+            self._paused.add(chat_id)
+            return True
+
+
+class CommandListener:
+    """Отвечает на команды подписчиков в отдельном потоке.
+
+    Обновления забираются long polling'ом через getUpdates, а ответы
+    собираются из StatusBoard, так что опрос API не ждёт Telegram и не
+    получает лишних запросов.
+    """
+
+    def __init__(
+        self,
+        bot: object,
+        board: StatusBoard,
+        reply: Callable[[str, str], object],
+        chats: Iterable[str],
+        renderer: MessageRenderer,
+        timeout: int = LONG_POLL_TIMEOUT,
+    ) -> None:
+        """Готовит обработчик; опрос Telegram начнётся после start."""
+        self.bot = bot
+        self.board = board
+        self.reply = reply
+        self.chats = {str(chat_id) for chat_id in chats}
+        self.renderer = renderer
+        self.timeout = timeout
+        self.offset: Optional[int] = None
+        self._stopping = threading.Event()
+        self._thread = None
+        self.handlers = {
+            "/status": self.status,
+            "/history": self.history,
+            "/pause": self.pause,
+        }
+
+    def start(self) -> None:
+        """Запускает фоновый поток обработки команд."""
+        self._thread = threading.Thread(
+            target=self._run, name="telegram-commands", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Просит поток остановиться после текущего getUpdates."""
+        self._stopping.set()
+
+    def _run(self) -> None:
+        """Забирает обновления, пока обработчик не остановят."""
+        import telegram
+
+        while not self._stopping.is_set():
+            try:
+                self.poll_once()
+            except telegram.error.TelegramError as error:
+                logger.error("Не удалось получить команды: %s", error)
+                self._stopping.wait(ERROR_BACKOFF)
+            except Exception:
+                logger.exception("Сбой обработчика команд")
+                self._stopping.wait(ERROR_BACKOFF)
+
+    def poll_once(self) -> None:
+        """Обрабатывает одну пачку обновлений."""
+        updates = self.bot.get_updates(
+            offset=self.offset,
+            timeout=self.timeout,
+            allowed_updates=["message"],
+        )
+        for update in updates:
+            self.offset = update.update_id + 1
+            try:
+                self.process(update)
+            except Exception:
+                # одна сломанная команда не должна останавливать поток
+                logger.exception(
+                    "Не удалось обработать обновление %s", update.update_id
+                )
+
+    def process(self, update: object) -> None:
+        """Отвечает на команду из одного обновления."""
+        message = update.message
+        # обычные сообщения в чате не команды, отвечать на них незачем
+        if message is None or not (message.text or "").startswith("/"):
+            return
+        chat_id = str(message.chat_id)
+        self.reply(chat_id, self.handle(chat_id, message.text))
+
+    def handle(self, chat_id: str, text: str) -> str:
+        """Возвращает ответ на команду."""
+        if chat_id not in self.chats:
+            return NOT_SUBSCRIBED
+        command = (text.split() or [""])[0].partition("@")[0].lower()
+        handler = self.handlers.get(command)
+        return HELP if handler is None else handler(chat_id)
+
+    def status(self, chat_id: str) -> str:
+        """Отвечает на /status."""
+        statuses = self.board.statuses(chat_id)
+        if not statuses:
+            return NO_STATUSES
+        return self.renderer.join(
+            self.renderer.render(name, status)
+            for name, (status, _) in statuses.items()
+        )
+
+    def history(self, chat_id: str) -> str:
+        """Отвечает на /history."""
+        history = self.board.history(chat_id)
+        if not history:
+            return NO_STATUSES
+        return self.renderer.join(
+            f'{self.renderer.escape(date_updated or "—")} '
+            f"{self.renderer.render(name, status)}"
+            for name, status, date_updated in history
+        )
+
+    def pause(self, chat_id: str) -> str:
+        """Отвечает на /pause."""
+        return PAUSED if self.board.toggle_pause(chat_id) else RESUMED
@@ -0,0 +1,102 @@
+import time
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+
+import metrics
+from exceptions import DeadlineExceeded
+from settings import getenv
+
+API_CONNECT_TIMEOUT = float(getenv("API_CONNECT_TIMEOUT", 3.05))
+API_READ_TIMEOUT = float(getenv("API_READ_TIMEOUT", 10))
+API_DEADLINE = float(getenv("API_DEADLINE", 15))
+TELEGRAM_CONNECT_TIMEOUT = float(getenv("TELEGRAM_CONNECT_TIMEOUT", 3.05))
+TELEGRAM_READ_TIMEOUT = float(getenv("TELEGRAM_READ_TIMEOUT", 10))
+SEND_DEADLINE = float(getenv("SEND_DEADLINE", 10))
+# таймаут 0 переводит сокет в неблокирующий режим, поэтому меньше нельзя
+MIN_TIMEOUT = 0.001
+STAGES = ("api", "send", "queue")
+
+for stage in STAGES:
+    metrics.DEADLINE_EXCEEDED.inc(stage, amount=0)
+
+
+def exceeded(stage: str, total: Optional[float] = None) -> DeadlineExceeded:
+    """Учитывает превышение срока и возвращает исключение для raise."""
+    metrics.DEADLINE_EXCEEDED.inc(stage)
+    if total is None:
+        return DeadlineExceeded(f"{stage}: истёк таймаут соединения")
+    return DeadlineExceeded(f"{stage}: не уложились в {total:g} с")
+
+
+class Deadline:
+    """Срок одной операции с таймаутами соединения и чтения.
+
+    Срок отсчитывается с момента создания и передаётся вниз по стеку
+    вызовов: таймауты каждого сетевого вызова не выходят за остаток
+    срока, а что не успело завершиться, отменяется с DeadlineExceeded.
+    """
+
+    def __init__(
+        self,
+        total: float = API_DEADLINE,
+        connect: float = API_CONNECT_TIMEOUT,
+        read: float = API_READ_TIMEOUT,
+        stage: str = "api",
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Начинает отсчёт срока в total секунд."""
+        self.total = total
+        self.connect = connect
+        self.read = read
+        self.stage = stage
+        self._clock = clock
+        self.expires_at = clock() + total
+
+    def remaining(self) -> float:
+        """Возвращает остаток срока в секундах."""
+        return max(self.expires_at - self._clock(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        """Истёк ли срок."""
+        return self._clock() >= self.expires_at
+
+    def timeout(self) -> Tuple[float, float]:
+        """Возвращает таймауты соединения и чтения в пределах срока."""
+        remaining = max(self.remaining(), MIN_TIMEOUT)
+        return min(self.connect, remaining), min(self.read, remaining)
+
+    def child(self, total: float = API_DEADLINE) -> "Deadline":
+        """Срок вложенной операции: не дольше total и остатка этого срока."""
+        return Deadline(
+            min(total, self.remaining()),
+            self.connect,
+            self.read,
+            self.stage,
+            self._clock,
+        )
+
+    def exceeded(self, stage: Optional[str] = None) -> DeadlineExceeded:
+        """Учитывает превышение срока на этапе stage."""
+        return exceeded(stage or self.stage, self.total)
+
+    def check(self, stage: Optional[str] = None) -> None:
+        """Выбрасывает DeadlineExceeded, если срок уже истёк."""
+        if self.expired:
+            raise self.exceeded(stage)
+
+    def guard(self, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """Пропускает куски тела ответа, пока не истёк срок.
+
+        Таймаут чтения ограничивает паузу между кусками, а не всё тело,
+        поэтому медленная отдача обрывается здесь.
+        """
+        for chunk in chunks:
+            self.check()
+            yield chunk
+
+
+def send_deadline(total: float = SEND_DEADLINE) -> Deadline:
+    """Создаёт срок отправки одного сообщения в Telegram."""
+    return Deadline(
+        total, TELEGRAM_CONNECT_TIMEOUT, TELEGRAM_READ_TIMEOUT, "send"
+    )
@@ -0,0 +1,136 @@
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+from exceptions import (
+    CircuitOpen,
+    NotAvailableEndpoint,
+    RequestRejected,
+    RequestToAPIError,
+)
+from settings import getenv
+
+ALERT_WINDOW = float(getenv("ALERT_WINDOW", 300))
+OPERATOR_CHAT_ID = getenv("OPERATOR_CHAT_ID")
+# сбои самого API одинаковы для всех подписчиков, им место в сводке
+API_ERRORS = (NotAvailableEndpoint, RequestToAPIError, CircuitOpen)
+# ответ 4xx касается токена конкретного подписчика, ему и надо сообщить
+SUBSCRIBER_ERRORS = (RequestRejected,)
+RECOVERED_MESSAGE = "Работа восстановлена: сбои прекратились."
+RECOVERED_GROUP = "Сбои прекратились: {}"
+
+logger = logging.getLogger(__name__)
+
+
+class ErrorAggregator:
+    """Сводит сбои по классам исключений за окно времени.
+
+    Вместо сообщения на каждый сбой оператор получает одну сводку за окно
+    с числом сбоев и затронутых подписчиков. Сводка отправляется, только
+    когда появляется новый класс сбоев. О восстановлении сообщается для
+    каждого класса отдельно, как только окно проходит без его сбоев, так
+    что один подписчик с постоянным сбоем не скрывает восстановление
+    остальных.
+    """
+
+    def __init__(
+        self,
+        notify: Callable[[str], None],
+        window: float = ALERT_WINDOW,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Создаёт агрегатор, который отправляет сводки через notify."""
+        self.notify = notify
+        self.window = window
+        self._clock = clock
+        self._groups = {}
+        self._successes = 0
+        self._active: Dict[str, str] = {}
+        self._window_started = clock()
+        self._lock = threading.Lock()
+
+    def record(self, key: str, error: Exception, description: str) -> None:
+        """Учитывает сбой подписчика key."""
+        name = error.__class__.__name__
+        with self._lock:
+            group = self._groups.get(name)
+            if group is None:
+                group = self._groups[name] = [0, set(), description]
+            group[0] += 1
+            group[1].add(key)
+            group[2] = description
+
+    def record_success(self, key: str) -> None:
+        """Учитывает успешный цикл опроса подписчика key."""
+        with self._lock:
+            self._successes += 1
+
+    def flush(self, force: bool = False) -> Optional[str]:
+        """Закрывает окно, если оно истекло, и отправляет сводку."""
+        now = self._clock()
+        with self._lock:
+            if not force and now - self._window_started < self.window:
+                return None
+            groups, successes = self._groups, self._successes
+            self._groups, self._successes = {}, 0
+            self._window_started = now
+            lines = []
+            if not self._active.keys() >= groups.keys():
+                lines.append(_summary(groups.values()))
+            recovered = [
+                name for name in self._active if name not in groups
+            ]
+            if recovered and successes:
+                if groups:
+                    lines.extend(
+                        RECOVERED_GROUP.format(self._active[name])
+                        for name in recovered
+                    )
+                else:
+                    lines.append(RECOVERED_MESSAGE)
+                for name in recovered:
+                    del self._active[name]
+            for name, group in groups.items():
+                self._active[name] = group[2]
+            message = "\n".join(lines) or None
+        if message is not None:
+            self.notify(message)
+        return message
+
+    @property
+    def failing(self) -> frozenset:
+        """Классы сбоев, о которых оператор уже предупреждён."""
+        return frozenset(self._active)
+
+
+def is_api_error(error: Exception) -> bool:
+    """Относится ли сбой к API в целом, а не к одному подписчику."""
+    return isinstance(error, API_ERRORS) and not isinstance(
+        error, SUBSCRIBER_ERRORS
+    )
+
+
+def _summary(groups: Iterable[list]) -> str:
+    """Собирает текст сводки: строка на каждый класс сбоев."""
+    lines = []
+    for count, keys, description in sorted(
+        groups, key=lambda group: -group[0]
+    ):
+        if count > 1 or len(keys) > 1:
+            description = (
+                f"{description} (сбоев: {count}, подписчиков: {len(keys)})"
+            )
+        lines.append(description)
+    return "\n".join(lines)
+
+
+def operator_notifier(
+    outbox: object, chat_id: str = OPERATOR_CHAT_ID
+) -> Callable[[str], None]:
+    """Возвращает notify, который пишет оператору или хотя бы в лог."""
+    def notify(message: str) -> None:
+        logger.warning("Сводка сбоев: %s", message)
+        if chat_id:
+            outbox.put(chat_id, message)
+    return notify
@@ -24,3 +24,15 @@ class NoNewStatuses(Exception):
 
 class RequestToAPIError(Exception):
     """При запросе к API произошла ошибка."""
+
+
+class CircuitOpen(Exception):
+    """Запросы к API приостановлены после серии сбоев."""
+
+
+class DeadlineExceeded(RequestToAPIError):
+    """Запрос не уложился в отведённый срок и был отменён."""
+
+
+class RequestRejected(NotAvailableEndpoint):
+    """API отклонил запрос подписчика ответом 4xx."""
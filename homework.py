@@ -1,38 +1,81 @@
-import os
+import atexit
 import sys
 import logging
+import operator
 import time
-
-import requests
-from dotenv import load_dotenv
-import telegram
+from itertools import repeat
+from typing import (
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Union,
+)
 
 from exceptions import (
+    CircuitOpen,
+    DeadlineExceeded,
     NotAvailableEndpoint,
     RequiredKeysAreMissing,
     MissingHomeworkName,
     MissingHomeworkStatus,
     UnknownHomeworkStatus,
     NoNewStatuses,
+    RequestRejected,
     RequestToAPIError,
 )
+import messages
+import metrics
+import tracing
+from checkpoints import CheckpointStore, open_checkpoint_store
+from circuit_breaker import CircuitBreaker
+from commands import BOT_COMMANDS, CommandListener, StatusBoard
+from deadlines import (
+    API_CONNECT_TIMEOUT,
+    API_READ_TIMEOUT,
+    TELEGRAM_CONNECT_TIMEOUT,
+    TELEGRAM_READ_TIMEOUT,
+    Deadline,
+    exceeded,
+    send_deadline,
+)
+from error_aggregator import ErrorAggregator, is_api_error
+from http_client import build_session, connection_stats
+from json_decoding import STREAM_CHUNK_SIZE, decode_response, extract_statuses
+from log_config import setup_logging
+from notification_cache import NotificationCache
+from response_cache import ResponseCache
+from scheduler import AdaptiveScheduler
+from settings import getenv, load_dotenv
+from state_index import HomeworkStateIndex
+from subscribers import Subscriber
+from tracing import trace_stage
 
-load_dotenv()
-
-PRACTICUM_TOKEN = os.getenv("PRACTICUM_TOKEN")
-TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
-TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
+# requests, telegram и dotenv импортируются там, где нужны: модуль
+# импортируют тесты и короткие команды, которым они ни к чему
+PRACTICUM_TOKEN = getenv("PRACTICUM_TOKEN")
+TELEGRAM_TOKEN = getenv("TELEGRAM_TOKEN")
+TELEGRAM_CHAT_ID = getenv("TELEGRAM_CHAT_ID")
 
 RETRY_PERIOD = 600
-ENDPOINT = "https://practicum.yandex.ru/api/user_api/homework_statuses/"
+ENDPOINT = getenv(
+    "PRACTICUM_ENDPOINT",
+    "https://practicum.yandex.ru/api/user_api/homework_statuses/",
+)
 HEADERS = {"Authorization": f"OAuth {PRACTICUM_TOKEN}"}
 
+logger = logging.getLogger(__name__)
+
 
 HOMEWORK_VERDICTS = {
     "approved": "Работа проверена: ревьюеру всё понравилось. Ура!",
     "reviewing": "Работа взята на проверку ревьюером.",
     "rejected": "Работа проверена: у ревьюера есть замечания.",
 }
+RENDERER = messages.MessageRenderer(HOMEWORK_VERDICTS)
 
 EXCEPTION_ERROR_MESSAGES = {
     NotAvailableEndpoint: "Эндпоинт недоступен",
@@ -43,7 +86,31 @@ EXCEPTION_ERROR_MESSAGES = {
                            "статус домашней работы",
     RequestToAPIError: "При обработке запроса к API "
                        "произошло неоднозначное исключение.",
+    CircuitOpen: "API Практикума не отвечает, "
+                 "запросы к нему временно приостановлены.",
+    DeadlineExceeded: "API Практикума не ответил вовремя, "
+                      "запрос отменён.",
+    RequestRejected: "API Практикума отклонил запрос: "
+                     "проверьте токен Практикума.",
 }
+for exception_class in EXCEPTION_ERROR_MESSAGES:
+    metrics.ERRORS.inc(exception_class.__name__, amount=0)
+
+
+def init(dotenv_path: Optional[str] = None) -> None:
+    """Загружает .env и перечитывает из окружения настройки модуля.
+
+    Без dotenv_path .env уже загружен при первом чтении настроек, и
+    вызов только перечитывает токены, чат и эндпоинт.
+    """
+    global PRACTICUM_TOKEN, TELEGRAM_TOKEN, TELEGRAM_CHAT_ID
+    global ENDPOINT, HEADERS
+    load_dotenv(dotenv_path)
+    PRACTICUM_TOKEN = getenv("PRACTICUM_TOKEN")
+    TELEGRAM_TOKEN = getenv("TELEGRAM_TOKEN")
+    TELEGRAM_CHAT_ID = getenv("TELEGRAM_CHAT_ID")
+    ENDPOINT = getenv("PRACTICUM_ENDPOINT", ENDPOINT)
+    HEADERS = {"Authorization": f"OAuth {PRACTICUM_TOKEN}"}
 
 
 def check_tokens() -> None:
@@ -52,116 +119,570 @@ def check_tokens() -> None:
     return feel_good
 
 
-def send_message(bot: object, message: str) -> None:
-    """Отправляет сообщения через объект бота в диалог с ID из константы."""
+def build_bot(con_pool_size: int = 8) -> object:
+    """Создаёт бота, которым можно пользоваться из нескольких потоков."""
+    import telegram
+    from telegram.utils.request import Request
+
+    return telegram.Bot(
+        token=TELEGRAM_TOKEN,
+        request=Request(
+            con_pool_size=con_pool_size,
+            connect_timeout=TELEGRAM_CONNECT_TIMEOUT,
+            read_timeout=TELEGRAM_READ_TIMEOUT,
+        ),
+    )
+
+
+@trace_stage("send_message")
+def deliver_message(
+    bot: object, chat_id: str, message: str, deadline: Deadline = None
+) -> None:
+    """Отправляет сообщение через объект бота в диалог с указанным ID.
+
+    Ответ Telegram ждём не дольше срока отправки; по умолчанию у каждого
+    сообщения свой срок SEND_DEADLINE.
+    """
+    import telegram
+
+    deadline = deadline or send_deadline()
+    started = time.perf_counter()
     try:
-        logging.debug(f'Отправляем сообщение "{message}"')
-        bot.send_message(TELEGRAM_CHAT_ID, message)
+        logger.debug('Отправляем сообщение "%s" в чат %s', message, chat_id)
+        _, read_timeout = deadline.timeout()
+        bot.send_message(
+            chat_id,
+            message,
+            timeout=read_timeout,
+            **messages.send_options(message),
+        )
     except telegram.error.TelegramError as error:
         # иначе pytest не пропускает
-        logging.error(f'Сообщение "{message}" не было доставлено: {error}')
+        if isinstance(error, telegram.error.TimedOut):
+            metrics.DEADLINE_EXCEEDED.inc("send")
+        metrics.MESSAGES_DROPPED.inc()
+        logger.error(
+            'Сообщение "%s" не было доставлено: %s', message, error
+        )
     else:
-        logging.debug(f'Сообщение "{message}" было успешно отправлено')
+        metrics.MESSAGES_SENT.inc()
+        logger.debug('Сообщение "%s" было успешно отправлено', message)
+    finally:
+        metrics.SEND_LATENCY.observe(time.perf_counter() - started)
 
 
-def get_api_answer(timestamp: int) -> dict:
-    """Получает данные с удалённого сервера."""
+def send_message(bot: object, message: str) -> None:
+    """Отправляет сообщения через объект бота в диалог с ID из константы."""
+    deliver_message(bot, TELEGRAM_CHAT_ID, message)
+
+
+@trace_stage("get_api_answer")
+def fetch_api_answer(
+    session: object,
+    headers: dict,
+    timestamp: int,
+    streaming: bool = False,
+    cache: ResponseCache = None,
+    cache_key: str = "",
+    breaker: CircuitBreaker = None,
+    deadline: Deadline = None,
+) -> dict:
+    """Получает данные с удалённого сервера через переданную HTTP-сессию.
+
+    С streaming=True тело ответа читается кусками и от домашек остаются
+    только поля, нужные боту; так дешевле забирать всю историю. Если
+    передан кэш ответов, запрос становится условным, а ответ без изменений
+    сразу завершается NoNewStatuses. Автомат защиты, если он передан,
+    отклоняет запросы выбрасыванием CircuitOpen, пока API лежит.
+
+    Без срока deadline действуют только таймауты соединения и чтения.
+    Запрос, не уложившийся в срок, отменяется с DeadlineExceeded, даже
+    если ответ уже пришёл: цикл опроса не должен ждать дольше срока.
+    """
+    import requests
+
+    started = time.perf_counter()
+    fetch = _fetch_streaming if streaming else _fetch_whole
     try:
-        logging.debug(
-            f"Отправляем запрос к API. Эндпоинт: {ENDPOINT}. "
-            f'Параметры: ["from_date": {timestamp}]'
+        if deadline is not None:
+            deadline.check()
+        logger.debug(
+            'Отправляем запрос к API. Эндпоинт: %s. '
+            'Параметры: ["from_date": %s]',
+            ENDPOINT,
+            timestamp,
+        )
+        if cache is not None:
+            headers = cache.conditional_headers(cache_key, headers)
+        return fetch(
+            session, headers, timestamp, cache, cache_key, breaker, deadline
         )
-        response = requests.get(
-            ENDPOINT, headers=HEADERS, params={"from_date": timestamp}
+    except requests.RequestException as error:
+        raise _network_error(error, deadline)
+    finally:
+        metrics.API_LATENCY.observe(time.perf_counter() - started)
+
+
+def _network_error(error: Exception, deadline: Deadline = None) -> Exception:
+    """Переводит сетевую ошибку requests в исключение бота.
+
+    Таймаут и любая ошибка после истечения срока — это DeadlineExceeded,
+    остальные ошибки — RequestToAPIError.
+    """
+    import requests
+
+    if isinstance(error, requests.Timeout):
+        return exceeded("api") if deadline is None else deadline.exceeded()
+    if deadline is not None and deadline.expired:
+        return deadline.exceeded()
+    return RequestToAPIError()
+
+
+def check_status_code(status_code: int) -> None:
+    """Проверяет код ответа API.
+
+    Ответ 4xx относится к запросу подписчика, например к отозванному
+    токену, и выбрасывает RequestRejected; остальные коды, кроме 200,
+    значат, что недоступен сам API.
+    """
+    if status_code == 200:
+        return
+    if 400 <= status_code < 500:
+        raise RequestRejected
+    raise NotAvailableEndpoint
+
+
+def _request(
+    session: object,
+    headers: dict,
+    timestamp: int,
+    breaker: CircuitBreaker = None,
+    deadline: Deadline = None,
+    **kwargs,
+) -> object:
+    """Отправляет запрос к API и сообщает автомату защиты его исход.
+
+    Сбоем считаются только сетевые ошибки и ответы 5xx: ответ 4xx значит,
+    что API работает, а не так с запросом конкретного подписчика.
+    """
+    params = {"from_date": timestamp}
+    kwargs["timeout"] = (
+        (API_CONNECT_TIMEOUT, API_READ_TIMEOUT)
+        if deadline is None else deadline.timeout()
+    )
+    if breaker is None:
+        return session.get(ENDPOINT, headers=headers, params=params, **kwargs)
+    probe = breaker.before_call()
+    try:
+        response = session.get(
+            ENDPOINT, headers=headers, params=params, **kwargs
         )
-        if response.status_code != 200:
-            raise NotAvailableEndpoint
-        response = response.json()
-        return response
-    except requests.RequestException:
-        raise RequestToAPIError
+    except Exception:
+        breaker.record(False, probe)
+        raise
+    breaker.record(response.status_code < 500, probe)
+    return response
+
+
+def _check_answer(
+    response: object,
+    cache: ResponseCache = None,
+    cache_key: str = "",
+    body: Optional[bytes] = None,
+) -> None:
+    """Проверяет код ответа; ответ без изменений даёт NoNewStatuses."""
+    if cache is not None and cache.unchanged(
+        cache_key,
+        response.status_code,
+        getattr(response, "headers", None),
+        body,
+    ):
+        raise NoNewStatuses
+    check_status_code(response.status_code)
 
 
-def check_response(response: dict) -> None:
-    """Проверяет, что ответ от сервера поступил в нужном виде."""
+def _read_body(response: object, deadline: Deadline = None) -> Optional[bytes]:
+    """Читает тело ответа целиком, обрывая медленную отдачу по сроку.
+
+    У ответов-заглушек в тестах нет iter_content, у них берётся content.
+    """
+    if not hasattr(response, "iter_content"):
+        return getattr(response, "content", None)
+    try:
+        chunks = response.iter_content(STREAM_CHUNK_SIZE)
+        if deadline is not None:
+            chunks = deadline.guard(chunks)
+        return b"".join(chunks)
+    finally:
+        response.close()
+
+
+def _fetch_whole(
+    session: object,
+    headers: dict,
+    timestamp: int,
+    cache: ResponseCache = None,
+    cache_key: str = "",
+    breaker: CircuitBreaker = None,
+    deadline: Deadline = None,
+) -> dict:
+    """Запрашивает API и разбирает тело ответа целиком."""
+    # без stream=True тело читается внутри get, и срок его не ограничивает
+    response = _request(
+        session, headers, timestamp, breaker, deadline, stream=True
+    )
+    if deadline is not None:
+        # повторы urllib3 могут растянуть запрос дольше остатка срока
+        deadline.check()
+    body = _read_body(response, deadline)
+    _check_answer(response, cache, cache_key, body)
+    return decode_response(response, body)
+
+
+def _fetch_streaming(
+    session: object,
+    headers: dict,
+    timestamp: int,
+    cache: ResponseCache = None,
+    cache_key: str = "",
+    breaker: CircuitBreaker = None,
+    deadline: Deadline = None,
+) -> dict:
+    """Запрашивает API и разбирает тело ответа по мере получения."""
+    response = _request(
+        session, headers, timestamp, breaker, deadline, stream=True
+    )
+    try:
+        _check_answer(response, cache, cache_key)
+        chunks = response.iter_content(STREAM_CHUNK_SIZE)
+        if deadline is not None:
+            chunks = deadline.guard(chunks)
+        return extract_statuses(chunks)
+    finally:
+        response.close()
+
+
+def get_api_answer(timestamp: int) -> dict:
+    """Получает данные с удалённого сервера."""
+    import requests
+
+    # модуль requests повторяет интерфейс Session.get, но без пула соединений
+    return fetch_api_answer(requests, HEADERS, timestamp, deadline=Deadline())
+
+
+class HomeworkRecord(NamedTuple):
+    """Домашка из ответа API с теми полями, которые нужны боту."""
+
+    id: Optional[int]
+    name: str
+    status: str
+    date_updated: Optional[str]
+
+
+HOMEWORK_ERRORS = (
+    TypeError,
+    MissingHomeworkName,
+    MissingHomeworkStatus,
+    UnknownHomeworkStatus,
+)
+_new_record = tuple.__new__
+_homework_name = operator.itemgetter("homework_name")
+_homework_status = operator.itemgetter("status")
+
+
+def homework_record(homework: dict) -> HomeworkRecord:
+    """Проверяет домашку из ответа API и превращает её в запись."""
+    if not isinstance(homework, dict):
+        raise TypeError("Домашка пришла не в виде словаря")
+    if "homework_name" not in homework:
+        raise MissingHomeworkName
+    if "status" not in homework:
+        raise MissingHomeworkStatus
+    if homework["status"] not in RENDERER.statuses:
+        raise UnknownHomeworkStatus
+    return HomeworkRecord(
+        homework.get("id"),
+        homework["homework_name"],
+        homework["status"],
+        homework.get("date_updated"),
+    )
+
+
+@trace_stage()
+def check_response(response: dict) -> List[HomeworkRecord]:
+    """Проверяет, что ответ от сервера поступил в нужном виде.
+
+    Домашки проверяются за один проход и возвращаются записями, поэтому
+    разбирать их повторно уже не нужно. Домашка, которую нельзя разобрать,
+    пропускается с записью в лог: иначе одна битая домашка валила бы весь
+    ответ, и from_date подписчика никогда бы не сдвинулся.
+    """
     if not isinstance(response, dict):
         raise TypeError("Ответ пришёл не в виде словаря")
-    if not isinstance(response.get("homeworks"), list):
+    homeworks = response.get("homeworks")
+    if not isinstance(homeworks, list):
         raise TypeError(
             'В ответе API домашки под ключом "homeworks" '
             "данные приходят не в виде списка"
         )
-    if "homeworks" not in response or "current_date" not in response:
+    if "current_date" not in response:
         raise RequiredKeysAreMissing
-    if len(response.get("homeworks")) == 0:
+    if not homeworks:
         raise NoNewStatuses
+    try:
+        statuses = list(map(_homework_status, homeworks))
+        if not RENDERER.statuses.issuperset(statuses):
+            return _checked_records(homeworks)
+        # колонки собираются в C, а tuple.__new__ обходит питоновский
+        # __new__ записи; zip переиспользует свой кортеж, так что лишних
+        # объектов для сборщика мусора не появляется
+        return list(map(_new_record, repeat(HomeworkRecord), zip(
+            map(dict.get, homeworks, repeat("id")),
+            map(_homework_name, homeworks),
+            statuses,
+            map(dict.get, homeworks, repeat("date_updated")),
+        )))
+    except (KeyError, TypeError):
+        return _checked_records(homeworks)
+
+
+def _checked_records(homeworks: List[dict]) -> List[HomeworkRecord]:
+    """Проверяет домашки по одной и пропускает битые с записью в лог."""
+    records = []
+    for homework in homeworks:
+        try:
+            records.append(homework_record(homework))
+        except HOMEWORK_ERRORS as error:
+            metrics.ERRORS.inc(error.__class__.__name__)
+            logger.error(
+                "Домашка пропущена: %s. %s", describe_error(error), homework
+            )
+    return records
+
+
+def status_message(record: HomeworkRecord) -> str:
+    """Готовит сообщение о статусе уже проверенной домашки."""
+    return RENDERER.render(record.name, record.status)
 
 
+@trace_stage()
 def parse_status(homework: dict) -> str:
     """Проверяет, что у домашки изменился вердикт ревьювера."""
-    if "homework_name" not in homework:
-        raise MissingHomeworkName
-    if "status" not in homework:
-        raise MissingHomeworkStatus
-    if homework.get("status") not in HOMEWORK_VERDICTS:
-        raise UnknownHomeworkStatus
-    homework_name = homework.get("homework_name")
-    verdict = HOMEWORK_VERDICTS.get(homework.get("status"))
-    return f'Изменился статус проверки работы "{homework_name}". {verdict}'
+    return status_message(homework_record(homework))
+
+
+def iter_status_messages(
+    homeworks: Iterable[Union[HomeworkRecord, dict]],
+    cache: NotificationCache = None,
+    subscriber_key: str = "",
+) -> Iterator[str]:
+    """Лениво готовит сообщения по всем домашкам ответа от старых к новым.
+
+    Принимает и записи, и словари из ответа API: словари проверяются на
+    месте. Для записей из check_response дешевле record_messages.
+    """
+    yield from record_messages(
+        [
+            record if isinstance(record, HomeworkRecord)
+            else homework_record(record)
+            for record in homeworks
+        ],
+        cache,
+        subscriber_key,
+    )
+
+
+def record_messages(
+    records: Sequence[HomeworkRecord],
+    cache: NotificationCache = None,
+    subscriber_key: str = "",
+) -> Iterator[str]:
+    """Лениво готовит сообщения по проверенным записям от старых к новым.
+
+    Если передан кэш, пропускаются уведомления, которые подписчик уже
+    получал, в том числе в прошлых циклах опроса. Кэш отмечает всю пачку
+    при первом обращении к генератору, а текст готовится по мере выдачи.
+    """
+    if cache is None:
+        cache = NotificationCache()
+    compose = RENDERER.compose
+    # API отдаёт домашки от новых к старым; плоский ключ хэшируется
+    # быстрее вложенного кортежа, а кэш проверяется одной пачкой
+    records = records[::-1]
+    seen = cache.seen_many([
+        (subscriber_key, homework_id, name, status, date_updated)
+        for homework_id, name, status, date_updated in records
+    ])
+    for (_, name, status, _), skip in zip(records, seen):
+        if not skip:
+            yield compose(name, status)
+
+
+def describe_error(error: Exception) -> str:
+    """Возвращает текст ошибки, понятный пользователю бота."""
+    if isinstance(error, TypeError):
+        return str(error)
+    return EXCEPTION_ERROR_MESSAGES.get(
+        error.__class__, f"Неизвестный сбой в работе программы: {error}"
+    )
+
+
+class PollingContext:
+    """Общее состояние циклов опроса и разбор их исходов.
+
+    Циклы homework.main, ThreadedPoller и асинхронного опроса отличаются
+    только тем, как они ходят в API и ждут следующего цикла; что делать с
+    ответом, с ответом без изменений и со сбоем, решается здесь.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[str, str], object],
+        store: CheckpointStore,
+        scheduler: AdaptiveScheduler,
+        errors: ErrorAggregator,
+        board: StatusBoard = None,
+        states: HomeworkStateIndex = None,
+        cache: NotificationCache = None,
+        responses: ResponseCache = None,
+        notify_errors: bool = True,
+    ) -> None:
+        """Запоминает получателя сообщений и общее состояние опроса."""
+        self.send = send
+        self.store = store
+        self.scheduler = scheduler
+        self.errors = errors
+        self.board = board or StatusBoard()
+        self.states = states or HomeworkStateIndex()
+        self.cache = cache or NotificationCache()
+        self.responses = responses or ResponseCache()
+        self.notify_errors = notify_errors
+        self.last_errors = {}
+
+    def record_homeworks(
+        self,
+        subscriber: Subscriber,
+        homeworks: List[HomeworkRecord],
+        current_date: int,
+    ) -> int:
+        """Рассылает новые статусы и сохраняет точку; возвращает from_date."""
+        self.board.update(subscriber.chat_id, homeworks)
+        if not self.board.paused(subscriber.chat_id):
+            for message in record_messages(
+                self.states.apply(subscriber.key, homeworks),
+                self.cache,
+                subscriber.key,
+            ):
+                self.send(subscriber.chat_id, message)
+        self.store.save(subscriber.key, current_date)
+        metrics.POLLING_LAG.mark(subscriber.key)
+        self.scheduler.record(
+            subscriber.key, homeworks[0].status if homeworks else None
+        )
+        self.errors.record_success(subscriber.key)
+        return current_date
+
+    def record_no_new_statuses(self, subscriber: Subscriber) -> None:
+        """Учитывает ответ, в котором нет новых статусов."""
+        metrics.NO_NEW_STATUSES.inc()
+        metrics.POLLING_LAG.mark(subscriber.key)
+        self.scheduler.record(subscriber.key)
+        self.errors.record_success(subscriber.key)
+        logger.debug("Нет новых статусов для %s", subscriber.key)
+
+    def record_error(self, subscriber: Subscriber, error: Exception) -> None:
+        """Учитывает сбой цикла и, если он касается подписчика, сообщает.
+
+        О сбоях API оператор узнаёт из сводки, а не каждый подписчик по
+        отдельности; одинаковые сбои подряд подписчику не повторяются.
+        """
+        metrics.ERRORS.inc(error.__class__.__name__)
+        self.scheduler.record_error(subscriber.key, error)
+        self.responses.forget(subscriber.key)
+        description = describe_error(error)
+        logger.error(
+            "%s: %s", subscriber.key, description,
+            extra={"subscriber": subscriber.key},
+        )
+        self.errors.record(subscriber.key, error, description)
+        if not self.notify_errors or is_api_error(error):
+            return
+        if self.last_errors.get(subscriber.key) != description:
+            self.send(subscriber.chat_id, description)
+            self.last_errors[subscriber.key] = description
+
 
-# flake8: noqa: C901
 def main() -> None:
     """Основная логика работы бота."""
     if not check_tokens():
-        logging.critical(
+        logger.critical(
             "Отсутствуют какие-то обязательные переменные. "
             "Нет смысла продолжать работу дальше."
         )
         sys.exit()
 
-    bot = telegram.Bot(token=TELEGRAM_TOKEN)
-    timestamp = int(time.time())
-    last_sended_problem_in_tg = "empty var"
+    import telegram
+
+    bot = build_bot()
+    metrics.maybe_start_metrics_server()
+    tracing.install_signal_handler()
+    session = build_session(status_retries=False)
+    store = open_checkpoint_store()
+    atexit.register(store.close)
+    subscriber = Subscriber(PRACTICUM_TOKEN, TELEGRAM_CHAT_ID)
+    timestamp = store.load(subscriber.key, int(time.time()))
+    breaker = CircuitBreaker()
+    # в режиме одного подписчика оператор и есть пользователь бота,
+    # поэтому сводка отправляется сразу после каждого цикла, а об
+    # остальных сбоях отдельно сообщать не нужно
+    polling = PollingContext(
+        lambda chat_id, text: send_message(bot, text),
+        store,
+        AdaptiveScheduler(RETRY_PERIOD),
+        ErrorAggregator(lambda text: send_message(bot, text), window=0),
+        notify_errors=False,
+    )
+    if BOT_COMMANDS:
+        # long polling держит соединение до BOT_LONG_POLL_TIMEOUT секунд
+        # и задаёт таймаут сам, поэтому у getUpdates свой бот и свой пул
+        updates_bot = telegram.Bot(token=TELEGRAM_TOKEN)
+        CommandListener(
+            updates_bot,
+            polling.board,
+            lambda chat_id, text: deliver_message(bot, chat_id, text),
+            [TELEGRAM_CHAT_ID],
+            RENDERER,
+        ).start()
 
     while True:
         try:
-            api_answer = get_api_answer(timestamp)
-            check_response(api_answer)
-            message = parse_status(api_answer.get("homeworks")[0])
-            send_message(bot, message)
-            timestamp = api_answer.get("current_date")
-        except TypeError as error:
-            logging.error(error)
-            if last_sended_problem_in_tg != error:
-                send_message(bot, error)
-                last_sended_problem_in_tg = error
+            api_answer = fetch_api_answer(
+                session,
+                HEADERS,
+                timestamp,
+                cache=polling.responses,
+                cache_key=subscriber.key,
+                breaker=breaker,
+                deadline=Deadline(),
+            )
+            timestamp = polling.record_homeworks(
+                subscriber,
+                check_response(api_answer),
+                api_answer.get("current_date"),
+            )
         except NoNewStatuses:
-            logging.debug("Нет новых статусов в ответах")
+            polling.record_no_new_statuses(subscriber)
         except Exception as error:
-            if (
-                EXCEPTION_ERROR_MESSAGES[error.__class__]
-                in EXCEPTION_ERROR_MESSAGES
-            ):
-                logging.error(f"{EXCEPTION_ERROR_MESSAGES[error.__class__]}")
-                if last_sended_problem_in_tg != error:
-                    send_message(
-                        bot, EXCEPTION_ERROR_MESSAGES[error.__class__]
-                    )
-                    last_sended_problem_in_tg = error
-            else:
-                logging.error(f"Неизвестный сбой в работе программы: {error}")
-                if last_sended_problem_in_tg != error:
-                    send_message(
-                        bot, f"Неизвестный сбой в работе программы: {error}"
-                    )
-                    last_sended_problem_in_tg = error
+            polling.record_error(subscriber, error)
         finally:
-            time.sleep(RETRY_PERIOD)
+            polling.errors.flush()
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Соединения с API: %s", connection_stats(session))
+            delay = polling.scheduler.next_delay(subscriber.key)
+            time.sleep(delay)
 
 
 if __name__ == "__main__":
-    logging.basicConfig(
-        format="%(asctime)s [%(levelname)s] - %(message)s", level=logging.INFO
-    )
-    logging.StreamHandler(sys.stdout)
+    init()
+    setup_logging()
     main()
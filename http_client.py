@@ -0,0 +1,73 @@
+from typing import TYPE_CHECKING
+
+from settings import getenv
+
+if TYPE_CHECKING:
+    import requests
+
+POOL_CONNECTIONS = int(getenv("HTTP_POOL_CONNECTIONS", 4))
+POOL_MAXSIZE = int(getenv("HTTP_POOL_MAXSIZE", 10))
+MAX_RETRIES = int(getenv("HTTP_MAX_RETRIES", 3))
+BACKOFF_FACTOR = 0.5
+RETRY_STATUSES = (502, 503, 504)
+
+
+def build_session(
+    pool_connections: int = POOL_CONNECTIONS,
+    pool_maxsize: int = POOL_MAXSIZE,
+    max_retries: int = MAX_RETRIES,
+    status_retries: bool = True,
+) -> "requests.Session":
+    """Создаёт HTTP-сессию с пулом keep-alive соединений и повторами.
+
+    Сессиям, чьи запросы ограничены сроком, нужен status_retries=False:
+    повторы ответов 502–504 с паузами между ними urllib3 делает внутри
+    одного get, и срок их не прерывает.
+    """
+    # requests импортируется только при первой сессии, а не при импорте
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    # после таймаута чтения запрос не повторяется: повтор умножает хвост
+    # задержек и не даёт уложиться в срок, а цикл опроса и так повторит
+    # запрос в следующий раз
+    retry = Retry(
+        total=max_retries,
+        read=False,
+        status=None if status_retries else 0,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({"GET"}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.headers["Connection"] = "keep-alive"
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def connection_stats(session: "requests.Session") -> dict:
+    """Считает открытые и переиспользованные соединения сессии."""
+    opened = 0
+    requests_sent = 0
+    adapters = {id(adapter): adapter for adapter in session.adapters.values()}
+    for adapter in adapters.values():
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            opened += pool.num_connections
+            requests_sent += pool.num_requests
+    return {
+        "opened": opened,
+        "reused": max(requests_sent - opened, 0),
+        "requests": requests_sent,
+    }
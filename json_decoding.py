@@ -0,0 +1,171 @@
+import codecs
+import importlib
+import json
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+
+from settings import getenv
+
+JSON_BACKEND = getenv("JSON_BACKEND", "auto")
+STREAM_CHUNK_SIZE = int(getenv("JSON_STREAM_CHUNK_SIZE", 64 * 1024))
+BACKENDS = ("orjson", "ujson", "json")
+HOMEWORK_FIELDS = ("id", "homework_name", "status", "date_updated")
+WHITESPACE = " \t\n\r"
+
+
+def load_backend(name: str = JSON_BACKEND) -> Tuple[str, Callable]:
+    """Возвращает имя и функцию loads самого быстрого доступного модуля.
+
+    С name="auto" перебираются orjson, ujson и json из стандартной
+    библиотеки; явно заданный модуль обязан быть установлен.
+    """
+    candidates = BACKENDS if name == "auto" else (name,)
+    for candidate in candidates:
+        try:
+            module = importlib.import_module(candidate)
+        except ImportError:
+            if name != "auto":
+                raise
+            continue
+        return candidate, module.loads
+    raise ImportError("Не найден ни один модуль для разбора JSON")
+
+
+BACKEND, loads = load_backend()
+
+
+def decode_response(response: object, body: Optional[bytes] = None) -> dict:
+    """Декодирует тело ответа requests выбранным модулем.
+
+    Тело, уже прочитанное по кускам, передаётся в body.
+    """
+    content = getattr(response, "content", None) if body is None else body
+    if not isinstance(content, (bytes, bytearray)):
+        # ответы-заглушки в тестах умеют только json()
+        return response.json()
+    return loads(content)
+
+
+class _Scanner:
+    """Читает JSON из потока кусков, держа в памяти только непрочитанное."""
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        """Готовит чтение из итератора кусков тела ответа."""
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._raw_decode = json.JSONDecoder().raw_decode
+        self._buffer = ""
+        self._position = 0
+        self._finished = False
+
+    def _read_more(self) -> bool:
+        """Дочитывает следующий кусок, отбрасывая уже разобранное."""
+        if self._finished:
+            return False
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._finished = True
+            text = self._decoder.decode(b"", final=True)
+        else:
+            text = self._decoder.decode(chunk)
+        self._buffer = self._buffer[self._position:] + text
+        self._position = 0
+        return True
+
+    def peek(self) -> str:
+        """Возвращает следующий значимый символ, не потребляя его."""
+        while True:
+            while (
+                self._position < len(self._buffer)
+                and self._buffer[self._position] in WHITESPACE
+            ):
+                self._position += 1
+            if self._position < len(self._buffer):
+                return self._buffer[self._position]
+            if not self._read_more():
+                raise ValueError("Ответ API оборвался на середине")
+
+    def expect(self, char: str) -> None:
+        """Потребляет символ char или сообщает о битом JSON."""
+        if self.peek() != char:
+            raise ValueError(
+                f"Ожидался символ {char!r} в позиции {self._position}"
+            )
+        self._position += 1
+
+    def accept(self, char: str) -> bool:
+        """Потребляет символ char, если он следующий."""
+        if self.peek() == char:
+            self._position += 1
+            return True
+        return False
+
+    def value(self) -> object:
+        """Разбирает одно значение целиком, дочитывая поток по мере нужды."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._raw_decode(self._buffer, self._position)
+            except json.JSONDecodeError:
+                if not self._read_more():
+                    raise
+                continue
+            # число на краю куска могло оборваться, дочитываем и повторяем
+            if (
+                end == len(self._buffer)
+                and isinstance(value, (int, float))
+                and self._read_more()
+            ):
+                continue
+            self._position = end
+            return value
+
+
+def _iter_members(scanner: _Scanner) -> Iterator[str]:
+    """Перебирает ключи объекта; значение каждого читает вызывающий."""
+    scanner.expect("{")
+    if scanner.accept("}"):
+        return
+    while True:
+        key = scanner.value()
+        scanner.expect(":")
+        yield key
+        if scanner.accept("}"):
+            return
+        scanner.expect(",")
+
+
+def extract_statuses(chunks: Iterable[bytes]) -> dict:
+    """Потоково вынимает из ответа API только нужные боту поля.
+
+    От домашек остаются id, homework_name, status и date_updated, от ответа
+    в целом — current_date. Прочие поля разбираются по одному значению и
+    сразу выбрасываются, поэтому память не растёт вместе с историей.
+    """
+    scanner = _Scanner(chunks)
+    if scanner.peek() != "{":
+        # не объект: пусть check_response сообщит об этом как обычно
+        return scanner.value()
+    result = {}
+    for key in _iter_members(scanner):
+        if key != "homeworks" or scanner.peek() != "[":
+            value = scanner.value()
+            if key in ("homeworks", "current_date"):
+                result[key] = value
+            continue
+        homeworks = result["homeworks"] = []
+        scanner.expect("[")
+        if scanner.accept("]"):
+            continue
+        while True:
+            homework = scanner.value()
+            if isinstance(homework, dict):
+                homework = {
+                    field: homework[field]
+                    for field in HOMEWORK_FIELDS
+                    if field in homework
+                }
+            homeworks.append(homework)
+            if scanner.accept("]"):
+                break
+            scanner.expect(",")
+    return result
@@ -0,0 +1,83 @@
+import atexit
+import json
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import TextIO
+
+from settings import getenv
+
+LOG_LEVEL = getenv("LOG_LEVEL", "INFO")
+LOG_JSON = getenv("LOG_JSON", "") == "1"
+LOG_FORMAT = "%(asctime)s [%(levelname)s] - %(message)s"
+RESERVED_ATTRS = frozenset(
+    vars(logging.LogRecord("", 0, "", 0, "", (), None))
+) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Пишет записи лога в одну строку JSON.
+
+    Поля, переданные через extra, попадают в JSON как есть, поэтому
+    например subscriber можно искать в системе сбора логов.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Собирает словарь из записи и кодирует его."""
+        data = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in RESERVED_ATTRS:
+                data[key] = value
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """Кладёт запись в очередь, не форматируя её в потоке опроса.
+
+    Стандартный QueueHandler готовит запись к передаче между процессами и
+    форматирует сообщение сразу. Очередь здесь живёт внутри процесса,
+    поэтому форматирование можно оставить потоку QueueListener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Возвращает запись без изменений."""
+        return record
+
+
+def stop_listener(listener: QueueListener) -> None:
+    """Дописывает очередь и останавливает поток, если он ещё работает."""
+    if listener._thread is not None:
+        listener.stop()
+
+
+def setup_logging(
+    level: str = LOG_LEVEL,
+    json_output: bool = LOG_JSON,
+    stream: TextIO = None,
+) -> QueueListener:
+    """Настраивает корневой логгер на запись через фоновый поток.
+
+    Потоки опроса только кладут записи в очередь, а вывод в stream
+    выполняет QueueListener. Он останавливается при выходе из программы,
+    дописав всё, что осталось в очереди.
+    """
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(
+        JsonFormatter() if json_output else logging.Formatter(LOG_FORMAT)
+    )
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    logging.basicConfig(
+        level=level, handlers=[DeferredQueueHandler(log_queue)], force=True
+    )
+    listener.start()
+    atexit.register(stop_listener, listener)
+    return listener
@@ -0,0 +1,178 @@
+import functools
+import html
+import json
+import logging
+import re
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+from settings import getenv
+
+MESSAGE_LOCALE = getenv("MESSAGE_LOCALE", "ru")
+MESSAGE_FORMAT = getenv("MESSAGE_FORMAT", "plain")
+STATUS_TEMPLATES_FILE = getenv("STATUS_TEMPLATES_FILE")
+RENDER_CACHE_SIZE = int(getenv("RENDER_CACHE_SIZE", 10_000))
+
+BASE_LOCALE = "ru"
+TEMPLATES = {
+    "ru": 'Изменился статус проверки работы "{name}". {verdict}',
+    "en": 'The review status of "{name}" has changed. {verdict}',
+}
+VERDICTS = {
+    "en": {
+        "approved": "The work is reviewed: the reviewer liked it. Hooray!",
+        "reviewing": "The work is taken for review.",
+        "rejected": "The work is reviewed: the reviewer has remarks.",
+    },
+}
+MARKDOWN_SPECIAL = re.compile(r"([_*\[\]()~`>#+\-=|{}.!\\])")
+
+logger = logging.getLogger(__name__)
+
+
+class HtmlMessage(str):
+    """Текст с HTML-разметкой Telegram."""
+
+    parse_mode = "HTML"
+
+
+class MarkdownMessage(str):
+    """Текст с разметкой MarkdownV2 Telegram."""
+
+    parse_mode = "MarkdownV2"
+
+
+def _escape_markdown(text: str) -> str:
+    """Экранирует служебные символы MarkdownV2."""
+    return MARKDOWN_SPECIAL.sub(r"\\\1", text)
+
+
+def _escape_html(text: str) -> str:
+    """Экранирует служебные символы HTML."""
+    return html.escape(text, quote=False)
+
+
+# экранирование, обрамление названия работы и тип готового сообщения
+FORMATS = {
+    "plain": (str, "", "", str),
+    "html": (_escape_html, "<b>", "</b>", HtmlMessage),
+    "markdown": (_escape_markdown, "*", "*", MarkdownMessage),
+}
+
+
+def send_options(text: str) -> dict:
+    """Возвращает аргументы send_message, нужные для разметки текста."""
+    parse_mode = getattr(text, "parse_mode", None)
+    return {"parse_mode": parse_mode} if parse_mode else {}
+
+
+def load_templates(path: Optional[str]) -> Tuple[dict, dict]:
+    """Читает шаблоны и вердикты, добавленные оператором.
+
+    Файл содержит объект вида {"templates": {locale: шаблон},
+    "verdicts": {locale: {status: вердикт}}}; обе части необязательны.
+    """
+    if not path:
+        return {}, {}
+    with open(path, encoding="utf-8") as config:
+        data = json.load(config)
+    return data.get("templates", {}), data.get("verdicts", {})
+
+
+class MessageRenderer:
+    """Готовит сообщения о статусах по заранее собранным шаблонам.
+
+    Для каждой пары (язык, статус) шаблон один раз разбирается на текст до
+    и после названия работы, уже экранированный под выбранную разметку.
+    Готовые сообщения запоминаются по (название, статус, язык), поэтому
+    массовая рассылка одинаковых статусов не собирает строку заново.
+    Вердикты, которых нет для языка, берутся из базового русского.
+    """
+
+    def __init__(
+        self,
+        verdicts: Mapping[str, str],
+        locale: str = MESSAGE_LOCALE,
+        fmt: str = MESSAGE_FORMAT,
+        templates_file: Optional[str] = STATUS_TEMPLATES_FILE,
+        maxsize: int = RENDER_CACHE_SIZE,
+    ) -> None:
+        """Собирает шаблоны для всех языков и статусов."""
+        if fmt not in FORMATS:
+            raise ValueError(f"Неизвестный формат сообщений: {fmt}")
+        extra_templates, extra_verdicts = load_templates(templates_file)
+        templates = {**TEMPLATES, **extra_templates}
+        catalog = {BASE_LOCALE: dict(verdicts)}
+        for source in (VERDICTS, extra_verdicts):
+            for language, entries in source.items():
+                catalog.setdefault(language, {}).update(entries)
+        if locale not in templates:
+            raise ValueError(f"Нет шаблона сообщений для языка {locale}")
+        self.locale = locale
+        self.format = fmt
+        self._compiled: Dict[Tuple[str, str], Tuple[str, str]] = {}
+        for language, template in templates.items():
+            entries = {
+                **catalog[BASE_LOCALE], **catalog.get(language, {})
+            }
+            for status, verdict in entries.items():
+                self._compiled[language, status] = self._compile(
+                    template, verdict
+                )
+        # шаблоны языка по умолчанию без составного ключа для compose
+        self._defaults = {
+            status: parts for (language, status), parts
+            in self._compiled.items() if language == locale
+        }
+        self.statuses = frozenset(self._defaults)
+        self._cached = functools.lru_cache(maxsize=maxsize)(self._render)
+        logger.debug(
+            "Собрано %s шаблонов сообщений", len(self._compiled)
+        )
+
+    def _compile(self, template: str, verdict: str) -> Tuple[str, str]:
+        """Разбивает шаблон на текст до и после названия работы."""
+        escape, opening, closing, _ = FORMATS[self.format]
+        parts = template.split("{name}")
+        if len(parts) != 2:
+            raise ValueError(
+                f"В шаблоне должно быть ровно одно {{name}}: {template}"
+            )
+        prefix, suffix = (
+            escape(part.replace("{verdict}", verdict)) for part in parts
+        )
+        return prefix + opening, closing + suffix
+
+    def _render(self, name: str, status: str, locale: str) -> str:
+        """Подставляет название работы в собранный шаблон."""
+        prefix, suffix = self._compiled[locale, status]
+        if self.format == "plain":
+            return f"{prefix}{name}{suffix}"
+        escape, _, _, message_type = FORMATS[self.format]
+        return message_type(prefix + escape(name) + suffix)
+
+    def render(self, name: str, status: str, locale: str = None) -> str:
+        """Возвращает сообщение о статусе; KeyError для неизвестного."""
+        return self._cached(name, status, locale or self.locale)
+
+    def compose(self, name: str, status: str) -> str:
+        """Готовит сообщение на языке по умолчанию в обход кэша.
+
+        Для уведомлений, уже прошедших кэш уведомлений: они почти всегда
+        новые, и кэш готовых сообщений на них только тратит время.
+        """
+        if self.format != "plain":
+            return self._render(name, status, self.locale)
+        prefix, suffix = self._defaults[status]
+        return f"{prefix}{name}{suffix}"
+
+    def escape(self, text: str) -> str:
+        """Экранирует текст под разметку сообщений."""
+        return FORMATS[self.format][0](text)
+
+    def join(self, lines: Iterable[str]) -> str:
+        """Склеивает готовые строки в одно сообщение с разметкой формата."""
+        return FORMATS[self.format][3]("\n".join(lines))
+
+    def stats(self) -> dict:
+        """Возвращает счётчики кэша готовых сообщений."""
+        return self._cached.cache_info()._asdict()
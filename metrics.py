@@ -0,0 +1,285 @@
+import bisect
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, Iterator, List, Sequence, Tuple
+
+from settings import getenv
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+METRICS_PORT = getenv("METRICS_PORT")
+METRICS_HOST = getenv("METRICS_HOST", "127.0.0.1")
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """Собирает метки в формате Prometheus."""
+    if not names:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(
+            name, str(value).replace("\\", "\\\\").replace('"', '\\"')
+        )
+        for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+class Metric:
+    """Общая часть всех метрик: имя, описание и значения по меткам."""
+
+    kind = "untyped"
+
+    def __init__(
+        self, name: str, documentation: str, labels: Sequence[str] = ()
+    ) -> None:
+        """Создаёт метрику без значений."""
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._values: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def samples(self) -> Iterator[Tuple[str, str, float]]:
+        """Перечисляет пары (суффикс имени, метки, значение)."""
+        with self._lock:
+            values = list(self._values.items())
+        for label_values, value in values:
+            yield "", _format_labels(self.label_names, label_values), value
+
+    def render(self) -> List[str]:
+        """Возвращает строки метрики в текстовом формате Prometheus."""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        lines.extend(
+            f"{self.name}{suffix}{labels} {value}"
+            for suffix, labels, value in self.samples()
+        )
+        return lines
+
+
+class Counter(Metric):
+    """Монотонно растущий счётчик."""
+
+    kind = "counter"
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        """Увеличивает счётчик для указанных меток."""
+        with self._lock:
+            self._values[label_values] = (
+                self._values.get(label_values, 0) + amount
+            )
+
+    def value(self, *label_values: str) -> float:
+        """Возвращает текущее значение счётчика."""
+        return self._values.get(label_values, 0)
+
+
+class Gauge(Metric):
+    """Значение, которое может как расти, так и падать."""
+
+    kind = "gauge"
+
+    def set(self, value: float, *label_values: str) -> None:
+        """Устанавливает значение для указанных меток."""
+        with self._lock:
+            self._values[label_values] = value
+
+    def remove(self, *label_values: str) -> None:
+        """Убирает значение для указанных меток."""
+        with self._lock:
+            self._values.pop(label_values, None)
+
+
+class LagGauge(Gauge):
+    """Показывает, сколько секунд прошло с отметки для каждой метки."""
+
+    def mark(self, *label_values: str) -> None:
+        """Запоминает текущий момент как последнюю отметку."""
+        self.set(time.time(), *label_values)
+
+    def samples(self) -> Iterator[Tuple[str, str, float]]:
+        """Переводит отметки в секунды отставания на момент сбора."""
+        now = time.time()
+        for suffix, labels, marked_at in super().samples():
+            yield suffix, labels, round(now - marked_at, 3)
+
+
+class Histogram(Metric):
+    """Распределение значений по корзинам."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        """Создаёт гистограмму с заданными границами корзин."""
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *label_values: str) -> None:
+        """Учитывает одно наблюдение."""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(label_values)
+            if state is None:
+                state = self._values[label_values] = [
+                    [0] * (len(self.buckets) + 1), 0.0
+                ]
+            state[0][index] += 1
+            state[1] += value
+
+    def count(self, *label_values: str) -> int:
+        """Возвращает число наблюдений."""
+        state = self._values.get(label_values)
+        return sum(state[0]) if state else 0
+
+    def samples(self) -> Iterator[Tuple[str, str, float]]:
+        """Перечисляет накопительные корзины, сумму и количество."""
+        with self._lock:
+            values = [
+                (labels, list(counts), total)
+                for labels, (counts, total) in self._values.items()
+            ]
+        names = self.label_names + ("le",)
+        for label_values, counts, total in values:
+            cumulative = 0
+            for bound, bucket_count in zip(
+                self.buckets + (float("inf"),), counts
+            ):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                yield "_bucket", _format_labels(
+                    names, label_values + (le,)
+                ), cumulative
+            labels = _format_labels(self.label_names, label_values)
+            yield "_sum", labels, total
+            yield "_count", labels, cumulative
+
+
+class Registry:
+    """Набор метрик, которые отдаются по /metrics."""
+
+    def __init__(self) -> None:
+        """Создаёт пустой реестр."""
+        self._metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        """Добавляет метрику в реестр и возвращает её."""
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Возвращает все метрики в текстовом формате Prometheus."""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+API_LATENCY = REGISTRY.register(Histogram(
+    "homework_api_request_seconds",
+    "Длительность запроса к API Практикума.",
+))
+SEND_LATENCY = REGISTRY.register(Histogram(
+    "homework_telegram_send_seconds",
+    "Длительность отправки сообщения в Telegram.",
+))
+ERRORS = REGISTRY.register(Counter(
+    "homework_errors_total",
+    "Сбои цикла опроса по классам исключений.",
+    ("exception",),
+))
+NO_NEW_STATUSES = REGISTRY.register(Counter(
+    "homework_no_new_statuses_total",
+    "Циклы опроса без новых статусов.",
+))
+UNCHANGED_RESPONSES = REGISTRY.register(Counter(
+    "homework_unchanged_responses_total",
+    "Ответы API, которые не пришлось разбирать: 304 или тот же ответ.",
+    ("reason",),
+))
+MESSAGES_SENT = REGISTRY.register(Counter(
+    "homework_messages_sent_total",
+    "Сообщения, доставленные в Telegram.",
+))
+MESSAGES_DROPPED = REGISTRY.register(Counter(
+    "homework_messages_dropped_total",
+    "Сообщения, которые не удалось доставить.",
+))
+DEADLINE_EXCEEDED = REGISTRY.register(Counter(
+    "homework_deadline_exceeded_total",
+    "Запросы, отменённые из-за истёкшего срока, по этапам.",
+    ("stage",),
+))
+CIRCUIT_STATE = REGISTRY.register(Gauge(
+    "homework_api_circuit_state",
+    "Состояние автомата защиты API: 0 закрыт, 1 открыт, 2 полуоткрыт.",
+))
+POLLING_LAG = REGISTRY.register(LagGauge(
+    "homework_polling_lag_seconds",
+    "Секунды с последнего успешного опроса API для подписчика.",
+    ("subscriber",),
+))
+
+
+def _metrics_handler(registry: Registry) -> type:
+    """Создаёт обработчик /metrics для реестра.
+
+    http.server импортируется только здесь: без METRICS_PORT он не нужен.
+    """
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        """Отдаёт метрики реестра по /metrics."""
+
+        def do_GET(self) -> None:
+            """Отвечает текстом метрик или 404."""
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args) -> None:
+            """Не пишет каждый сбор метрик в лог."""
+
+    return MetricsHandler
+
+
+def start_metrics_server(
+    port: int, host: str = METRICS_HOST, registry: Registry = REGISTRY
+) -> "ThreadingHTTPServer":
+    """Запускает HTTP-сервер с /metrics в фоновом потоке."""
+    from http.server import ThreadingHTTPServer
+
+    server = ThreadingHTTPServer((host, port), _metrics_handler(registry))
+    server.daemon_threads = True
+    threading.Thread(
+        target=server.serve_forever, name="metrics", daemon=True
+    ).start()
+    logger.info("Метрики доступны на http://%s:%s/metrics", host, port)
+    return server
+
+
+def maybe_start_metrics_server() -> None:
+    """Запускает сервер метрик, если задана переменная METRICS_PORT."""
+    if METRICS_PORT:
+        start_metrics_server(int(METRICS_PORT))
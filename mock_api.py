@@ -0,0 +1,258 @@
+import argparse
+import hashlib
+import json
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+from urllib.parse import parse_qs, urlsplit
+
+from log_config import setup_logging
+
+API_PATH = "/api/user_api/homework_statuses/"
+STATUS_CYCLE = ("reviewing", "rejected", "reviewing", "approved")
+NOT_AUTHENTICATED = {
+    "code": "not_authenticated",
+    "message": "Учетные данные не были предоставлены.",
+    "source": "__response__",
+}
+
+logger = logging.getLogger(__name__)
+
+
+class SyntheticStream:
+    """Детерминированная история статусов домашек одного токена.
+
+    Каждая домашка раз в status_period секунд переходит к следующему
+    статусу из STATUS_CYCLE, поэтому новые статусы появляются без хранения
+    какого-либо состояния на сервере.
+    """
+
+    def __init__(
+        self, token: str, homeworks: int, status_period: float, epoch: float
+    ) -> None:
+        """Готовит поток статусов для токена."""
+        seed = int(hashlib.sha1(token.encode()).hexdigest()[:8], 16)
+        self.homeworks = homeworks
+        self.status_period = status_period
+        self.epoch = epoch
+        self.offsets = [
+            (seed + index * 7919) % int(max(status_period, 1))
+            for index in range(homeworks)
+        ]
+        self.base_id = seed % 100_000 * homeworks
+
+    def statuses(self, now: float, from_date: int) -> List[dict]:
+        """Возвращает домашки, изменившиеся начиная с from_date."""
+        result = []
+        for index, offset in enumerate(self.offsets):
+            started = self.epoch - offset
+            step = int((now - started) // self.status_period)
+            updated = started + step * self.status_period
+            if updated < from_date:
+                continue
+            result.append({
+                "id": self.base_id + index,
+                "status": STATUS_CYCLE[step % len(STATUS_CYCLE)],
+                "homework_name": f"student__hw{index:02d}.zip",
+                "reviewer_comment": "",
+                "date_updated": datetime.fromtimestamp(
+                    updated, timezone.utc
+                ).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "lesson_name": f"Спринт {index + 1}",
+            })
+        result.sort(key=lambda item: item["date_updated"], reverse=True)
+        return result
+
+
+class MockPracticumAPI:
+    """Локальный заменитель API homework_statuses для нагрузочных тестов.
+
+    Умеет добавлять задержку, отвечать ошибками, зависать дольше таймаута
+    клиента и отдавать битый JSON с заданными вероятностями.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        latency_jitter: float = 0.0,
+        error_rate: float = 0.0,
+        timeout_rate: float = 0.0,
+        timeout_delay: float = 30.0,
+        malformed_rate: float = 0.0,
+        homeworks_per_token: int = 3,
+        status_period: float = 600.0,
+        seed: int = None,
+    ) -> None:
+        """Настраивает сервер; слушать порт он начнёт после start."""
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.timeout_delay = timeout_delay
+        self.malformed_rate = malformed_rate
+        self.homeworks_per_token = homeworks_per_token
+        self.status_period = status_period
+        self.epoch = time.time()
+        self.requests = 0
+        self.injected = {"error": 0, "timeout": 0, "malformed": 0}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._streams = {}
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def endpoint(self) -> str:
+        """Адрес, который можно подставить в PRACTICUM_ENDPOINT."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{API_PATH}"
+
+    def start(self) -> "MockPracticumAPI":
+        """Запускает сервер в фоновом потоке."""
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="mock-api", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Останавливает сервер."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "MockPracticumAPI":
+        """Запускает сервер при входе в блок with."""
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        """Останавливает сервер при выходе из блока with."""
+        self.stop()
+
+    def stream(self, token: str) -> SyntheticStream:
+        """Возвращает поток статусов токена."""
+        with self._lock:
+            stream = self._streams.get(token)
+            if stream is None:
+                stream = self._streams[token] = SyntheticStream(
+                    token,
+                    self.homeworks_per_token,
+                    self.status_period,
+                    self.epoch,
+                )
+            return stream
+
+    def _roll(self) -> tuple:
+        """Решает, какую неисправность изобразить в ответ на запрос."""
+        with self._lock:
+            self.requests += 1
+            chance = self._random.random()
+            delay = self.latency + self._random.uniform(
+                0, self.latency_jitter
+            )
+        for fault, rate in (
+            ("error", self.error_rate),
+            ("timeout", self.timeout_rate),
+            ("malformed", self.malformed_rate),
+        ):
+            if chance < rate:
+                with self._lock:
+                    self.injected[fault] += 1
+                return fault, delay
+            chance -= rate
+        return None, delay
+
+    def respond(self, path: str, authorization: str) -> tuple:
+        """Возвращает код и тело ответа так, как ответил бы API."""
+        url = urlsplit(path)
+        if url.path != API_PATH:
+            return 404, _dump({"detail": "Not found."})
+        if not authorization.startswith("OAuth "):
+            return 401, _dump(NOT_AUTHENTICATED)
+        try:
+            from_date = int(parse_qs(url.query)["from_date"][0])
+        except (KeyError, ValueError):
+            return 400, _dump({
+                "code": "UnknownError",
+                "error": {"error": "Wrong from_date format"},
+            })
+        fault, delay = self._roll()
+        time.sleep(self.timeout_delay if fault == "timeout" else delay)
+        if fault == "error":
+            return 500, _dump({"detail": "Server error."})
+        now = time.time()
+        body = _dump({
+            "homeworks": self.stream(authorization[6:]).statuses(
+                now, from_date
+            ),
+            "current_date": int(now),
+        })
+        if fault == "malformed":
+            body = body[:len(body) // 2]
+        return 200, body
+
+    def _handler(self) -> type:
+        """Создаёт класс обработчика, привязанный к этому серверу."""
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:
+                """Отдаёт ответ с заголовками для keep-alive."""
+                status, body = api.respond(
+                    self.path, self.headers.get("Authorization", "")
+                )
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args) -> None:
+                """Пишет запросы в отладочный лог вместо stderr."""
+                logger.debug(format, *args)
+
+        return Handler
+
+
+def _dump(data: dict) -> bytes:
+    """Кодирует ответ в JSON так же, как настоящий API."""
+    return json.dumps(data, ensure_ascii=False).encode()
+
+
+def main() -> None:
+    """Запускает сервер из командной строки."""
+    parser = argparse.ArgumentParser(
+        description="Локальный заменитель API Практикума."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--latency-jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    parser.add_argument("--timeout-delay", type=float, default=30.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--homeworks-per-token", type=int, default=3)
+    parser.add_argument("--status-period", type=float, default=600.0)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+    api = MockPracticumAPI(**vars(args))
+    logger.info("PRACTICUM_ENDPOINT=%s", api.endpoint)
+    api.start()
+    try:
+        api._thread.join()
+    except KeyboardInterrupt:
+        api.stop()
+
+
+if __name__ == "__main__":
+    setup_logging()
+    main()
@@ -0,0 +1,100 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, Iterable, List
+
+from settings import getenv
+
+CACHE_MAXSIZE = int(getenv("NOTIFICATION_CACHE_SIZE", 100_000))
+CACHE_TTL = float(getenv("NOTIFICATION_CACHE_TTL", 7 * 24 * 60 * 60))
+
+
+class NotificationCache:
+    """Помнит уже отправленные уведомления, ограничивая объём памяти.
+
+    Записи вытесняются по LRU при превышении maxsize и забываются через
+    ttl секунд, так что кэш можно делить между тысячами подписчиков.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = CACHE_MAXSIZE,
+        ttl: float = CACHE_TTL,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Создаёт пустой кэш."""
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def seen(self, key: Hashable) -> bool:
+        """Проверяет, отправлялось ли уведомление, и запоминает его."""
+        now = self._clock()
+        with self._lock:
+            expires_at = self._entries.get(key)
+            if expires_at is not None:
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            self._entries[key] = now + self.ttl
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            return False
+
+    def seen_many(self, keys: Iterable[Hashable]) -> List[bool]:
+        """Проверяет пачку уведомлений под одной блокировкой.
+
+        То же, что seen для каждого ключа по очереди, но часы и блокировка
+        берутся один раз на весь ответ API, а не на каждую домашку.
+        """
+        now = self._clock()
+        expires = now + self.ttl
+        entries = self._entries
+        lookup = entries.get
+        result = []
+        hits = 0
+        with self._lock:
+            for key in keys:
+                expires_at = lookup(key)
+                if expires_at is not None:
+                    if expires_at > now:
+                        entries.move_to_end(key)
+                        hits += 1
+                        result.append(True)
+                        continue
+                    del entries[key]
+                    self.expirations += 1
+                entries[key] = expires
+                result.append(False)
+            self.hits += hits
+            self.misses += len(result) - hits
+            overflow = len(entries) - self.maxsize
+            for _ in range(overflow):
+                entries.popitem(last=False)
+            self.evictions += max(overflow, 0)
+        return result
+
+    def __len__(self) -> int:
+        """Возвращает число записей в кэше."""
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        """Возвращает счётчики попаданий и вытеснений."""
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -0,0 +1,51 @@
+import threading
+import time
+from typing import Callable, Optional
+
+
+class TokenBucket:
+    """Ограничивает частоту операций алгоритмом token bucket."""
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Создаёт полное ведро на rate операций в секунду."""
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1)
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def try_acquire(self, tokens: float = 1) -> float:
+        """Забирает токены или возвращает, сколько секунд надо подождать."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens: float = 1) -> None:
+        """Ждёт, пока в ведре появятся токены, блокируя поток."""
+        wait = self.try_acquire(tokens)
+        while wait > 0:
+            time.sleep(wait)
+            wait = self.try_acquire(tokens)
+
+    async def acquire_async(self, tokens: float = 1) -> None:
+        """Ждёт, пока в ведре появятся токены, не блокируя цикл событий."""
+        # asyncio нужен только асинхронному опросу, остальным он дорог
+        import asyncio
+
+        wait = self.try_acquire(tokens)
+        while wait > 0:
+            await asyncio.sleep(wait)
+            wait = self.try_acquire(tokens)
@@ -0,0 +1,67 @@
+import hashlib
+import threading
+from typing import Mapping, Optional
+
+import metrics
+
+
+class ResponseCache:
+    """Помнит валидаторы и хэш последнего ответа API для каждого подписчика.
+
+    ETag и Last-Modified превращаются в If-None-Match и If-Modified-Since
+    следующего запроса. Если сервер ответил 304 или прислал побайтно тот
+    же ответ, разбирать его не нужно: новых статусов в нём нет.
+    """
+
+    def __init__(self) -> None:
+        """Создаёт пустой кэш."""
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def conditional_headers(self, key: str, headers: dict) -> dict:
+        """Дополняет заголовки запроса сохранёнными валидаторами."""
+        entry = self._entries.get(key)
+        if entry is None or not (entry[0] or entry[1]):
+            return headers
+        headers = dict(headers)
+        if entry[0]:
+            headers["If-None-Match"] = entry[0]
+        if entry[1]:
+            headers["If-Modified-Since"] = entry[1]
+        return headers
+
+    def unchanged(
+        self,
+        key: str,
+        status: int,
+        headers: Optional[Mapping[str, str]],
+        body: Optional[bytes],
+    ) -> bool:
+        """Запоминает ответ и сообщает, совпал ли он с предыдущим."""
+        if status == 304:
+            metrics.UNCHANGED_RESPONSES.inc("not_modified")
+            return True
+        if status != 200:
+            return False
+        headers = headers or {}
+        digest = (
+            hashlib.blake2b(body, digest_size=16).digest()
+            if isinstance(body, (bytes, bytearray)) else None
+        )
+        entry = (headers.get("ETag"), headers.get("Last-Modified"), digest)
+        with self._lock:
+            previous = self._entries.get(key)
+            self._entries[key] = entry
+        if digest is not None and previous and previous[2] == digest:
+            metrics.UNCHANGED_RESPONSES.inc("same_body")
+            return True
+        return False
+
+    def forget(self, key: str) -> None:
+        """Забывает ответ подписчика, например после ошибки разбора."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        """Возвращает число подписчиков в кэше."""
+        return len(self._entries)
@@ -0,0 +1,93 @@
+import random
+import threading
+from typing import Optional
+
+from exceptions import NotAvailableEndpoint, RequestToAPIError
+from settings import getenv
+
+REVIEWING_PERIOD = float(getenv("REVIEWING_PERIOD", 120))
+MAX_PERIOD = float(getenv("MAX_POLL_PERIOD", 3600))
+IDLE_AFTER = int(getenv("IDLE_AFTER_CYCLES", 6))
+IDLE_FACTOR = 1.5
+JITTER = 0.1
+MAX_EXPONENT = 32
+API_REQUESTS_PER_SECOND = float(getenv("API_REQUESTS_PER_SECOND", 10))
+
+BACKOFF_ERRORS = (NotAvailableEndpoint, RequestToAPIError)
+
+
+class PollState:
+    """Что планировщик знает об одном подписчике."""
+
+    __slots__ = ("failures", "idle_cycles", "reviewing")
+
+    def __init__(self) -> None:
+        """Создаёт состояние нового подписчика."""
+        self.failures = 0
+        self.idle_cycles = 0
+        self.reviewing = False
+
+
+class AdaptiveScheduler:
+    """Подбирает интервал опроса API для каждого подписчика.
+
+    Пока домашка на ревью, API опрашивается чаще. При недоступности API
+    интервал растёт экспоненциально со случайным разбросом, а подписчики
+    без новых статусов постепенно опрашиваются всё реже.
+    """
+
+    def __init__(
+        self,
+        base_period: float,
+        reviewing_period: float = REVIEWING_PERIOD,
+        max_period: float = MAX_PERIOD,
+        idle_after: int = IDLE_AFTER,
+    ) -> None:
+        """Создаёт планировщик с базовым интервалом base_period."""
+        self.base_period = base_period
+        self.reviewing_period = min(reviewing_period, base_period)
+        self.max_period = max(max_period, base_period)
+        self.idle_after = idle_after
+        self._states = {}
+        self._lock = threading.Lock()
+
+    def _state(self, key: str) -> PollState:
+        """Возвращает состояние подписчика, создавая его при необходимости."""
+        with self._lock:
+            state = self._states.get(key)
+            if state is None:
+                state = self._states[key] = PollState()
+            return state
+
+    def record(self, key: str, latest_status: Optional[str] = None) -> None:
+        """Учитывает успешный цикл и последний полученный статус."""
+        state = self._state(key)
+        state.failures = 0
+        if latest_status is None:
+            state.idle_cycles += 1
+            return
+        state.idle_cycles = 0
+        state.reviewing = latest_status == "reviewing"
+
+    def record_error(self, key: str, error: Exception) -> None:
+        """Учитывает сбой; отложить опрос стоит только при сбоях API."""
+        state = self._state(key)
+        if isinstance(error, BACKOFF_ERRORS):
+            state.failures += 1
+
+    def next_delay(self, key: str) -> float:
+        """Возвращает паузу в секундах до следующего опроса подписчика."""
+        state = self._state(key)
+        if state.failures:
+            exponent = min(state.failures - 1, MAX_EXPONENT)
+            delay = min(self.base_period * 2 ** exponent, self.max_period)
+            return delay * random.uniform(1 - JITTER, 1 + JITTER)
+        if state.reviewing:
+            return self.reviewing_period
+        if state.idle_cycles >= self.idle_after:
+            exponent = min(
+                state.idle_cycles - self.idle_after + 1, MAX_EXPONENT
+            )
+            slowdown = IDLE_FACTOR ** exponent
+            return min(self.base_period * slowdown, self.max_period)
+        return self.base_period
@@ -0,0 +1,235 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import List
+
+import metrics
+from deadlines import send_deadline
+from messages import send_options
+from rate_limit import TokenBucket
+from settings import getenv
+
+GLOBAL_MESSAGES_PER_SECOND = float(getenv("TELEGRAM_GLOBAL_RATE", 25))
+CHAT_MESSAGES_PER_SECOND = float(getenv("TELEGRAM_CHAT_RATE", 1))
+COALESCE_WINDOW = float(getenv("TELEGRAM_COALESCE_WINDOW", 1))
+QUEUE_MAXSIZE = int(getenv("TELEGRAM_QUEUE_MAXSIZE", 10_000))
+MAX_MESSAGE_LENGTH = 4096
+SEPARATOR = "\n\n"
+
+logger = logging.getLogger(__name__)
+
+
+class OutboundQueue:
+    """Очередь исходящих сообщений Telegram с фоновой отправкой.
+
+    Сообщения для одного чата, пришедшие в пределах coalesce_window,
+    склеиваются в одно. Отправка ограничена token bucket'ами на чат и на
+    весь бот, поэтому опрос API не ждёт Telegram и не упирается в его
+    лимиты.
+    """
+
+    def __init__(
+        self,
+        bot: object,
+        global_rate: float = GLOBAL_MESSAGES_PER_SECOND,
+        chat_rate: float = CHAT_MESSAGES_PER_SECOND,
+        coalesce_window: float = COALESCE_WINDOW,
+        maxsize: int = QUEUE_MAXSIZE,
+    ) -> None:
+        """Создаёт очередь; отправка начнётся после вызова start."""
+        self.bot = bot
+        self.chat_rate = chat_rate
+        self.coalesce_window = coalesce_window
+        self.maxsize = maxsize
+        self._global = TokenBucket(global_rate)
+        self._chats: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._pending: "OrderedDict[str, List[str]]" = OrderedDict()
+        self._ready_at: "OrderedDict[str, float]" = OrderedDict()
+        self._size = 0
+        self._paused_until = 0.0
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._thread = None
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.timed_out = 0
+
+    def put(self, chat_id: str, text: str) -> bool:
+        """Ставит сообщение в очередь; False, если очередь переполнена."""
+        with self._condition:
+            if self._size >= self.maxsize:
+                self.dropped += 1
+                metrics.MESSAGES_DROPPED.inc()
+                logger.error('Очередь переполнена, "%s" отброшено', text)
+                return False
+            if chat_id not in self._pending:
+                self._pending[chat_id] = []
+                self._ready_at[chat_id] = (
+                    time.monotonic() + self.coalesce_window
+                )
+            self._pending[chat_id].append(text)
+            self._size += 1
+            self._condition.notify()
+            return True
+
+    def __len__(self) -> int:
+        """Возвращает число сообщений, ожидающих отправки."""
+        return self._size
+
+    def start(self) -> None:
+        """Запускает фоновый поток отправки."""
+        self._thread = threading.Thread(
+            target=self._run, name="telegram-sender", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 10) -> None:
+        """Дожидается отправки очереди и останавливает фоновый поток."""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        """Возвращает счётчики очереди."""
+        return {
+            "queued": self._size,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "timed_out": self.timed_out,
+        }
+
+    def _chat_bucket(self, chat_id: str) -> TokenBucket:
+        """Возвращает ограничитель частоты для чата."""
+        bucket = self._chats.get(chat_id)
+        if bucket is not None:
+            self._chats.move_to_end(chat_id)
+            return bucket
+        if len(self._chats) >= self.maxsize:
+            # забываем лимит чата, который молчит дольше всех: лимиты
+            # активных чатов сбрасывать нельзя, иначе они превысят 1 msg/s
+            self._chats.popitem(last=False)
+        bucket = self._chats[chat_id] = TokenBucket(self.chat_rate, 1)
+        return bucket
+
+    def _take(self, now: float):
+        """Выбирает чат, которому можно отправить, и склеивает сообщения.
+
+        Возвращает пару (chat_id, текст) или паузу до следующей попытки.
+        """
+        wait = None
+        if self._paused_until > now:
+            return None, self._paused_until - now
+        for chat_id, ready_at in self._ready_at.items():
+            if ready_at > now and not self._stopping:
+                # чаты стоят в порядке готовности, дальше ждать ещё дольше
+                chat_wait = ready_at - now
+                wait = chat_wait if wait is None else min(wait, chat_wait)
+                break
+            chat_wait = self._chat_bucket(chat_id).try_acquire()
+            if chat_wait == 0:
+                try:
+                    return (chat_id, self._pop_batch(chat_id)), None
+                except Exception:
+                    logger.exception(
+                        "Не удалось подготовить сообщения для чата %s",
+                        chat_id,
+                    )
+                    self._discard(chat_id)
+                    return None, 0
+            wait = chat_wait if wait is None else min(wait, chat_wait)
+        return None, wait
+
+    def _pop_batch(self, chat_id: str) -> str:
+        """Склеивает сообщения чата, пока они влезают в одно сообщение."""
+        messages = self._pending[chat_id]
+        # склеиваются только сообщения с одинаковой разметкой; очередь
+        # меняется только после того, как пачка собрана
+        options = send_options(messages[0])
+        count, length = 1, len(messages[0])
+        while count < len(messages) and (
+            send_options(messages[count]) == options
+            and length + len(SEPARATOR) + len(messages[count])
+            <= MAX_MESSAGE_LENGTH
+        ):
+            length += len(SEPARATOR) + len(messages[count])
+            count += 1
+        batch = messages[:count]
+        del messages[:count]
+        if not messages:
+            del self._pending[chat_id]
+            del self._ready_at[chat_id]
+        self._size -= len(batch)
+        self.coalesced += len(batch) - 1
+        return type(batch[0])(SEPARATOR.join(batch))
+
+    def _discard(self, chat_id: str) -> None:
+        """Отбрасывает все сообщения чата, которые не удаётся отправить."""
+        messages = self._pending.pop(chat_id)
+        del self._ready_at[chat_id]
+        self._size -= len(messages)
+        self.dropped += len(messages)
+        metrics.MESSAGES_DROPPED.inc(amount=len(messages))
+
+    def _requeue(self, chat_id: str, text: str, retry_after: float) -> None:
+        """Возвращает сообщение в начало очереди после флуд-контроля."""
+        with self._condition:
+            self._pending.setdefault(chat_id, []).insert(0, text)
+            self._ready_at.setdefault(chat_id, time.monotonic())
+            self._pending.move_to_end(chat_id, last=False)
+            self._ready_at.move_to_end(chat_id, last=False)
+            self._size += 1
+            self._paused_until = time.monotonic() + retry_after
+
+    def _send(self, chat_id: str, text: str) -> None:
+        """Отправляет одно сообщение с учётом общего лимита бота."""
+        import telegram
+
+        self._global.acquire()
+        deadline = send_deadline()
+        started = time.perf_counter()
+        try:
+            _, read_timeout = deadline.timeout()
+            self.bot.send_message(
+                chat_id, text, timeout=read_timeout, **send_options(text)
+            )
+        except telegram.error.RetryAfter as error:
+            logger.warning(
+                "Telegram просит подождать %s с", error.retry_after
+            )
+            self._requeue(chat_id, text, error.retry_after)
+        except telegram.error.TelegramError as error:
+            if isinstance(error, telegram.error.TimedOut):
+                # сообщение могло и дойти, поэтому повторять его не стоит
+                self.timed_out += 1
+                metrics.DEADLINE_EXCEEDED.inc("send")
+            self.dropped += 1
+            metrics.MESSAGES_DROPPED.inc()
+            logger.error('Сообщение "%s" не было доставлено: %s', text, error)
+        except Exception:
+            # поток отправки один на процесс и не должен умирать
+            self.dropped += 1
+            metrics.MESSAGES_DROPPED.inc()
+            logger.exception('Сообщение "%s" не было доставлено', text)
+        else:
+            self.sent += 1
+            metrics.MESSAGES_SENT.inc()
+        finally:
+            metrics.SEND_LATENCY.observe(time.perf_counter() - started)
+
+    def _run(self) -> None:
+        """Отправляет сообщения, пока очередь не остановят."""
+        while True:
+            with self._condition:
+                while True:
+                    if self._stopping and not self._pending:
+                        return
+                    batch, wait = self._take(time.monotonic())
+                    if batch is not None:
+                        break
+                    self._condition.wait(wait)
+            self._send(*batch)
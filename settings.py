@@ -0,0 +1,57 @@
+import os
+import sys
+from typing import Optional
+
+_loaded = False
+
+
+def _script_directory() -> str:
+    """Каталог запущенного скрипта; в REPL и python -c — текущий каталог."""
+    path = getattr(sys.modules.get("__main__"), "__file__", None)
+    return os.path.dirname(os.path.abspath(path)) if path else os.getcwd()
+
+
+def find_dotenv(start: Optional[str] = None) -> Optional[str]:
+    """Ищет .env в каталоге start и выше.
+
+    По умолчанию поиск идёт от запущенного скрипта, как у find_dotenv из
+    python-dotenv, поэтому бот находит свой .env из любого рабочего
+    каталога. Свой поиск нужен, чтобы не импортировать python-dotenv,
+    когда файла нет.
+    """
+    directory = os.path.abspath(start or _script_directory())
+    while True:
+        path = os.path.join(directory, ".env")
+        if os.path.isfile(path):
+            return path
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
+def load_dotenv(path: Optional[str] = None) -> None:
+    """Загружает .env в окружение, не перекрывая заданные переменные.
+
+    python-dotenv импортируется, только если файл нашёлся: без .env
+    (например, на Heroku) он не нужен.
+    """
+    global _loaded
+    _loaded = True
+    path = path or find_dotenv()
+    if path is None:
+        return
+    from dotenv import load_dotenv as load
+
+    load(path)
+
+
+def getenv(name: str, default: Optional[object] = None) -> Optional[object]:
+    """Возвращает настройку из окружения, при первом вызове загрузив .env.
+
+    Модули читают настройки при импорте, раньше, чем точка входа успевает
+    что-либо вызвать, поэтому .env загружается здесь, перед первым чтением.
+    """
+    if not _loaded:
+        load_dotenv()
+    return os.getenv(name, default)
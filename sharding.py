@@ -0,0 +1,312 @@
+import bisect
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, List
+
+import homework
+import metrics
+import tracing
+from checkpoints import (
+    CheckpointStore,
+    FileCheckpointStore,
+    open_checkpoint_store,
+)
+from log_config import setup_logging
+from rate_limit import TokenBucket
+from scheduler import API_REQUESTS_PER_SECOND
+from send_queue import GLOBAL_MESSAGES_PER_SECOND, OutboundQueue
+from settings import getenv
+from subscribers import Subscriber, load_subscribers
+from threaded_polling import ThreadedPoller
+
+SHARD_WORKERS = int(getenv("SHARD_WORKERS", os.cpu_count() or 1))
+DYNO_INDEX = int(getenv("DYNO_INDEX", 0))
+DYNO_COUNT = int(getenv("DYNO_COUNT", 1))
+RING_REPLICAS = int(getenv("SHARD_RING_REPLICAS", 64))
+MAX_RESTARTS = int(getenv("SHARD_MAX_RESTARTS", 3))
+RESTART_WINDOW = float(getenv("SHARD_RESTART_WINDOW", 300))
+CHECK_INTERVAL = 1.0
+
+logger = logging.getLogger(__name__)
+
+
+def _point(value: str) -> int:
+    """Положение значения на кольце."""
+    return int.from_bytes(
+        hashlib.blake2b(value.encode(), digest_size=8).digest(), "big"
+    )
+
+
+class HashRing:
+    """Кольцо согласованного хэширования.
+
+    Каждый узел занимает replicas точек на кольце, ключ достаётся первому
+    узлу по часовой стрелке. Если узел убрать, к соседям уходят только
+    его собственные ключи, остальные остаются на месте.
+    """
+
+    def __init__(
+        self, nodes: Iterable[str], replicas: int = RING_REPLICAS
+    ) -> None:
+        """Размещает узлы на кольце."""
+        self.nodes = sorted(set(nodes))
+        if not self.nodes:
+            raise ValueError("Кольцу нужен хотя бы один узел")
+        ring = sorted(
+            (_point(f"{node}#{replica}"), node)
+            for node in self.nodes
+            for replica in range(replicas)
+        )
+        self._points = [point for point, _ in ring]
+        self._owners = [node for _, node in ring]
+
+    def node_for(self, key: str) -> str:
+        """Возвращает узел, которому принадлежит ключ."""
+        index = bisect.bisect(self._points, _point(key))
+        return self._owners[index % len(self._owners)]
+
+    def assign(self, keys: Iterable[str]) -> Dict[str, List[str]]:
+        """Раскладывает ключи по узлам."""
+        shards = {node: [] for node in self.nodes}
+        for key in keys:
+            shards[self.node_for(key)].append(key)
+        return shards
+
+
+def dyno_subscribers(
+    subscribers: Iterable[Subscriber],
+    dyno: int = DYNO_INDEX,
+    dynos: int = DYNO_COUNT,
+) -> List[Subscriber]:
+    """Оставляет подписчиков, которых опрашивает этот дино."""
+    if dynos <= 1:
+        return list(subscribers)
+    ring = HashRing(f"dyno-{index}" for index in range(dynos))
+    return [
+        subscriber for subscriber in subscribers
+        if ring.node_for(subscriber.key) == f"dyno-{dyno}"
+    ]
+
+
+def worker_share(rate: float) -> float:
+    """Доля общего лимита частоты, которая достаётся одному процессу."""
+    return rate / (max(SHARD_WORKERS, 1) * max(DYNO_COUNT, 1))
+
+
+def run_shard(slot: str, subscribers: List[Subscriber]) -> None:
+    """Опрашивает шард подписчиков в отдельном процессе."""
+    homework.init()
+    setup_logging()
+    # SIGTERM от супервизора должен пройти через finally и сохранить точки
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    tracing.install_signal_handler()
+    if metrics.METRICS_PORT:
+        index = int(slot.rpartition("-")[2])
+        metrics.start_metrics_server(int(metrics.METRICS_PORT) + 1 + index)
+    logger.info("Шард %s: %s подписчиков", slot, len(subscribers))
+    # лимиты API и Telegram общие на токен, а не на процесс
+    bot = homework.build_bot()
+    outbox = OutboundQueue(
+        bot, global_rate=worker_share(GLOBAL_MESSAGES_PER_SECOND)
+    )
+    outbox.start()
+    poller = ThreadedPoller(
+        bot,
+        subscribers,
+        store=open_checkpoint_store(),
+        budget=TokenBucket(worker_share(API_REQUESTS_PER_SECOND)),
+        outbox=outbox,
+    )
+    try:
+        poller.run_forever()
+    finally:
+        poller.shutdown()
+
+
+class Supervisor:
+    """Держит по процессу на шард и перераспределяет шарды при сбоях.
+
+    Подписчики дино раскладываются по рабочим процессам кольцом
+    согласованного хэширования. Упавший процесс перезапускается с тем же
+    шардом; если он падает max_restarts раз за restart_window секунд,
+    его слот убирается с кольца, а ключи переходят к соседям, процессы
+    которых перезапускаются с новыми шардами. Раскладка записывается в
+    хранилище контрольных точек.
+    """
+
+    def __init__(
+        self,
+        subscribers: List[Subscriber],
+        store: CheckpointStore,
+        workers: int = SHARD_WORKERS,
+        dyno: int = DYNO_INDEX,
+        target: Callable[[str, List[Subscriber]], None] = run_shard,
+        context: object = None,
+        max_restarts: int = MAX_RESTARTS,
+        restart_window: float = RESTART_WINDOW,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Готовит слоты; процессы запускаются в start."""
+        self.subscribers = {
+            subscriber.key: subscriber for subscriber in subscribers
+        }
+        self.store = store
+        self.dyno = dyno
+        self.slots = [f"worker-{index}" for index in range(max(workers, 1))]
+        self.target = target
+        self.context = context or multiprocessing.get_context("spawn")
+        self.max_restarts = max_restarts
+        self.restart_window = restart_window
+        self._clock = clock
+        self.processes = {}
+        self.shards: Dict[str, List[str]] = {}
+        self._restarts = {slot: deque() for slot in self.slots}
+
+    @property
+    def meta_name(self) -> str:
+        """Имя раскладки шардов в хранилище."""
+        return f"shards:dyno-{self.dyno}"
+
+    def rebalance(self) -> List[str]:
+        """Раскладывает подписчиков по живым слотам.
+
+        Возвращает слоты, чей шард изменился.
+        """
+        shards = HashRing(self.slots).assign(self.subscribers)
+        changed = [
+            slot for slot in self.slots
+            if sorted(shards[slot]) != sorted(self.shards.get(slot, ()))
+        ]
+        self.shards = shards
+        self.store.save_meta(self.meta_name, json.dumps({
+            "slots": self.slots,
+            "shards": shards,
+            "updated_at": int(time.time()),
+        }))
+        return changed
+
+    def _spawn(self, slot: str) -> None:
+        """Запускает процесс для шарда слота."""
+        process = self.context.Process(
+            target=self.target,
+            args=(slot, [self.subscribers[key] for key in self.shards[slot]]),
+            name=f"homework-{slot}",
+            daemon=False,
+        )
+        process.start()
+        self.processes[slot] = process
+        logger.info(
+            "Запущен %s (pid %s), подписчиков: %s",
+            slot, process.pid, len(self.shards[slot]),
+        )
+
+    def _stop(self, slot: str, timeout: float = 10) -> None:
+        """Останавливает процесс слота, давая ему сохранить точки."""
+        process = self.processes.pop(slot, None)
+        if process is None:
+            return
+        if process.is_alive():
+            process.terminate()
+        process.join(timeout)
+        if process.is_alive():
+            logger.error(
+                "%s не завершился за %s с, убиваем", slot, timeout
+            )
+            process.kill()
+            process.join()
+
+    def start(self) -> None:
+        """Раскладывает шарды и запускает все процессы."""
+        self.rebalance()
+        for slot in self.slots:
+            self._spawn(slot)
+
+    def check(self) -> None:
+        """Перезапускает упавшие процессы или убирает их слоты с кольца."""
+        now = self._clock()
+        dropped = []
+        for slot, process in list(self.processes.items()):
+            if process.is_alive():
+                continue
+            logger.error(
+                "%s завершился с кодом %s", slot, process.exitcode
+            )
+            del self.processes[slot]
+            restarts = self._restarts[slot]
+            while restarts and now - restarts[0] > self.restart_window:
+                restarts.popleft()
+            restarts.append(now)
+            if len(restarts) > self.max_restarts and len(self.slots) > 1:
+                dropped.append(slot)
+            else:
+                self._spawn(slot)
+        if not dropped:
+            return
+        for slot in dropped:
+            self.slots.remove(slot)
+            logger.critical(
+                "%s падает слишком часто, его шард перераспределён", slot
+            )
+        for slot in self.rebalance():
+            self._stop(slot)
+            self._spawn(slot)
+
+    def run_forever(self, interval: float = CHECK_INTERVAL) -> None:
+        """Следит за процессами, пока супервизор не остановят."""
+        self.start()
+        while True:
+            time.sleep(interval)
+            self.check()
+
+    def forward_signal(self, signum: int, frame: object) -> None:
+        """Передаёт сигнал всем живым процессам шардов."""
+        for slot, process in list(self.processes.items()):
+            if process.is_alive():
+                logger.info("Передаём сигнал %s в %s", signum, slot)
+                os.kill(process.pid, signum)
+
+    def stop(self) -> None:
+        """Останавливает все процессы."""
+        for slot in list(self.processes):
+            self._stop(slot)
+
+
+def main() -> None:
+    """Запускает по процессу опроса на шард подписчиков этого дино."""
+    subscribers = dyno_subscribers(load_subscribers())
+    if not homework.TELEGRAM_TOKEN or not subscribers:
+        logger.critical(
+            "Не заданы токен бота или подписчики. "
+            "Нет смысла продолжать работу дальше."
+        )
+        sys.exit()
+    store = open_checkpoint_store()
+    if isinstance(store, FileCheckpointStore) and SHARD_WORKERS > 1:
+        logger.critical(
+            "Журнал контрольных точек нельзя делить между процессами, "
+            "используйте CHECKPOINT_STORE=sqlite:<путь>."
+        )
+        sys.exit()
+    supervisor = Supervisor(subscribers, store)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    # сам супервизор ничего не трассирует: SIGUSR1 уходит процессам шардов
+    if hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, supervisor.forward_signal)
+    try:
+        supervisor.run_forever()
+    finally:
+        supervisor.stop()
+        store.close()
+
+
+if __name__ == "__main__":
+    homework.init()
+    setup_logging()
+    main()
@@ -0,0 +1,110 @@
+import threading
+from datetime import datetime
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+STATUS_BITS = 8
+STATUS_MASK = (1 << STATUS_BITS) - 1
+
+
+def _timestamp(value: object) -> int:
+    """Переводит date_updated в секунды; неизвестная дата — 0."""
+    if isinstance(value, int):
+        return value
+    if not isinstance(value, str):
+        return 0
+    try:
+        return int(
+            datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        )
+    except ValueError:
+        return 0
+
+
+class HomeworkStateIndex:
+    """Текущие статусы домашек всех подписчиков в компактном виде.
+
+    У каждого подписчика свой словарь id домашки -> одно целое число, где
+    в младших битах лежит код статуса, а в старших — date_updated в
+    секундах. Строки статусов хранятся один раз в общей таблице, поэтому
+    100 тысяч домашек занимают порядка десятка мегабайт. Ответ API
+    накладывается на индекс как дифф: наружу выходят только настоящие
+    смены статуса, а устаревшие записи отбрасываются.
+    """
+
+    def __init__(self) -> None:
+        """Создаёт пустой индекс."""
+        self._subscribers: Dict[str, Dict[Hashable, int]] = {}
+        self._codes: Dict[str, int] = {}
+        self._statuses: List[str] = []
+        self._lock = threading.Lock()
+        self.transitions = 0
+        self.stale = 0
+
+    def _code(self, status: str) -> int:
+        """Возвращает код статуса, заводя новый при необходимости."""
+        code = self._codes.get(status)
+        if code is None:
+            code = len(self._statuses)
+            if code > STATUS_MASK:
+                raise ValueError("Слишком много разных статусов домашек")
+            self._codes[status] = code
+            self._statuses.append(status)
+        return code
+
+    def apply(self, key: str, records: Sequence[tuple]) -> List[tuple]:
+        """Накладывает записи ответа и возвращает смены статусов.
+
+        Записи и результат упорядочены так же, как в ответе API: от новых
+        к старым. Домашка без id опознаётся по названию.
+        """
+        changed = []
+        with self._lock:
+            state = self._subscribers.setdefault(key, {})
+            for record in reversed(records):
+                homework_id = (
+                    record.name if record.id is None else record.id
+                )
+                packed = (
+                    _timestamp(record.date_updated) << STATUS_BITS
+                    | self._code(record.status)
+                )
+                previous = state.get(homework_id)
+                if previous is not None:
+                    if previous >> STATUS_BITS > packed >> STATUS_BITS:
+                        self.stale += 1
+                        continue
+                    if previous & STATUS_MASK == packed & STATUS_MASK:
+                        state[homework_id] = packed
+                        continue
+                state[homework_id] = packed
+                changed.append(record)
+            self.transitions += len(changed)
+        changed.reverse()
+        return changed
+
+    def get(
+        self, key: str, homework_id: Hashable
+    ) -> Optional[Tuple[str, int]]:
+        """Возвращает статус домашки и её date_updated в секундах."""
+        packed = self._subscribers.get(key, {}).get(homework_id)
+        if packed is None:
+            return None
+        return self._statuses[packed & STATUS_MASK], packed >> STATUS_BITS
+
+    def forget(self, key: str) -> None:
+        """Забывает все домашки подписчика."""
+        with self._lock:
+            self._subscribers.pop(key, None)
+
+    def __len__(self) -> int:
+        """Возвращает число домашек в индексе."""
+        return sum(map(len, self._subscribers.values()))
+
+    def stats(self) -> dict:
+        """Возвращает размер индекса и счётчики диффов."""
+        return {
+            "subscribers": len(self._subscribers),
+            "homeworks": len(self),
+            "transitions": self.transitions,
+            "stale": self.stale,
+        }
@@ -0,0 +1,48 @@
+import hashlib
+import json
+from typing import List, NamedTuple, Optional
+
+from settings import getenv
+
+SUBSCRIBERS_FILE = getenv("SUBSCRIBERS_FILE")
+
+
+class Subscriber(NamedTuple):
+    """Токен Практикума и чат Telegram, куда уходят его статусы."""
+
+    token: str
+    chat_id: str
+
+    @property
+    def key(self) -> str:
+        """Стабильный ключ подписчика, не раскрывающий токен."""
+        digest = hashlib.sha1(self.token.encode()).hexdigest()[:12]
+        return f"{self.chat_id}:{digest}"
+
+    @property
+    def headers(self) -> dict:
+        """Заголовки авторизации для запросов к API Практикума."""
+        return {"Authorization": f"OAuth {self.token}"}
+
+
+def load_subscribers(
+    path: Optional[str] = SUBSCRIBERS_FILE,
+) -> List[Subscriber]:
+    """Загружает подписчиков из JSON-файла или из переменных окружения.
+
+    Файл содержит список объектов вида {"token": ..., "chat_id": ...}.
+    Без файла бот работает с единственной парой PRACTICUM_TOKEN и
+    TELEGRAM_CHAT_ID.
+    """
+    if not path:
+        token = getenv("PRACTICUM_TOKEN")
+        chat_id = getenv("TELEGRAM_CHAT_ID")
+        if not token or not chat_id:
+            return []
+        return [Subscriber(token, chat_id)]
+    with open(path, encoding="utf-8") as config:
+        entries = json.load(config)
+    return [
+        Subscriber(str(entry["token"]), str(entry["chat_id"]))
+        for entry in entries
+    ]
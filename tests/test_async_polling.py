@@ -0,0 +1,86 @@
+import asyncio
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+import async_polling
+import utils
+from exceptions import NotAvailableEndpoint, NoNewStatuses, RequestToAPIError
+
+
+def run_with_api(monkeypatch, status, data, coroutine_factory):
+    async def handler(request):
+        assert request.headers['Authorization'].startswith('OAuth ')
+        assert 'from_date' in request.query
+        return web.json_response(data, status=status)
+
+    async def scenario():
+        app = web.Application()
+        app.router.add_get('/api/user_api/homework_statuses/', handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        monkeypatch.setattr(
+            async_polling.homework, 'ENDPOINT',
+            f'http://127.0.0.1:{port}/api/user_api/homework_statuses/'
+        )
+        try:
+            async with aiohttp.ClientSession() as session:
+                return await coroutine_factory(session)
+        finally:
+            await runner.cleanup()
+
+    return asyncio.run(scenario())
+
+
+class TestAsyncPolling:
+    HEADERS = {'Authorization': 'OAuth sometoken'}
+
+    def test_async_get_api_answer(self, monkeypatch, random_timestamp):
+        data = {'homeworks': [], 'current_date': random_timestamp}
+        result = run_with_api(
+            monkeypatch, 200, data,
+            lambda session: async_polling.async_get_api_answer(
+                session, self.HEADERS, 0
+            )
+        )
+        assert result == data
+
+    def test_async_get_api_answer_not_200(self, monkeypatch):
+        with pytest.raises(NotAvailableEndpoint):
+            run_with_api(
+                monkeypatch, 500, {},
+                lambda session: async_polling.async_get_api_answer(
+                    session, self.HEADERS, 0
+                )
+            )
+
+    def test_async_get_api_answer_connection_error(self, monkeypatch):
+        monkeypatch.setattr(
+            async_polling.homework, 'ENDPOINT', 'http://127.0.0.1:9/'
+        )
+
+        async def scenario():
+            async with aiohttp.ClientSession() as session:
+                await async_polling.async_get_api_answer(
+                    session, self.HEADERS, 0
+                )
+
+        with pytest.raises(RequestToAPIError):
+            asyncio.run(scenario())
+
+    def test_async_check_response_keeps_semantics(self):
+        with pytest.raises(NoNewStatuses):
+            asyncio.run(async_polling.async_check_response(
+                {'homeworks': [], 'current_date': 0}
+            ))
+        with pytest.raises(TypeError):
+            asyncio.run(async_polling.async_check_response([]))
+
+    def test_async_send_message(self):
+        bot = utils.MockTelegramBot()
+        asyncio.run(async_polling.async_send_message(bot, '42', 'Привет'))
+        assert (bot.chat_id, bot.text) == ('42', 'Привет')
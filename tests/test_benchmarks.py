@@ -0,0 +1,52 @@
+from benchmarks import (
+    bench_check_response,
+    bench_cycle,
+    bench_deadlines,
+    bench_decoding,
+    bench_import,
+    bench_state_index,
+)
+
+
+class TestBenchmarks:
+    def test_cycle_benchmark_runs_offline(self, capsys, tmp_path):
+        output = tmp_path / 'cycle.json'
+        results = bench_cycle.run_benchmark(counts=(1, 3), workers=2)
+        assert [result['subscribers'] for result in results] == [1, 3]
+        for result in results:
+            assert result['cycles'] == result['subscribers']
+            assert result['cycles_per_sec'] > 0
+            assert result['p99_ms'] >= result['p50_ms'] > 0
+            assert result['memory_per_subscriber_bytes'] > 0
+        report = bench_cycle.write_results('cycle', results, str(output))
+        assert output.exists() and report['benchmark'] == 'cycle'
+
+    def test_check_response_benchmark_compares_paths(self):
+        results = bench_check_response.run_benchmark(counts=(10,), repeats=1)
+        assert [result['cache'] for result in results] == ['cold', 'warm']
+        for result in results:
+            assert result['legacy_ms'] > 0 and result['records_ms'] > 0
+
+    def test_decoding_benchmark_covers_every_decoder(self):
+        results = bench_decoding.run_benchmark(counts=(5,), chunk_size=64)
+        assert [result['decoder'] for result in results][-1] == 'streaming'
+        assert all(result['peak_bytes'] > 0 for result in results)
+
+    def test_state_index_benchmark_counts_transitions(self):
+        result, = bench_state_index.run_benchmark(counts=(30,))
+        assert result['repeat_transitions'] == 0
+        assert result['diff_transitions'] == 30
+        assert result['bytes_per_homework'] > 0
+
+    def test_import_benchmark_reports_entry_points(self):
+        result, = bench_import.run_benchmark(modules=('homework',), repeats=1)
+        assert result['import_ms'] > 0 and result['heaviest']
+        assert result['loaded'] == []
+
+    def test_deadline_benchmark_cuts_hung_requests(self):
+        unbounded, bounded = bench_deadlines.run_benchmark(
+            deadline=0.2, cycles=4, workers=2,
+            timeout_rate=1, timeout_delay=0.5,
+        )
+        assert unbounded['exceeded'] == 0 and bounded['exceeded'] == 4
+        assert bounded['max_ms'] < unbounded['max_ms']
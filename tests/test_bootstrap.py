@@ -0,0 +1,100 @@
+import logging
+
+import pytest
+import requests
+
+import bootstrap
+import checkpoints
+import homework
+import messages
+import mock_api
+from subscribers import Subscriber
+
+
+class RecordingOutbox:
+    def __init__(self):
+        self.sent = []
+
+    def put(self, chat_id, text):
+        self.sent.append((chat_id, text))
+        return True
+
+
+def record(index, status='approved'):
+    return homework.HomeworkRecord(index, f'hw{index}', status, None)
+
+
+class TestBootstrap:
+    def test_history_is_loaded_with_one_digest_per_chat(self, monkeypatch):
+        subscribers = [Subscriber(f'token{i}', str(i)) for i in range(20)]
+        outbox = RecordingOutbox()
+        store = checkpoints.CheckpointStore()
+        with mock_api.MockPracticumAPI(homeworks_per_token=4) as api:
+            monkeypatch.setattr(homework, 'ENDPOINT', api.endpoint)
+            stats = bootstrap.run_bootstrap(
+                subscribers, outbox, store, concurrency=4
+            )
+        assert stats['subscribers'] == 20 and stats['failed'] == 0
+        assert stats['homeworks'] == 80
+        assert sorted(chat for chat, _ in outbox.sent) == sorted(
+            subscriber.chat_id for subscriber in subscribers
+        ), 'Каждый чат должен получить ровно одну сводку.'
+        assert outbox.sent[0][1].count('\n') == 4
+        assert all(store.load(subscriber.key) for subscriber in subscribers), (
+            'После загрузки истории from_date должен сдвинуться.'
+        )
+
+    def test_failures_are_counted(self, monkeypatch):
+        outbox = RecordingOutbox()
+        with mock_api.MockPracticumAPI(error_rate=1) as api:
+            monkeypatch.setattr(homework, 'ENDPOINT', api.endpoint)
+            stats = bootstrap.run_bootstrap(
+                [Subscriber('token', '1')], outbox,
+                checkpoints.CheckpointStore(),
+                session=requests.Session(),
+            )
+        assert stats['failed'] == 1 and outbox.sent == []
+
+    def test_main_requires_persistent_store(self, monkeypatch, caplog):
+        monkeypatch.setattr(bootstrap.sys, 'argv', ['bootstrap.py'])
+        monkeypatch.setattr(
+            bootstrap, 'open_checkpoint_store', checkpoints.CheckpointStore
+        )
+        monkeypatch.setattr(
+            bootstrap, 'load_subscribers',
+            lambda: [Subscriber('token', '1')],
+        )
+        monkeypatch.setattr(
+            bootstrap, 'run_bootstrap',
+            lambda *args, **kwargs: pytest.fail('история без хранилища'),
+        )
+        with caplog.at_level(logging.CRITICAL), pytest.raises(SystemExit):
+            bootstrap.main()
+        assert 'CHECKPOINT_STORE' in caplog.text, (
+            'Без постоянного хранилища from_date потеряется при выходе.'
+        )
+
+    def test_digest_fits_one_message(self):
+        records = [record(index) for index in range(1000)]
+        message = bootstrap.digest(records)
+        assert len(message) <= bootstrap.MAX_MESSAGE_LENGTH
+        assert message.splitlines()[1] == homework.RENDERER.render(
+            'hw999', 'approved'
+        ), (
+            'Сводка должна идти от старых работ к новым.'
+        )
+        assert message.splitlines()[-1].startswith('…и ещё')
+        assert bootstrap.digest([]) == bootstrap.NO_HISTORY
+
+    def test_digest_uses_message_format(self, monkeypatch):
+        renderer = messages.MessageRenderer(
+            homework.HOMEWORK_VERDICTS, locale='en', fmt='html'
+        )
+        monkeypatch.setattr(homework, 'RENDERER', renderer)
+        message = bootstrap.digest([record('<1>')])
+        assert message.splitlines()[1] == renderer.render(
+            'hw<1>', 'approved'
+        )
+        assert message.parse_mode == 'HTML', (
+            'Сводка должна уходить с той же разметкой, что и уведомления.'
+        )
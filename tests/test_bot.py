@@ -8,6 +8,7 @@ import pytest
 import requests
 import telegram
 
+import scheduler
 import utils
 
 
@@ -588,6 +589,11 @@ class TestHomework:
             )
 
         monkeypatch.setattr(requests, 'get', mock_response_get)
+        # main() ходит в API через пул соединений requests.Session
+        monkeypatch.setattr(
+            requests.Session, 'get',
+            lambda session, *args, **kwargs: requests.get(*args, **kwargs)
+        )
 
     def test_main_without_env_vars_raise_exception(
             self, caplog, monkeypatch, random_timestamp, current_timestamp,
@@ -753,6 +759,161 @@ class TestHomework:
                     'из переменной `HOMEWORK_VERDICTS`.'
                 )
 
+    def test_check_response_returns_records(self, random_timestamp,
+                                            homework_module):
+        response = {
+            'homeworks': [
+                {'id': 2, 'homework_name': 'hw2', 'status': 'approved',
+                 'date_updated': '2020-02-13T14:40:57Z'},
+                {'homework_name': 'hw1', 'status': 'reviewing'},
+            ],
+            'current_date': random_timestamp
+        }
+        records = homework_module.check_response(response)
+        assert records == [
+            (2, 'hw2', 'approved', '2020-02-13T14:40:57Z'),
+            (None, 'hw1', 'reviewing', None),
+        ], 'Домашки без id и даты обновления должны приниматься.'
+        assert records[0].status == 'approved'
+
+    @pytest.mark.parametrize('homework, exception', [
+        ({'status': 'approved'}, 'MissingHomeworkName'),
+        ({'homework_name': 'hw'}, 'MissingHomeworkStatus'),
+        ({'homework_name': 'hw', 'status': 'unknown'},
+         'UnknownHomeworkStatus'),
+        ('hw', 'TypeError'),
+    ])
+    def test_check_response_skips_malformed_homeworks(
+            self, homework, exception, random_timestamp, caplog,
+            homework_module):
+        response = {
+            'homeworks': [
+                {'homework_name': 'hw1', 'status': 'reviewing'}, homework
+            ],
+            'current_date': random_timestamp
+        }
+        errors = homework_module.metrics.ERRORS
+        before = errors.value(exception)
+        with caplog.at_level(logging.ERROR):
+            records = homework_module.check_response(response)
+        assert records == [(None, 'hw1', 'reviewing', None)], (
+            'Одна битая домашка не должна мешать разобрать остальные, '
+            'иначе from_date подписчика не сдвинется.'
+        )
+        assert errors.value(exception) == before + 1
+        assert 'Домашка пропущена' in caplog.text
+        with pytest.raises(Exception) as error:
+            homework_module.homework_record(homework)
+        assert error.type.__name__ == exception
+
+    def test_iter_status_messages(self, homework_module):
+        homeworks = [
+            {'id': 3, 'homework_name': 'hw3', 'status': 'reviewing'},
+            {'id': 2, 'homework_name': 'hw2', 'status': 'approved'},
+            {'id': 2, 'homework_name': 'hw2', 'status': 'approved'},
+            {'id': 1, 'homework_name': 'hw1', 'status': 'rejected'},
+        ]
+        messages = homework_module.iter_status_messages(homeworks)
+        assert inspect.isgenerator(messages), (
+            'Сообщения должны готовиться генератором, без промежуточных '
+            'списков.'
+        )
+        messages = list(messages)
+        assert len(messages) == 3, (
+            'Повторяющиеся домашки не должны порождать повторных сообщений.'
+        )
+        assert ['hw1' in messages[0], 'hw2' in messages[1],
+                'hw3' in messages[2]] == [True] * 3, (
+            'Сообщения должны отправляться от старых статусов к новым.'
+        )
+
+    def test_main_sends_every_homework(self, monkeypatch, random_timestamp,
+                                       current_timestamp, random_message,
+                                       caplog, homework_module):
+        self.mock_main(
+            monkeypatch,
+            random_message,
+            random_timestamp,
+            current_timestamp,
+            homework_module
+        )
+        # интервал после домашки на ревью проверяет отдельный тест
+        monkeypatch.setattr(time, 'sleep', self.interrupt_sleep)
+        data = {
+            'homeworks': [
+                {'homework_name': 'hw2', 'status': 'reviewing'},
+                {'homework_name': 'hw1', 'status': 'approved'},
+            ],
+            'current_date': random_timestamp
+        }
+        monkeypatch.setattr(
+            requests,
+            'get',
+            create_mock_response_get_with_custom_status_and_data(
+                random_timestamp=random_timestamp,
+                http_status=HTTPStatus.OK,
+                data=data
+            )
+        )
+        sent = []
+        monkeypatch.setattr(
+            homework_module,
+            'send_message',
+            lambda bot, message='': sent.append(message)
+        )
+        with pytest.raises(utils.BreakInfiniteLoop):
+            homework_module.main()
+        assert len(sent) == 2, (
+            'Убедитесь, что бот отправляет сообщения по всем домашкам '
+            'из ответа API, а не только по первой.'
+        )
+
+    @staticmethod
+    def interrupt_sleep(secs):
+        raise utils.BreakInfiniteLoop('break')
+
+    def test_main_polls_reviewing_homework_sooner(
+            self, monkeypatch, random_timestamp, current_timestamp,
+            random_message, homework_module):
+        self.mock_main(
+            monkeypatch,
+            random_message,
+            random_timestamp,
+            current_timestamp,
+            homework_module
+        )
+        delays = []
+
+        def record_sleep(secs):
+            delays.append(secs)
+            raise utils.BreakInfiniteLoop('break')
+
+        monkeypatch.setattr(time, 'sleep', record_sleep)
+        data = {
+            'homeworks': [{'homework_name': 'hw1', 'status': 'reviewing'}],
+            'current_date': random_timestamp
+        }
+        monkeypatch.setattr(
+            requests,
+            'get',
+            create_mock_response_get_with_custom_status_and_data(
+                random_timestamp=random_timestamp,
+                http_status=HTTPStatus.OK,
+                data=data
+            )
+        )
+        monkeypatch.setattr(
+            homework_module, 'send_message', lambda bot, message='': None
+        )
+        with pytest.raises(utils.BreakInfiniteLoop):
+            homework_module.main()
+        assert delays == [
+            min(scheduler.REVIEWING_PERIOD, self.RETRY_PERIOD)
+        ], (
+            'Пока последняя домашка на ревью, `main()` должен опрашивать API '
+            'с интервалом планировщика для ревью.'
+        )
+
     def test_docstrings(self, homework_module):
         for func in self.HOMEWORK_FUNC_WITH_PARAMS_QTY:
             utils.check_docstring(homework_module, func)
@@ -0,0 +1,64 @@
+import pytest
+
+import checkpoints
+
+
+class TestCheckpoints:
+    @pytest.mark.parametrize('backend', ['sqlite', 'file'])
+    def test_checkpoint_survives_restart(self, tmp_path, backend,
+                                         random_timestamp):
+        url = f'{backend}:{tmp_path / "checkpoints"}'
+        store = checkpoints.open_checkpoint_store(url, flush_interval=0)
+        store.save('42:abc', random_timestamp)
+        store.close()
+
+        store = checkpoints.open_checkpoint_store(url)
+        assert store.load('42:abc') == random_timestamp, (
+            'Сохранённый `current_date` должен загружаться после перезапуска.'
+        )
+        assert store.load('unknown', 7) == 7
+        store.close()
+
+    def test_writes_are_batched(self, tmp_path):
+        writes = []
+        store = checkpoints.CheckpointStore(flush_interval=3600)
+        store._write = writes.append
+        for i in range(1000):
+            store.save(f'subscriber{i}', i)
+        assert writes == [], (
+            'До истечения интервала изменения не должны писаться на диск.'
+        )
+        store.flush()
+        assert len(writes) == 1 and len(writes[0]) == 1000
+
+    def test_file_log_is_compacted(self, tmp_path):
+        path = tmp_path / 'checkpoints.log'
+        store = checkpoints.FileCheckpointStore(str(path), flush_interval=0)
+        for timestamp in range(20):
+            store.save('42:abc', timestamp)
+        store.close()
+        lines = path.read_text().splitlines()
+        assert len(lines) <= checkpoints.FileCheckpointStore.COMPACT_RATIO, (
+            'Журнал должен переписываться начисто, когда разрастается.'
+        )
+        assert lines[-1] == '42:abc\t19'
+
+    @pytest.mark.parametrize('backend', ['sqlite', 'file'])
+    def test_meta_survives_restart(self, tmp_path, backend):
+        url = f'{backend}:{tmp_path / "checkpoints"}'
+        store = checkpoints.open_checkpoint_store(url)
+        store.save_meta('shards:dyno-0', '{"worker-0": ["42:abc"]}')
+        store.close()
+
+        store = checkpoints.open_checkpoint_store(url)
+        assert store.load_meta('shards:dyno-0') == '{"worker-0": ["42:abc"]}'
+        assert store.load_meta('unknown') is None
+        store.close()
+
+    def test_memory_store_by_default(self):
+        store = checkpoints.open_checkpoint_store(None)
+        assert type(store) is checkpoints.CheckpointStore
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            checkpoints.open_checkpoint_store('redis:localhost')
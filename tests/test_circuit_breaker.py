@@ -0,0 +1,112 @@
+from http import HTTPStatus
+
+import pytest
+import requests
+
+import circuit_breaker
+import utils
+from exceptions import CircuitOpen, NotAvailableEndpoint, RequestToAPIError
+
+HEADERS = {'Authorization': 'OAuth sometoken'}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FlakySession:
+    def __init__(self, status=None):
+        self.status = status
+        self.calls = 0
+
+    def get(self, url, headers=None, params=None, **kwargs):
+        self.calls += 1
+        if self.status is None:
+            raise requests.ConnectionError
+        return utils.MockResponseGET(http_status=self.status)
+
+
+def make_breaker(clock):
+    return circuit_breaker.CircuitBreaker(
+        failure_rate=0.5, window=4, min_calls=4, reset_timeout=30,
+        clock=clock,
+    )
+
+
+class TestCircuitBreaker:
+    def test_opens_on_failure_rate(self):
+        breaker = make_breaker(FakeClock())
+        for success in (True, False, True):
+            breaker.before_call()
+            breaker.record(success)
+        assert breaker.state == circuit_breaker.CLOSED, (
+            'До min_calls запросов автомат не должен открываться.'
+        )
+        breaker.before_call()
+        breaker.record(False)
+        assert breaker.state == circuit_breaker.OPEN
+        with pytest.raises(CircuitOpen):
+            breaker.before_call()
+
+    def test_single_probe_after_timeout(self):
+        clock = FakeClock()
+        breaker = make_breaker(clock)
+        breaker._switch(circuit_breaker.OPEN)
+        clock.now = 29
+        assert breaker.retry_after() == pytest.approx(1)
+        with pytest.raises(CircuitOpen):
+            breaker.before_call()
+        clock.now = 30
+        assert breaker.before_call() is True
+        assert breaker.state == circuit_breaker.HALF_OPEN
+        with pytest.raises(CircuitOpen):
+            breaker.before_call()
+        breaker.record(True)
+        assert breaker.state == circuit_breaker.HALF_OPEN, (
+            'Исход непробного запроса не должен решать судьбу автомата.'
+        )
+        breaker.record(True, probe=True)
+        assert breaker.state == circuit_breaker.CLOSED
+        assert breaker.before_call() is False
+
+    def test_failed_probe_reopens(self):
+        clock = FakeClock()
+        breaker = make_breaker(clock)
+        breaker._switch(circuit_breaker.OPEN)
+        clock.now = 30
+        probe = breaker.before_call()
+        breaker.record(False, probe)
+        assert breaker.state == circuit_breaker.OPEN
+        assert breaker.retry_after() == pytest.approx(30)
+
+    def test_fetch_short_circuits_when_open(self, homework_module):
+        breaker = make_breaker(FakeClock())
+        session = FlakySession()
+        for _ in range(4):
+            with pytest.raises(RequestToAPIError):
+                homework_module.fetch_api_answer(
+                    session, HEADERS, 0, breaker=breaker
+                )
+        with pytest.raises(CircuitOpen):
+            homework_module.fetch_api_answer(
+                session, HEADERS, 0, breaker=breaker
+            )
+        assert session.calls == 4, (
+            'Пока автомат открыт, запросы к API не должны отправляться.'
+        )
+
+    def test_client_errors_do_not_open(self, homework_module):
+        breaker = make_breaker(FakeClock())
+        session = FlakySession(HTTPStatus.UNAUTHORIZED)
+        for _ in range(6):
+            with pytest.raises(NotAvailableEndpoint):
+                homework_module.fetch_api_answer(
+                    session, HEADERS, 0, breaker=breaker
+                )
+        assert breaker.state == circuit_breaker.CLOSED, (
+            'Ответ 4xx говорит о проблеме подписчика, а не API.'
+        )
@@ -0,0 +1,239 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+import telegram
+
+import async_polling
+import checkpoints
+import commands
+import homework
+import messages
+import threaded_polling
+from error_aggregator import ErrorAggregator
+from rate_limit import TokenBucket
+from scheduler import AdaptiveScheduler
+from subscribers import Subscriber
+
+VERDICTS = {'approved': 'Ура!', 'reviewing': 'На проверке.'}
+RENDERER = messages.MessageRenderer(VERDICTS)
+
+
+def record(name, status, date='2020-02-13T14:40:57Z'):
+    return homework.HomeworkRecord(1, name, status, date)
+
+
+def update(update_id, chat_id, text):
+    return SimpleNamespace(
+        update_id=update_id,
+        message=SimpleNamespace(chat_id=chat_id, text=text),
+    )
+
+
+class UpdatesBot:
+    def __init__(self, *batches):
+        self.batches = list(batches)
+        self.offsets = []
+
+    def get_updates(self, offset=None, timeout=0, allowed_updates=None):
+        self.offsets.append(offset)
+        batch = self.batches.pop(0)
+        if isinstance(batch, Exception):
+            raise batch
+        return batch
+
+
+def make_listener(bot, board=None, renderer=RENDERER):
+    replies = []
+    listener = commands.CommandListener(
+        bot, board or commands.StatusBoard(),
+        lambda chat_id, text: replies.append((chat_id, text)),
+        ['1'], renderer,
+    )
+    return listener, replies
+
+
+class TestCommands:
+    def test_status_and_history_come_from_board(self):
+        board = commands.StatusBoard()
+        board.update('1', [record('hw1', 'reviewing')])
+        board.update(
+            '1', [record('hw1', 'approved'), record('hw2', 'reviewing')]
+        )
+        board.update('1', [record('hw1', 'approved')])
+        listener, _ = make_listener(UpdatesBot(), board)
+        assert listener.handle('1', '/status').splitlines() == [
+            RENDERER.render('hw1', 'approved'),
+            RENDERER.render('hw2', 'reviewing'),
+        ]
+        assert listener.handle('1', '/history@homework_bot').splitlines() == [
+            '2020-02-13T14:40:57Z ' + RENDERER.render('hw1', 'reviewing'),
+            '2020-02-13T14:40:57Z ' + RENDERER.render('hw2', 'reviewing'),
+            '2020-02-13T14:40:57Z ' + RENDERER.render('hw1', 'approved'),
+        ], 'В истории должны быть только смены статусов.'
+        assert listener.handle('2', '/status') == commands.NOT_SUBSCRIBED
+        assert listener.handle('1', 'привет') == commands.HELP
+
+    def test_replies_use_message_locale_and_format(self):
+        renderer = messages.MessageRenderer(
+            VERDICTS, locale='en', fmt='markdown'
+        )
+        board = commands.StatusBoard()
+        board.update('1', [record('hw_1', 'approved')])
+        listener, _ = make_listener(UpdatesBot(), board, renderer)
+        status = listener.handle('1', '/status')
+        assert status == renderer.render('hw_1', 'approved'), (
+            'Ответы должны говорить на языке уведомлений.'
+        )
+        history = listener.handle('1', '/history')
+        assert history == (
+            '2020\\-02\\-13T14:40:57Z '
+            + renderer.render('hw_1', 'approved')
+        )
+        assert status.parse_mode == history.parse_mode == 'MarkdownV2'
+
+    def test_plain_text_gets_no_reply(self):
+        bot = UpdatesBot([update(10, 1, 'привет'), update(11, 1, '/help')])
+        listener, replies = make_listener(bot)
+        listener.poll_once()
+        assert replies == [('1', commands.HELP)], (
+            'Бот должен отвечать только на команды.'
+        )
+
+    def test_updates_are_acknowledged(self):
+        bot = UpdatesBot(
+            [update(10, 1, '/status'), update(11, 1, '/pause')],
+            [],
+        )
+        listener, replies = make_listener(bot)
+        listener.poll_once()
+        listener.poll_once()
+        assert bot.offsets == [None, 12]
+        assert replies == [
+            ('1', commands.NO_STATUSES), ('1', commands.PAUSED)
+        ]
+        assert listener.board.paused('1')
+        assert listener.handle('1', '/pause') == commands.RESUMED
+
+    def test_errors_do_not_stop_listener(self, monkeypatch):
+        monkeypatch.setattr(commands, 'ERROR_BACKOFF', 0)
+        done = threading.Event()
+        bot = UpdatesBot(telegram.error.NetworkError('timeout'), [])
+
+        def get_updates(**kwargs):
+            if not bot.batches:
+                done.set()
+                return []
+            return UpdatesBot.get_updates(bot, **kwargs)
+
+        bot.get_updates = get_updates
+        listener, _ = make_listener(bot)
+        listener.start()
+        assert done.wait(1), 'После сбоя getUpdates нужно повторить запрос.'
+        listener.stop()
+
+    def test_broken_update_is_skipped(self):
+        bot = UpdatesBot([update(10, 1, '/status'), update(11, 1, '/pause')])
+        replies = []
+
+        def reply(chat_id, text):
+            if not replies:
+                replies.append(None)
+                raise ValueError('сломанный ответ')
+            replies.append(text)
+
+        listener = commands.CommandListener(
+            bot, commands.StatusBoard(), reply, ['1'], RENDERER
+        )
+        listener.poll_once()
+        assert replies == [None, commands.PAUSED], (
+            'Сбой одной команды не должен терять остальные.'
+        )
+        assert listener.offset == 12
+
+    def test_paused_chat_gets_no_notifications(self, monkeypatch):
+        monkeypatch.setattr(
+            homework, 'fetch_api_answer',
+            lambda *args, **kwargs: {'current_date': 1},
+        )
+        monkeypatch.setattr(
+            homework, 'check_response',
+            lambda answer: [record('hw1', 'approved')],
+        )
+        subscriber = Subscriber('token', '1')
+        poller = threaded_polling.ThreadedPoller(
+            SimpleNamespace(), [subscriber], workers=1
+        )
+        sent = []
+        monkeypatch.setattr(
+            poller.outbox, 'put', lambda chat_id, text: sent.append(text)
+        )
+        poller.board.toggle_pause('1')
+        poller.poll_subscriber(subscriber)
+        poller.shutdown()
+        assert sent == []
+        assert poller.board.statuses('1') == {
+            'hw1': ('approved', '2020-02-13T14:40:57Z')
+        }, 'Пауза не должна мешать обновлять статусы для /status.'
+
+    def test_async_paused_chat_gets_no_notifications(self, monkeypatch):
+        class Stop(Exception):
+            pass
+
+        class OneRoundScheduler(AdaptiveScheduler):
+            def next_delay(self, key):
+                raise Stop
+
+        async def get_api_answer(*args, **kwargs):
+            return {'current_date': 1}
+
+        monkeypatch.setattr(
+            async_polling, 'async_get_api_answer', get_api_answer
+        )
+        monkeypatch.setattr(
+            homework, 'check_response',
+            lambda answer: [record('hw1', 'approved')],
+        )
+        sent = []
+        outbox = SimpleNamespace(put=lambda chat_id, text: sent.append(text))
+        board = commands.StatusBoard()
+        board.toggle_pause('1')
+        polling = homework.PollingContext(
+            outbox.put, checkpoints.CheckpointStore(), OneRoundScheduler(1),
+            ErrorAggregator(lambda text: None), board,
+        )
+        with pytest.raises(Stop):
+            asyncio.run(async_polling.poll_subscriber(
+                None, Subscriber('token', '1'), asyncio.Semaphore(),
+                TokenBucket(100), polling,
+            ))
+        assert sent == []
+        assert board.statuses('1') == {
+            'hw1': ('approved', '2020-02-13T14:40:57Z')
+        }
+
+    def test_async_runner_starts_listener(self, monkeypatch):
+        listeners = []
+
+        class RecordingListener:
+            def __init__(self, bot, board, reply, chats, verdicts):
+                self.chats = chats
+                self.started = self.running = False
+                listeners.append(self)
+
+            def start(self):
+                self.started = self.running = True
+
+            def stop(self):
+                self.running = False
+
+        monkeypatch.setattr(async_polling, 'CommandListener', RecordingListener)
+        asyncio.run(async_polling.run_subscriptions(
+            SimpleNamespace(), [], checkpoints.CheckpointStore(),
+            commands=True,
+        ))
+        assert len(listeners) == 1 and listeners[0].started
+        assert not listeners[0].running, (
+            'Обработчик команд нужно остановить вместе с опросом.'
+        )
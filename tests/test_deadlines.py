@@ -0,0 +1,213 @@
+import asyncio
+import time
+from http import HTTPStatus
+
+import aiohttp
+import pytest
+import requests
+import telegram
+
+import async_polling
+import deadlines
+import homework
+import metrics
+import mock_api
+import threaded_polling
+import utils
+from exceptions import DeadlineExceeded, RequestToAPIError
+from subscribers import Subscriber
+
+HEADERS = {'Authorization': 'OAuth sometoken'}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class SlowSession:
+    def __init__(self, delay=0.0, error=None):
+        self.delay = delay
+        self.error = error
+        self.timeouts = []
+
+    def get(self, url, headers=None, params=None, timeout=None, **kwargs):
+        self.timeouts.append(timeout)
+        if self.error is not None:
+            raise self.error
+        time.sleep(self.delay)
+        response = utils.MockResponseGET(http_status=HTTPStatus.OK)
+        response.json = lambda: {'homeworks': [], 'current_date': 1}
+        return response
+
+
+class DrippingResponse:
+    status_code = HTTPStatus.OK
+    headers = {}
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.closed = False
+
+    def iter_content(self, chunk_size):
+        for chunk in (b'{"homeworks": [', b'], "current_date": 1}'):
+            self.clock.now += 10
+            yield chunk
+
+    def close(self):
+        self.closed = True
+
+
+class TestDeadline:
+    def test_timeouts_are_clipped_to_remaining(self):
+        clock = FakeClock()
+        deadline = deadlines.Deadline(5, connect=3, read=10, clock=clock)
+        assert deadline.timeout() == (3, 5)
+        clock.now = 4.5
+        assert deadline.timeout() == (0.5, 0.5)
+        assert deadline.child(total=10).total == 0.5, (
+            'Вложенный срок не может пережить внешний.'
+        )
+        clock.now = 6
+        assert deadline.expired and deadline.remaining() == 0
+        assert deadline.timeout() == (
+            deadlines.MIN_TIMEOUT, deadlines.MIN_TIMEOUT
+        ), 'Таймаут 0 сделал бы сокет неблокирующим.'
+
+    def test_check_counts_overrun_by_stage(self):
+        clock = FakeClock()
+        deadline = deadlines.Deadline(1, clock=clock)
+        deadline.check()
+        before = metrics.DEADLINE_EXCEEDED.value('queue')
+        clock.now = 1
+        with pytest.raises(DeadlineExceeded):
+            deadline.check('queue')
+        assert metrics.DEADLINE_EXCEEDED.value('queue') == before + 1
+
+
+class TestFetchDeadlines:
+    def test_every_request_has_timeouts(self):
+        session = SlowSession()
+        homework.fetch_api_answer(session, HEADERS, 0)
+        homework.fetch_api_answer(
+            session, HEADERS, 0, deadline=deadlines.Deadline(1, connect=2)
+        )
+        default, clipped = session.timeouts
+        assert default == (
+            deadlines.API_CONNECT_TIMEOUT, deadlines.API_READ_TIMEOUT
+        ), 'Без срока запрос всё равно не должен висеть вечно.'
+        assert clipped[0] <= 1 and clipped[1] <= 1
+
+    def test_get_api_answer_passes_timeout(self, monkeypatch):
+        calls = []
+
+        def get(*args, **kwargs):
+            calls.append(kwargs)
+            raise requests.ConnectionError
+
+        monkeypatch.setattr(requests, 'get', get)
+        with pytest.raises(RequestToAPIError):
+            homework.get_api_answer(0)
+        assert calls[0]['timeout'][1] <= deadlines.API_READ_TIMEOUT
+
+    def test_timeout_is_reported_as_overrun(self):
+        before = metrics.DEADLINE_EXCEEDED.value('api')
+        with pytest.raises(DeadlineExceeded) as error:
+            homework.fetch_api_answer(
+                SlowSession(error=requests.ReadTimeout()), HEADERS, 0
+            )
+        assert isinstance(error.value, RequestToAPIError), (
+            'Превышение срока — тоже сбой API для сводок и отсрочки опроса.'
+        )
+        assert homework.describe_error(error.value) == (
+            homework.EXCEPTION_ERROR_MESSAGES[DeadlineExceeded]
+        )
+        assert metrics.DEADLINE_EXCEEDED.value('api') == before + 1
+
+    def test_late_answer_is_discarded(self):
+        with pytest.raises(DeadlineExceeded):
+            homework.fetch_api_answer(
+                SlowSession(delay=0.05), HEADERS, 0,
+                deadline=deadlines.Deadline(0.01),
+            )
+
+    @pytest.mark.parametrize('streaming', [True, False])
+    def test_slow_stream_is_cancelled(self, streaming):
+        clock = FakeClock()
+        response = DrippingResponse(clock)
+        session = SlowSession()
+        session.get = lambda *args, **kwargs: response
+        with pytest.raises(DeadlineExceeded):
+            homework.fetch_api_answer(
+                session, HEADERS, 0, streaming=streaming,
+                deadline=deadlines.Deadline(15, clock=clock),
+            )
+        assert response.closed
+
+    def test_hung_api_is_cancelled_on_time(self):
+        with mock_api.MockPracticumAPI(
+            timeout_rate=1, timeout_delay=2
+        ) as api:
+            endpoint, homework.ENDPOINT = homework.ENDPOINT, api.endpoint
+            try:
+                started = time.monotonic()
+                with pytest.raises(DeadlineExceeded):
+                    homework.fetch_api_answer(
+                        requests.Session(), HEADERS, 0,
+                        deadline=deadlines.Deadline(0.2),
+                    )
+                assert time.monotonic() - started < 1
+            finally:
+                homework.ENDPOINT = endpoint
+
+
+class TestRunnerDeadlines:
+    def test_async_request_is_cancelled(self, monkeypatch):
+        api = mock_api.MockPracticumAPI(timeout_rate=1, timeout_delay=2)
+        monkeypatch.setattr(homework, 'ENDPOINT', api.endpoint)
+
+        async def scenario():
+            async with aiohttp.ClientSession() as session:
+                await async_polling.async_get_api_answer(
+                    session, HEADERS, 0,
+                    deadline=deadlines.Deadline(0.2, read=5),
+                )
+
+        with api:
+            started = time.monotonic()
+            with pytest.raises(DeadlineExceeded):
+                asyncio.run(scenario())
+            assert time.monotonic() - started < 1
+
+    def test_round_cancels_queued_polls(self):
+        subscribers = [Subscriber(f'token{i}', str(i)) for i in range(4)]
+        poller = threaded_polling.ThreadedPoller(
+            utils.MockTelegramBot(), subscribers, workers=1,
+            session=SlowSession(delay=0.2),
+        )
+        before = metrics.DEADLINE_EXCEEDED.value('queue')
+        poller.run_round(deadline=deadlines.Deadline(0.1))
+        poller.shutdown()
+        assert metrics.DEADLINE_EXCEEDED.value('queue') - before == 3, (
+            'Опросы, не начавшиеся до конца срока раунда, надо отменить.'
+        )
+        assert len(poller.session.timeouts) == 1
+        assert poller.stats()['deadline_exceeded']['queue'] >= 3
+
+    def test_send_timeout_is_counted(self):
+        calls = []
+
+        class HangingBot:
+            def send_message(self, chat_id, text, timeout=None, **kwargs):
+                calls.append(timeout)
+                raise telegram.error.TimedOut()
+
+        before = metrics.DEADLINE_EXCEEDED.value('send')
+        homework.deliver_message(HangingBot(), '1', 'текст')
+        assert 0 < calls[0] <= deadlines.TELEGRAM_READ_TIMEOUT, (
+            'Отправка в Telegram тоже должна ждать ответа ограниченное время.'
+        )
+        assert metrics.DEADLINE_EXCEEDED.value('send') == before + 1
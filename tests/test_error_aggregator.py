@@ -0,0 +1,141 @@
+from http import HTTPStatus
+
+import error_aggregator
+import threaded_polling
+import utils
+from exceptions import (
+    NotAvailableEndpoint,
+    RequestRejected,
+    RequestToAPIError,
+)
+from subscribers import Subscriber
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class BrokenApiSession:
+    def __init__(self, status=HTTPStatus.BAD_GATEWAY):
+        self.status = status
+
+    def get(self, url, headers=None, params=None, **kwargs):
+        return utils.MockResponseGET(http_status=self.status)
+
+
+class RecordingBot:
+    def __init__(self):
+        self.sent = []
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        self.sent.append((chat_id, text))
+
+
+def make_aggregator(window=60):
+    sent = []
+    clock = FakeClock()
+    aggregator = error_aggregator.ErrorAggregator(
+        sent.append, window=window, clock=clock
+    )
+    return aggregator, sent, clock
+
+
+class TestErrorAggregator:
+    def test_summary_counts_failures_and_subscribers(self):
+        aggregator, sent, clock = make_aggregator()
+        for key in ('1', '2', '2'):
+            aggregator.record(key, NotAvailableEndpoint(), 'API недоступен')
+        aggregator.record('3', RequestToAPIError(), 'Сбой запроса')
+        assert aggregator.flush() is None, (
+            'Сводка не должна отправляться до конца окна.'
+        )
+        clock.now = 60
+        aggregator.flush()
+        assert sent == [
+            'API недоступен (сбоев: 3, подписчиков: 2)\nСбой запроса'
+        ]
+
+    def test_same_failures_are_not_repeated(self):
+        aggregator, sent, clock = make_aggregator()
+        for window in range(1, 4):
+            aggregator.record('1', NotAvailableEndpoint(), 'API недоступен')
+            clock.now = 60 * window
+            aggregator.flush()
+        assert len(sent) == 1, (
+            'Пока набор классов сбоев не меняется, сводка не повторяется.'
+        )
+        aggregator.record('1', RequestToAPIError(), 'Сбой запроса')
+        clock.now = 240
+        aggregator.flush()
+        assert sent[-1] == 'Сбой запроса'
+
+    def test_recovery_is_announced_once(self):
+        aggregator, sent, _ = make_aggregator(window=0)
+        aggregator.record_success('1')
+        assert aggregator.flush() is None, (
+            'Без предшествующих сбоев сообщать о восстановлении нечего.'
+        )
+        aggregator.record('1', NotAvailableEndpoint(), 'API недоступен')
+        aggregator.flush()
+        assert aggregator.failing == {'NotAvailableEndpoint'}
+        aggregator.flush()
+        aggregator.record_success('1')
+        aggregator.flush()
+        aggregator.record_success('1')
+        aggregator.flush()
+        assert sent == ['API недоступен', error_aggregator.RECOVERED_MESSAGE]
+        assert not aggregator.failing
+
+    def test_api_errors_are_coalesced_in_poller(self):
+        aggregator, sent, _ = make_aggregator(window=0)
+        bot = RecordingBot()
+        subscribers = [Subscriber(f'token{i}', str(i)) for i in range(5)]
+        poller = threaded_polling.ThreadedPoller(
+            bot, subscribers, workers=3, session=BrokenApiSession(),
+            errors=aggregator,
+        )
+        poller.run_round()
+        poller.shutdown()
+        assert bot.sent == [], (
+            'Сбой API не должен рассылаться каждому подписчику.'
+        )
+        assert len(sent) == 1
+        assert 'подписчиков: 5' in sent[0]
+
+    def test_rejected_token_is_reported_to_subscriber(self):
+        aggregator, _, _ = make_aggregator(window=0)
+        bot = RecordingBot()
+        subscribers = [Subscriber('revoked', '1')]
+        poller = threaded_polling.ThreadedPoller(
+            bot, subscribers, workers=1,
+            session=BrokenApiSession(HTTPStatus.UNAUTHORIZED),
+            errors=aggregator,
+        )
+        poller.run_round()
+        poller.shutdown()
+        assert [chat for chat, _ in bot.sent] == ['1'], (
+            'Ответ 4xx касается токена подписчика, ему и надо сообщить.'
+        )
+        assert not error_aggregator.is_api_error(RequestRejected())
+        assert error_aggregator.is_api_error(NotAvailableEndpoint())
+
+    def test_recovery_is_tracked_per_failure_class(self):
+        aggregator, sent, _ = make_aggregator(window=0)
+        aggregator.record('1', NotAvailableEndpoint(), 'API недоступен')
+        aggregator.record('2', RequestRejected(), 'Токен отклонён')
+        aggregator.flush()
+        aggregator.record('2', RequestRejected(), 'Токен отклонён')
+        aggregator.record_success('1')
+        aggregator.flush()
+        assert sent[-1] == error_aggregator.RECOVERED_GROUP.format(
+            'API недоступен'
+        ), 'Постоянный сбой одного подписчика не должен скрывать остальные.'
+        assert aggregator.failing == {'RequestRejected'}
+        aggregator.record_success('2')
+        aggregator.flush()
+        assert sent[-1] == error_aggregator.RECOVERED_MESSAGE
+        assert len(sent) == 3
@@ -0,0 +1,79 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import http_client
+import mock_api
+
+
+@pytest.fixture
+def local_server():
+    api = mock_api.MockPracticumAPI().start()
+    yield api.endpoint
+    api.stop()
+
+
+class ServiceUnavailable(BaseHTTPRequestHandler):
+    hits = 0
+
+    def do_GET(self):
+        type(self).hits += 1
+        self.send_response(503)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def unavailable_server():
+    ServiceUnavailable.hits = 0
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ServiceUnavailable)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{server.server_port}/'
+    server.shutdown()
+    server.server_close()
+
+
+class TestHttpClient:
+    def test_build_session_mounts_pooled_adapter(self):
+        session = http_client.build_session(
+            pool_connections=2, pool_maxsize=7, max_retries=5
+        )
+        adapter = session.get_adapter('https://practicum.yandex.ru/')
+        assert adapter._pool_maxsize == 7, (
+            'Проверьте, что размер пула соединений настраивается.'
+        )
+        assert adapter.max_retries.total == 5, (
+            'Проверьте, что к адаптеру подключены повторы запросов.'
+        )
+
+    def test_connection_stats_of_new_session(self):
+        session = http_client.build_session()
+        assert http_client.connection_stats(session) == {
+            'opened': 0, 'reused': 0, 'requests': 0
+        }
+
+    def test_connection_is_reused(self, local_server):
+        session = http_client.build_session()
+        for _ in range(3):
+            session.get(
+                local_server,
+                headers={'Authorization': 'OAuth sometoken'},
+                params={'from_date': 0},
+            ).json()
+        stats = http_client.connection_stats(session)
+        assert stats['opened'] == 1, (
+            'Убедитесь, что сессия держит keep-alive соединение.'
+        )
+        assert stats['reused'] == 2
+
+    def test_status_retries_can_be_disabled(self, unavailable_server):
+        session = http_client.build_session(status_retries=False)
+        response = session.get(unavailable_server, timeout=1)
+        assert response.status_code == 503
+        assert ServiceUnavailable.hits == 1, (
+            'Под сроком ответ 503 не должен повторяться внутри get.'
+        )
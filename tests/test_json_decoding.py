@@ -0,0 +1,110 @@
+import json
+
+import pytest
+import requests
+
+import json_decoding
+import mock_api
+
+BODY = {
+    'homeworks': [
+        {
+            'id': 2,
+            'status': 'approved',
+            'homework_name': 'Проект спринта',
+            'reviewer_comment': 'Всё нравится ' * 20,
+            'date_updated': '2020-02-13T14:40:57Z',
+            'lesson_name': 'Итоговый проект',
+        },
+        {'homework_name': 'hw1', 'status': 'reviewing'},
+    ],
+    'current_date': 1581604970,
+    'extra': {'nested': [1, 2, {'homeworks': 'не те'}]},
+}
+
+
+def split(data, size):
+    return [data[index:index + size] for index in range(0, len(data), size)]
+
+
+class FakeResponse:
+    def __init__(self, content=None, data=None):
+        if content is not None:
+            self.content = content
+        self.data = data
+
+    def json(self):
+        return self.data
+
+
+class TestJsonDecoding:
+    def test_auto_backend_falls_back_to_stdlib(self, monkeypatch):
+        real_import = json_decoding.importlib.import_module
+
+        def import_module(name):
+            if name in ('orjson', 'ujson'):
+                raise ImportError(name)
+            return real_import(name)
+
+        monkeypatch.setattr(
+            json_decoding.importlib, 'import_module', import_module
+        )
+        name, loads = json_decoding.load_backend('auto')
+        assert name == 'json' and loads is json.loads
+
+    def test_explicit_backend_must_be_installed(self):
+        with pytest.raises(ImportError):
+            json_decoding.load_backend('no_such_json_module')
+
+    def test_decode_response(self):
+        content = json.dumps(BODY, ensure_ascii=False).encode()
+        assert json_decoding.decode_response(FakeResponse(content)) == BODY
+        assert json_decoding.decode_response(
+            FakeResponse(data={'homeworks': []})
+        ) == {'homeworks': []}, 'Заглушки без content разбираются через json().'
+
+    @pytest.mark.parametrize('size', [1, 7, 4096])
+    def test_extract_statuses_keeps_only_needed_fields(self, size):
+        content = json.dumps(BODY, ensure_ascii=False, indent=2).encode()
+        result = json_decoding.extract_statuses(split(content, size))
+        assert result == {
+            'homeworks': [
+                {
+                    'id': 2,
+                    'homework_name': 'Проект спринта',
+                    'status': 'approved',
+                    'date_updated': '2020-02-13T14:40:57Z',
+                },
+                {'homework_name': 'hw1', 'status': 'reviewing'},
+            ],
+            'current_date': 1581604970,
+        }
+
+    def test_number_split_between_chunks(self):
+        result = json_decoding.extract_statuses(
+            [b'{"homeworks": [], "current_date": 15', b'81604970}']
+        )
+        assert result['current_date'] == 1581604970
+
+    def test_not_an_object_is_returned_as_is(self):
+        assert json_decoding.extract_statuses([b'[1, ', b'2]']) == [1, 2]
+
+    def test_truncated_body_raises(self):
+        content = json.dumps(BODY).encode()
+        with pytest.raises(ValueError):
+            json_decoding.extract_statuses(split(content[:-20], 16))
+
+    def test_streaming_fetch_matches_regular(self, monkeypatch,
+                                             homework_module):
+        with mock_api.MockPracticumAPI(homeworks_per_token=5) as api:
+            monkeypatch.setattr(homework_module, 'ENDPOINT', api.endpoint)
+            session = requests.Session()
+            headers = {'Authorization': 'OAuth sometoken'}
+            regular = homework_module.fetch_api_answer(session, headers, 0)
+            streamed = homework_module.fetch_api_answer(
+                session, headers, 0, streaming=True
+            )
+        assert homework_module.check_response(streamed) == (
+            homework_module.check_response(regular)
+        )
+        assert 'lesson_name' not in streamed['homeworks'][0]
@@ -0,0 +1,56 @@
+import io
+import json
+import logging
+
+import pytest
+
+import log_config
+
+
+@pytest.fixture
+def restore_root_logger():
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield
+    root.handlers[:] = handlers
+    root.setLevel(level)
+
+
+class TestLogConfig:
+    def test_records_are_written_by_listener(self, restore_root_logger):
+        stream = io.StringIO()
+        listener = log_config.setup_logging('INFO', stream=stream)
+        assert isinstance(
+            logging.getLogger().handlers[0], log_config.DeferredQueueHandler
+        ), 'Корневой логгер должен писать в очередь.'
+        logging.getLogger('homework').info('Статус %s', 'approved')
+        logging.getLogger('homework').debug('Не должно попасть в лог')
+        listener.stop()
+        output = stream.getvalue()
+        assert '[INFO] - Статус approved' in output
+        assert 'Не должно' not in output
+
+    def test_json_output_keeps_extra_fields(self, restore_root_logger):
+        stream = io.StringIO()
+        listener = log_config.setup_logging(
+            'INFO', json_output=True, stream=stream
+        )
+        logging.getLogger('threaded_polling').error(
+            '%s: %s', '42:abc', 'Эндпоинт недоступен',
+            extra={'subscriber': '42:abc'},
+        )
+        listener.stop()
+        record = json.loads(stream.getvalue())
+        assert record['message'] == '42:abc: Эндпоинт недоступен'
+        assert record['level'] == 'ERROR'
+        assert record['subscriber'] == '42:abc'
+
+    def test_message_is_not_formatted_on_caller_thread(self):
+        handler = log_config.DeferredQueueHandler(None)
+        record = logging.LogRecord(
+            'homework', logging.INFO, __file__, 1, 'Статус %s', ('x',), None
+        )
+        prepared = handler.prepare(record)
+        assert prepared.args == ('x',), (
+            'Форматирование должно выполняться в потоке QueueListener.'
+        )
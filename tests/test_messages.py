@@ -0,0 +1,90 @@
+import json
+
+import pytest
+
+import messages
+import send_queue
+
+VERDICTS = {
+    'approved': 'Работа проверена: ревьюеру всё понравилось. Ура!',
+    'reviewing': 'Работа взята на проверку ревьюером.',
+    'rejected': 'Работа проверена: у ревьюера есть замечания.',
+}
+
+
+class RecordingBot:
+    def __init__(self):
+        self.sent = []
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        self.sent.append((text, kwargs.get('parse_mode')))
+
+
+class TestMessageRenderer:
+    def test_plain_matches_legacy_message(self):
+        renderer = messages.MessageRenderer(VERDICTS, 'ru', 'plain', None)
+        for status, verdict in VERDICTS.items():
+            assert renderer.render('hw_1', status) == (
+                f'Изменился статус проверки работы "hw_1". {verdict}'
+            )
+        assert renderer.statuses == VERDICTS.keys()
+        with pytest.raises(KeyError):
+            renderer.render('hw_1', 'unknown')
+
+    def test_locales(self):
+        renderer = messages.MessageRenderer(VERDICTS, 'en', 'plain', None)
+        assert renderer.render('hw', 'approved').startswith(
+            'The review status of "hw"'
+        )
+        assert renderer.render('hw', 'approved', 'ru').endswith('Ура!')
+
+    def test_markup_escapes_name_and_template(self):
+        renderer = messages.MessageRenderer(VERDICTS, 'ru', 'html', None)
+        message = renderer.render('<a & b>', 'reviewing')
+        assert message.startswith(
+            'Изменился статус проверки работы "<b>&lt;a &amp; b&gt;</b>".'
+        )
+        assert messages.send_options(message) == {'parse_mode': 'HTML'}
+        renderer = messages.MessageRenderer(VERDICTS, 'ru', 'markdown', None)
+        message = renderer.render('hw_1.py', 'approved')
+        assert '*hw\\_1\\.py*' in message
+        assert message.endswith('Ура\\!')
+        assert messages.send_options('просто текст') == {}
+
+    def test_rendered_messages_are_memoized(self):
+        renderer = messages.MessageRenderer(VERDICTS, 'ru', 'plain', None)
+        first = renderer.render('hw', 'approved')
+        assert renderer.render('hw', 'approved') is first
+        assert renderer.stats()['hits'] == 1
+
+    def test_operator_statuses_from_file(self, tmp_path):
+        path = tmp_path / 'templates.json'
+        path.write_text(json.dumps({
+            'templates': {'de': 'Status von "{name}": {verdict}'},
+            'verdicts': {
+                'ru': {'on_hold': 'Проверка отложена.'},
+                'de': {'approved': 'Angenommen.'},
+            },
+        }), encoding='utf-8')
+        renderer = messages.MessageRenderer(VERDICTS, 'ru', 'plain', path)
+        assert 'on_hold' in renderer.statuses
+        assert renderer.render('hw', 'on_hold').endswith('Проверка отложена.')
+        assert renderer.render('hw', 'approved', 'de') == (
+            'Status von "hw": Angenommen.'
+        )
+        assert renderer.render('hw', 'on_hold', 'de').endswith('отложена.'), (
+            'Вердикт без перевода должен браться из русского каталога.'
+        )
+
+    def test_outbox_keeps_markup_apart(self):
+        renderer = messages.MessageRenderer(VERDICTS, 'ru', 'html', None)
+        bot = RecordingBot()
+        outbox = send_queue.OutboundQueue(bot, coalesce_window=60)
+        outbox.start()
+        outbox.put('1', renderer.render('hw1', 'approved'))
+        outbox.put('1', renderer.render('hw2', 'rejected'))
+        outbox.put('1', 'Эндпоинт недоступен')
+        outbox.stop()
+        assert [parse_mode for _, parse_mode in bot.sent] == ['HTML', None], (
+            'Размеченные и простые сообщения не должны склеиваться.'
+        )
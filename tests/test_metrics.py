@@ -0,0 +1,71 @@
+import urllib.request
+
+import metrics
+
+
+class TestMetrics:
+    def test_counter_and_histogram_render(self):
+        registry = metrics.Registry()
+        counter = registry.register(
+            metrics.Counter('test_errors_total', 'Ошибки.', ('exception',))
+        )
+        histogram = registry.register(metrics.Histogram(
+            'test_latency_seconds', 'Задержка.', buckets=(0.1, 1)
+        ))
+        counter.inc('NotAvailableEndpoint')
+        counter.inc('NotAvailableEndpoint')
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        histogram.observe(5)
+        text = registry.render()
+        assert 'test_errors_total{exception="NotAvailableEndpoint"} 2' in text
+        assert 'test_latency_seconds_bucket{le="0.1"} 1' in text
+        assert 'test_latency_seconds_bucket{le="1"} 2' in text
+        assert 'test_latency_seconds_bucket{le="+Inf"} 3' in text
+        assert 'test_latency_seconds_count 3' in text
+        assert '# TYPE test_latency_seconds histogram' in text
+
+    def test_lag_gauge(self):
+        gauge = metrics.LagGauge('test_lag_seconds', 'Отставание.', ('key',))
+        gauge.mark('42:abc')
+        (_, labels, lag), = gauge.samples()
+        assert labels == '{key="42:abc"}'
+        assert 0 <= lag < 5
+
+    def test_every_known_exception_is_exported(self, homework_module):
+        text = metrics.REGISTRY.render()
+        for exception_class in homework_module.EXCEPTION_ERROR_MESSAGES:
+            assert (
+                f'exception="{exception_class.__name__}"' in text
+            ), 'Счётчики должны быть у каждого класса исключений.'
+
+    def test_pipeline_is_instrumented(self, monkeypatch, homework_module):
+        import requests
+        import utils
+        api_calls = metrics.API_LATENCY.count()
+        sends = metrics.SEND_LATENCY.count()
+        sent = metrics.MESSAGES_SENT.value()
+        monkeypatch.setattr(
+            requests, 'get',
+            lambda *args, **kwargs: utils.MockResponseGET(
+                random_timestamp=1
+            ),
+        )
+        homework_module.get_api_answer(0)
+        homework_module.send_message(utils.MockTelegramBot(), 'Привет')
+        assert metrics.API_LATENCY.count() == api_calls + 1
+        assert metrics.SEND_LATENCY.count() == sends + 1
+        assert metrics.MESSAGES_SENT.value() == sent + 1
+
+    def test_metrics_endpoint(self):
+        server = metrics.start_metrics_server(0)
+        try:
+            port = server.server_address[1]
+            with urllib.request.urlopen(
+                f'http://127.0.0.1:{port}/metrics'
+            ) as response:
+                body = response.read().decode()
+            assert 'homework_api_request_seconds' in body
+        finally:
+            server.shutdown()
+            server.server_close()
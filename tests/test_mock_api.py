@@ -0,0 +1,92 @@
+import pytest
+import requests
+
+import mock_api
+from exceptions import NotAvailableEndpoint
+
+HEADERS = {'Authorization': 'OAuth sometoken'}
+
+
+@pytest.fixture
+def api_factory(monkeypatch, homework_module):
+    servers = []
+
+    def start(**kwargs):
+        api = mock_api.MockPracticumAPI(seed=1, **kwargs).start()
+        servers.append(api)
+        monkeypatch.setattr(homework_module, 'ENDPOINT', api.endpoint)
+        return api
+
+    yield start
+    for api in servers:
+        api.stop()
+
+
+class TestMockPracticumAPI:
+    def test_from_date_semantics(self, api_factory, homework_module):
+        api_factory(homeworks_per_token=4)
+        session = requests.Session()
+        full = homework_module.fetch_api_answer(session, HEADERS, 0)
+        homework_module.check_response(full)
+        assert len(full['homeworks']) == 4
+        dates = [homework['date_updated'] for homework in full['homeworks']]
+        assert dates == sorted(dates, reverse=True), (
+            'Домашки должны идти от новых к старым, как в API Практикума.'
+        )
+        fresh = homework_module.fetch_api_answer(
+            session, HEADERS, full['current_date'] + 1
+        )
+        assert fresh['homeworks'] == [], (
+            'Домашки, не менявшиеся после `from_date`, не возвращаются.'
+        )
+
+    def test_statuses_change_over_time(self):
+        stream = mock_api.SyntheticStream('token', 1, 10, epoch=0)
+        first = stream.statuses(now=100, from_date=0)[0]['status']
+        second = stream.statuses(now=110, from_date=0)[0]['status']
+        assert first != second
+
+    def test_requires_authorization(self, api_factory):
+        api = api_factory()
+        response = requests.get(api.endpoint, params={'from_date': 0})
+        assert response.status_code == 401
+        assert response.json()['code'] == 'not_authenticated'
+
+    def test_error_injection(self, api_factory, homework_module):
+        api = api_factory(error_rate=1)
+        with pytest.raises(NotAvailableEndpoint):
+            homework_module.fetch_api_answer(requests, HEADERS, 0)
+        assert api.injected['error'] == 1
+
+    def test_malformed_json(self, api_factory, homework_module):
+        api_factory(malformed_rate=1)
+        with pytest.raises(ValueError):
+            homework_module.fetch_api_answer(requests, HEADERS, 0)
+
+    def test_timeout(self, api_factory):
+        api = api_factory(timeout_rate=1, timeout_delay=0.5)
+        with pytest.raises(requests.Timeout):
+            requests.get(
+                api.endpoint, headers=HEADERS, params={'from_date': 0},
+                timeout=0.1,
+            )
+        assert api.injected['timeout'] == 1
+
+    def test_latency(self, api_factory):
+        api = api_factory(latency=0.05)
+        response = requests.get(
+            api.endpoint, headers=HEADERS, params={'from_date': 0}
+        )
+        assert response.elapsed.total_seconds() >= 0.05
+
+    def test_endpoint_from_environment(self, monkeypatch):
+        import importlib
+        import homework
+        monkeypatch.setenv('PRACTICUM_ENDPOINT', 'http://127.0.0.1:1/api/')
+        try:
+            assert importlib.reload(homework).ENDPOINT == (
+                'http://127.0.0.1:1/api/'
+            )
+        finally:
+            monkeypatch.delenv('PRACTICUM_ENDPOINT')
+            importlib.reload(homework)
@@ -0,0 +1,71 @@
+import notification_cache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestNotificationCache:
+    def test_repeat_is_suppressed(self):
+        cache = notification_cache.NotificationCache()
+        key = ('42:abc', 1, 'approved', '2020-02-13T14:40:57Z')
+        assert not cache.seen(key)
+        assert cache.seen(key), (
+            'Повторное уведомление должно распознаваться кэшем.'
+        )
+        assert cache.stats()['hits'] == 1
+
+    def test_lru_eviction(self):
+        cache = notification_cache.NotificationCache(maxsize=2)
+        cache.seen('a')
+        cache.seen('b')
+        cache.seen('a')
+        cache.seen('c')
+        assert len(cache) == 2
+        assert cache.stats()['evictions'] == 1
+        assert cache.seen('a'), 'Недавно использованная запись должна жить.'
+        assert not cache.seen('b'), 'Вытесняется самая старая запись.'
+
+    def test_ttl_expiration(self):
+        clock = FakeClock()
+        cache = notification_cache.NotificationCache(ttl=10, clock=clock)
+        cache.seen('a')
+        clock.now = 11
+        assert not cache.seen('a'), 'Запись должна забываться по TTL.'
+        assert cache.stats()['expirations'] == 1
+
+    def test_seen_many_matches_seen(self):
+        keys = ['a', 'b', 'a', 'c', 'd']
+        batch = notification_cache.NotificationCache(maxsize=3)
+        one_by_one = notification_cache.NotificationCache(maxsize=3)
+        assert batch.seen_many(keys) == [
+            one_by_one.seen(key) for key in keys
+        ] == [False, False, True, False, False], (
+            'Пачка должна проверяться так же, как ключи по одному.'
+        )
+        assert batch.stats() == one_by_one.stats()
+        assert batch.seen_many(['b', 'a']) == [False, True], (
+            'После пачки в кэше остаются самые свежие записи.'
+        )
+
+    def test_status_messages_deduplicated_across_cycles(self,
+                                                       homework_module):
+        cache = notification_cache.NotificationCache()
+        homeworks = [{'id': 1, 'homework_name': 'hw', 'status': 'approved'}]
+        first = list(homework_module.iter_status_messages(
+            homeworks, cache, '42:abc'
+        ))
+        second = list(homework_module.iter_status_messages(
+            homeworks, cache, '42:abc'
+        ))
+        other = list(homework_module.iter_status_messages(
+            homeworks, cache, '43:def'
+        ))
+        assert len(first) == 1 and second == [], (
+            'Повторный статус не должен отправляться подписчику снова.'
+        )
+        assert len(other) == 1, 'Кэш не должен смешивать подписчиков.'
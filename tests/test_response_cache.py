@@ -0,0 +1,90 @@
+import json
+from http import HTTPStatus
+
+import pytest
+
+import metrics
+import response_cache
+from exceptions import NoNewStatuses
+
+HEADERS = {'Authorization': 'OAuth sometoken'}
+
+
+class FakeResponse:
+    def __init__(self, status_code, content=b'', headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+
+class FakeSession:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.sent_headers = []
+
+    def get(self, url, headers=None, params=None, **kwargs):
+        self.sent_headers.append(headers)
+        return self.responses.pop(0)
+
+
+class TestResponseCache:
+    def test_validators_become_conditional_headers(self):
+        cache = response_cache.ResponseCache()
+        assert cache.conditional_headers('42:abc', HEADERS) is HEADERS
+        cache.unchanged('42:abc', 200, {
+            'ETag': '"v1"', 'Last-Modified': 'Thu, 13 Feb 2020 14:40:57 GMT'
+        }, b'{}')
+        headers = cache.conditional_headers('42:abc', HEADERS)
+        assert headers['If-None-Match'] == '"v1"'
+        assert headers['If-Modified-Since'].startswith('Thu')
+        assert 'If-None-Match' not in HEADERS, (
+            'Общие заголовки подписчика не должны меняться.'
+        )
+
+    def test_same_body_is_skipped_and_counted(self):
+        cache = response_cache.ResponseCache()
+        before = metrics.UNCHANGED_RESPONSES.value('same_body')
+        assert not cache.unchanged('42:abc', 200, None, b'{"a": 1}')
+        assert cache.unchanged('42:abc', 200, None, b'{"a": 1}')
+        assert not cache.unchanged('43:def', 200, None, b'{"a": 1}'), (
+            'Кэш не должен смешивать подписчиков.'
+        )
+        assert not cache.unchanged('42:abc', 200, None, b'{"a": 2}')
+        assert metrics.UNCHANGED_RESPONSES.value('same_body') == before + 1
+
+    def test_not_modified_and_errors(self):
+        cache = response_cache.ResponseCache()
+        assert cache.unchanged('42:abc', 304, None, b'')
+        assert not cache.unchanged('42:abc', 500, None, b'{}')
+        assert not cache.unchanged('42:abc', 500, None, b'{}'), (
+            'Ответы с ошибкой не должны запоминаться.'
+        )
+
+    def test_forget(self):
+        cache = response_cache.ResponseCache()
+        cache.unchanged('42:abc', 200, None, b'{}')
+        cache.forget('42:abc')
+        assert len(cache) == 0
+        assert not cache.unchanged('42:abc', 200, None, b'{}')
+
+    def test_fetch_skips_unchanged_response(self, homework_module,
+                                            random_timestamp):
+        body = json.dumps({
+            'homeworks': [], 'current_date': random_timestamp
+        }).encode()
+        session = FakeSession(
+            FakeResponse(HTTPStatus.OK, body, {'ETag': '"v1"'}),
+            FakeResponse(HTTPStatus.NOT_MODIFIED),
+            FakeResponse(HTTPStatus.OK, body),
+        )
+        cache = response_cache.ResponseCache()
+        answer = homework_module.fetch_api_answer(
+            session, HEADERS, 0, cache=cache, cache_key='42:abc'
+        )
+        assert answer['current_date'] == random_timestamp
+        for _ in range(2):
+            with pytest.raises(NoNewStatuses):
+                homework_module.fetch_api_answer(
+                    session, HEADERS, 0, cache=cache, cache_key='42:abc'
+                )
+        assert session.sent_headers[1]['If-None-Match'] == '"v1"'
@@ -0,0 +1,85 @@
+import asyncio
+
+from exceptions import MissingHomeworkName, NotAvailableEndpoint
+from rate_limit import TokenBucket
+from scheduler import JITTER, AdaptiveScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestAdaptiveScheduler:
+    def make_scheduler(self):
+        return AdaptiveScheduler(
+            600, reviewing_period=120, max_period=3600, idle_after=2
+        )
+
+    def test_base_period_by_default(self):
+        scheduler = self.make_scheduler()
+        assert scheduler.next_delay('a') == 600
+        scheduler.record('a', 'approved')
+        assert scheduler.next_delay('a') == 600
+
+    def test_reviewing_is_polled_more_often(self):
+        scheduler = self.make_scheduler()
+        scheduler.record('a', 'reviewing')
+        scheduler.record('a')
+        assert scheduler.next_delay('a') == 120, (
+            'Пока работа на ревью, API нужно опрашивать чаще.'
+        )
+        scheduler.record('a', 'approved')
+        assert scheduler.next_delay('a') == 600
+
+    def test_exponential_backoff_with_jitter(self):
+        scheduler = self.make_scheduler()
+        delays = []
+        for _ in range(4):
+            scheduler.record_error('a', NotAvailableEndpoint())
+            delays.append(scheduler.next_delay('a'))
+        for expected, delay in zip((600, 1200, 2400, 3600), delays):
+            assert expected * (1 - JITTER) <= delay <= expected * (1 + JITTER)
+        scheduler.record('a')
+        assert scheduler.next_delay('a') == 600, (
+            'После восстановления API интервал возвращается к базовому.'
+        )
+
+    def test_validation_errors_do_not_back_off(self):
+        scheduler = self.make_scheduler()
+        scheduler.record_error('a', MissingHomeworkName())
+        assert scheduler.next_delay('a') == 600
+
+    def test_idle_subscribers_slow_down(self):
+        scheduler = self.make_scheduler()
+        for _ in range(2):
+            scheduler.record('a')
+        assert scheduler.next_delay('a') > 600
+        for _ in range(100):
+            scheduler.record('a')
+        assert scheduler.next_delay('a') == 3600
+
+
+class TestTokenBucket:
+    def test_budget_is_enforced(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2, capacity=2, clock=clock)
+        assert bucket.try_acquire() == 0
+        assert bucket.try_acquire() == 0
+        assert bucket.try_acquire() == 0.5, (
+            'Когда токены кончились, нужно подождать их пополнения.'
+        )
+        clock.now = 0.5
+        assert bucket.try_acquire() == 0
+
+    def test_acquire_async(self):
+        bucket = TokenBucket(rate=1000, capacity=1)
+
+        async def scenario():
+            for _ in range(3):
+                await bucket.acquire_async()
+
+        asyncio.run(scenario())
@@ -0,0 +1,120 @@
+import threading
+
+import telegram
+
+import send_queue
+
+
+class RecordingBot:
+    def __init__(self, fail_first_with=None):
+        self.sent = []
+        self.fail_first_with = fail_first_with
+        self.delivered = threading.Event()
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        if self.fail_first_with is not None:
+            error, self.fail_first_with = self.fail_first_with, None
+            raise error
+        self.sent.append((chat_id, text))
+        self.delivered.set()
+
+
+class TestOutboundQueue:
+    def test_messages_for_one_chat_are_coalesced(self):
+        bot = RecordingBot()
+        outbox = send_queue.OutboundQueue(bot, coalesce_window=60)
+        outbox.start()
+        outbox.put('1', 'первое')
+        outbox.put('1', 'второе')
+        outbox.put('2', 'третье')
+        outbox.stop()
+        assert sorted(bot.sent) == [
+            ('1', 'первое\n\nвторое'), ('2', 'третье')
+        ], 'Сообщения одного чата должны склеиваться в одно.'
+        assert outbox.stats()['coalesced'] == 1
+
+    def test_sending_does_not_block_put(self):
+        bot = RecordingBot()
+        outbox = send_queue.OutboundQueue(bot, coalesce_window=0)
+        outbox.start()
+        assert outbox.put('1', 'сообщение')
+        assert bot.delivered.wait(5), 'Сообщение должно уйти в фоне.'
+        outbox.stop()
+
+    def test_overflow_is_dropped(self):
+        outbox = send_queue.OutboundQueue(RecordingBot(), maxsize=1)
+        assert outbox.put('1', 'первое')
+        assert not outbox.put('1', 'второе')
+        assert outbox.stats()['dropped'] == 1
+
+    def test_long_messages_are_split(self):
+        bot = RecordingBot()
+        outbox = send_queue.OutboundQueue(bot, chat_rate=1000)
+        text = 'x' * 3000
+        outbox.put('1', text)
+        outbox.put('1', text)
+        outbox.start()
+        outbox.stop()
+        assert bot.sent == [('1', text), ('1', text)], (
+            'Склеенное сообщение не должно превышать лимит Telegram.'
+        )
+
+    def test_flood_control_requeues(self):
+        bot = RecordingBot(fail_first_with=telegram.error.RetryAfter(0))
+        outbox = send_queue.OutboundQueue(bot, chat_rate=1000)
+        outbox.put('1', 'сообщение')
+        outbox.start()
+        outbox.stop()
+        assert bot.sent == [('1', 'сообщение')], (
+            'После флуд-контроля сообщение нужно отправить повторно.'
+        )
+
+    def test_timed_out_message_is_not_repeated(self):
+        bot = RecordingBot(fail_first_with=telegram.error.TimedOut())
+        outbox = send_queue.OutboundQueue(bot, chat_rate=1000)
+        outbox.put('1', 'сообщение')
+        outbox.start()
+        outbox.stop()
+        assert bot.sent == [], (
+            'Сообщение после таймаута могло дойти, повтор дал бы дубль.'
+        )
+        assert outbox.stats()['timed_out'] == 1
+
+    def test_unexpected_error_does_not_stop_sender(self):
+        bot = RecordingBot(fail_first_with=RuntimeError('сеть'))
+        outbox = send_queue.OutboundQueue(bot, chat_rate=1000)
+        outbox.put('1', 'первое')
+        outbox.put('2', 'второе')
+        outbox.start()
+        outbox.stop()
+        assert bot.sent == [('2', 'второе')], (
+            'После неожиданной ошибки поток отправки должен продолжить.'
+        )
+        assert outbox.stats()['dropped'] == 1
+
+    def test_broken_message_is_discarded(self, monkeypatch):
+        def send_options(text):
+            if text == 'битое':
+                raise ValueError(text)
+            return {}
+
+        monkeypatch.setattr(send_queue, 'send_options', send_options)
+        bot = RecordingBot()
+        outbox = send_queue.OutboundQueue(bot, chat_rate=1000)
+        outbox.put('1', 'битое')
+        outbox.put('2', 'целое')
+        outbox.start()
+        outbox.stop()
+        assert bot.sent == [('2', 'целое')]
+        assert len(outbox) == 0 and outbox.stats()['dropped'] == 1
+
+    def test_active_chat_limits_survive_eviction(self):
+        outbox = send_queue.OutboundQueue(RecordingBot(), maxsize=2)
+        active = outbox._chat_bucket('1')
+        outbox._chat_bucket('2')
+        assert outbox._chat_bucket('1') is active
+        outbox._chat_bucket('3')
+        assert outbox._chat_bucket('1') is active, (
+            'Вытеснять нужно лимит самого давно молчавшего чата.'
+        )
+        assert list(outbox._chats) == ['3', '1']
@@ -0,0 +1,196 @@
+import json
+
+import checkpoints
+import homework
+import sharding
+import utils
+from subscribers import Subscriber
+
+SUBSCRIBERS = [Subscriber(f'token{i}', str(i)) for i in range(200)]
+
+
+class FakeProcess:
+    started = 0
+
+    def __init__(self, target=None, args=(), name=None, daemon=None):
+        self.args = args
+        self.pid = None
+        self.exitcode = None
+        self.alive = False
+
+    def start(self):
+        FakeProcess.started += 1
+        self.pid = FakeProcess.started
+        self.alive = True
+
+    def is_alive(self):
+        return self.alive
+
+    def terminate(self):
+        self.alive = False
+        self.exitcode = -15
+
+    def kill(self):
+        self.alive = False
+        self.exitcode = -9
+
+    def join(self, timeout=None):
+        pass
+
+
+class StuckProcess(FakeProcess):
+    def terminate(self):
+        pass
+
+
+class FakeContext:
+    Process = FakeProcess
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_supervisor(store, workers=4):
+    return sharding.Supervisor(
+        SUBSCRIBERS, store, workers=workers, context=FakeContext(),
+        max_restarts=2, restart_window=60, clock=FakeClock(),
+    )
+
+
+class TestHashRing:
+    def test_removing_node_moves_only_its_keys(self):
+        keys = [subscriber.key for subscriber in SUBSCRIBERS]
+        nodes = [f'worker-{i}' for i in range(4)]
+        before = sharding.HashRing(nodes).assign(keys)
+        assert all(before.values()), 'Каждому узлу должна достаться часть.'
+        after = sharding.HashRing(nodes[1:]).assign(keys)
+        for node in nodes[1:]:
+            assert set(before[node]) <= set(after[node]), (
+                'Ключи оставшихся узлов не должны переезжать.'
+            )
+
+    def test_dynos_split_subscribers(self):
+        shards = [
+            sharding.dyno_subscribers(SUBSCRIBERS, dyno, 3)
+            for dyno in range(3)
+        ]
+        assert sorted(sum(shards, [])) == sorted(SUBSCRIBERS)
+
+
+class TestSupervisor:
+    def test_assignment_is_written_to_store(self):
+        store = checkpoints.CheckpointStore()
+        supervisor = make_supervisor(store)
+        supervisor.start()
+        assignment = json.loads(store.load_meta('shards:dyno-0'))
+        assert sorted(assignment['shards']) == supervisor.slots
+        assert sum(map(len, assignment['shards'].values())) == len(
+            SUBSCRIBERS
+        )
+        assert len(supervisor.processes) == 4
+
+    def test_dead_worker_is_restarted_with_same_shard(self):
+        supervisor = make_supervisor(checkpoints.CheckpointStore())
+        supervisor.start()
+        process = supervisor.processes['worker-1']
+        process.alive = False
+        supervisor.check()
+        restarted = supervisor.processes['worker-1']
+        assert restarted is not process and restarted.is_alive()
+        assert restarted.args == process.args
+
+    def test_crash_looping_worker_is_rebalanced(self):
+        store = checkpoints.CheckpointStore()
+        supervisor = make_supervisor(store)
+        supervisor.start()
+        for _ in range(3):
+            supervisor.processes['worker-1'].alive = False
+            supervisor.check()
+        assert 'worker-1' not in supervisor.slots
+        assert 'worker-1' not in supervisor.processes
+        polled = [
+            subscriber
+            for process in supervisor.processes.values()
+            for subscriber in process.args[1]
+        ]
+        assert sorted(polled) == sorted(SUBSCRIBERS), (
+            'Шард упавшего процесса должен перейти к остальным.'
+        )
+        assignment = json.loads(store.load_meta('shards:dyno-0'))
+        assert 'worker-1' not in assignment['shards']
+
+    def test_stuck_worker_is_killed(self):
+        supervisor = make_supervisor(checkpoints.CheckpointStore())
+        supervisor.start()
+        process = StuckProcess()
+        process.start()
+        supervisor.processes['worker-1'] = process
+        supervisor.stop()
+        assert not process.is_alive() and process.exitcode == -9, (
+            'Процесс, не завершившийся по SIGTERM, надо убить.'
+        )
+
+    def test_sigusr1_is_forwarded_to_workers(self, monkeypatch):
+        killed = []
+        monkeypatch.setattr(
+            sharding.os, 'kill', lambda pid, signum: killed.append(pid)
+        )
+        supervisor = make_supervisor(checkpoints.CheckpointStore())
+        supervisor.start()
+        supervisor.processes['worker-1'].alive = False
+        supervisor.forward_signal(10, None)
+        assert sorted(killed) == sorted(
+            process.pid for slot, process in supervisor.processes.items()
+            if slot != 'worker-1'
+        ), 'Супервизор должен передавать SIGUSR1 живым процессам.'
+
+
+class TestRunShard:
+    def test_rate_limits_are_split_between_workers(self, monkeypatch):
+        pollers = []
+
+        class RecordingPoller:
+            def __init__(self, bot, subscribers, **kwargs):
+                self.kwargs = kwargs
+                pollers.append(self)
+
+            def run_forever(self):
+                pass
+
+            def shutdown(self):
+                self.kwargs['outbox'].stop()
+
+        monkeypatch.setattr(homework, 'init', lambda: None)
+        monkeypatch.setattr(
+            homework, 'build_bot', lambda: utils.MockTelegramBot()
+        )
+        monkeypatch.setattr(sharding, 'setup_logging', lambda: None)
+        handlers = {}
+        monkeypatch.setattr(
+            sharding.signal, 'signal',
+            lambda signum, handler: handlers.setdefault(signum, handler)
+        )
+        monkeypatch.setattr(sharding.metrics, 'METRICS_PORT', None)
+        monkeypatch.setattr(
+            sharding, 'open_checkpoint_store', checkpoints.CheckpointStore
+        )
+        monkeypatch.setattr(sharding, 'ThreadedPoller', RecordingPoller)
+        monkeypatch.setattr(sharding, 'SHARD_WORKERS', 4)
+        monkeypatch.setattr(sharding, 'DYNO_COUNT', 2)
+        sharding.run_shard('worker-0', SUBSCRIBERS[:10])
+        kwargs = pollers[0].kwargs
+        assert kwargs['budget'].rate == (
+            sharding.API_REQUESTS_PER_SECOND / 8
+        ), 'Все процессы всех дино вместе не должны превышать лимит API.'
+        assert kwargs['outbox']._global.rate == (
+            sharding.GLOBAL_MESSAGES_PER_SECOND / 8
+        )
+        if hasattr(sharding.signal, 'SIGUSR1'):
+            assert handlers[sharding.signal.SIGUSR1] == (
+                sharding.tracing.TRACER.handle_signal
+            ), 'SIGUSR1 не должен убивать процесс шарда.'
@@ -0,0 +1,97 @@
+import os
+import subprocess
+import sys
+
+from tests.conftest import BASE_DIR
+
+
+def run_python(code, cwd, unset=(), script=None):
+    env = {
+        name: value for name, value in os.environ.items()
+        if name not in unset
+    }
+    env['PYTHONPATH'] = str(BASE_DIR)
+    if script is not None:
+        script.write_text(code)
+    return subprocess.run(
+        [sys.executable, *([str(script)] if script else ['-c', code])],
+        cwd=cwd, capture_output=True, text=True, check=True, env=env,
+    )
+
+
+class TestStartup:
+    def test_heavy_dependencies_are_imported_lazily(self, tmp_path):
+        completed = run_python(
+            'import sys, homework; '
+            'print(sorted({"requests", "telegram", "dotenv"} '
+            '& set(sys.modules)))',
+            tmp_path,
+        )
+        assert completed.stdout.strip() == '[]', (
+            'Импорт homework не должен тянуть requests, telegram и dotenv.'
+        )
+
+    def test_init_reads_dotenv(self, monkeypatch, tmp_path, homework_module):
+        for name in ('PRACTICUM_TOKEN', 'TELEGRAM_TOKEN', 'TELEGRAM_CHAT_ID',
+                     'ENDPOINT', 'HEADERS'):
+            monkeypatch.setattr(
+                homework_module, name, getattr(homework_module, name)
+            )
+        monkeypatch.setenv('PRACTICUM_ENDPOINT', '')
+        monkeypatch.delenv('PRACTICUM_ENDPOINT')
+        monkeypatch.setenv('PRACTICUM_TOKEN', '')
+        monkeypatch.delenv('PRACTICUM_TOKEN')
+        dotenv = tmp_path / '.env'
+        dotenv.write_text(
+            'PRACTICUM_TOKEN=fromdotenv\n'
+            'PRACTICUM_ENDPOINT=http://127.0.0.1:8080/\n'
+        )
+        homework_module.init(str(dotenv))
+        assert homework_module.ENDPOINT == 'http://127.0.0.1:8080/'
+        assert homework_module.HEADERS == {
+            'Authorization': 'OAuth fromdotenv'
+        }
+
+    def test_module_settings_come_from_dotenv(self, tmp_path):
+        names = ('POLLING_WORKERS', 'API_DEADLINE', 'TELEGRAM_GLOBAL_RATE',
+                 'BOT_COMMANDS', 'SUBSCRIBERS_FILE')
+        (tmp_path / '.env').write_text(
+            'POLLING_WORKERS=3\n'
+            'API_DEADLINE=7\n'
+            'TELEGRAM_GLOBAL_RATE=5\n'
+            'BOT_COMMANDS=1\n'
+            'SUBSCRIBERS_FILE=subscribers.json\n'
+        )
+        nested = tmp_path / 'nested'
+        nested.mkdir()
+        completed = run_python(
+            'import threaded_polling, deadlines, send_queue, commands, '
+            'subscribers; '
+            'print(threaded_polling.WORKERS, deadlines.Deadline().total, '
+            'send_queue.OutboundQueue(None)._global.rate, '
+            'commands.BOT_COMMANDS, '
+            'subscribers.load_subscribers.__defaults__[0])',
+            nested,
+            unset=names,
+        )
+        assert completed.stdout.split() == [
+            '3', '7.0', '5.0', 'True', 'subscribers.json'
+        ], 'Настройки из .env должны действовать уже при импорте модулей.'
+
+    def test_dotenv_is_found_next_to_script(self, tmp_path):
+        app = tmp_path / 'app'
+        elsewhere = tmp_path / 'elsewhere'
+        app.mkdir()
+        elsewhere.mkdir()
+        (app / '.env').write_text('POLLING_WORKERS=3\n')
+        (elsewhere / '.env').write_text('POLLING_WORKERS=5\n')
+        completed = run_python(
+            'import threaded_polling; print(threaded_polling.WORKERS)',
+            elsewhere,
+            unset=('POLLING_WORKERS',),
+            script=app / 'run.py',
+        )
+        assert completed.stdout.strip() == '3', (
+            '.env должен искаться от запущенного скрипта, а не от '
+            'рабочего каталога.'
+        )
@@ -0,0 +1,37 @@
+import homework
+import state_index
+
+
+def record(status, date='2020-02-13T14:40:57Z', homework_id=1, name='hw1'):
+    return homework.HomeworkRecord(homework_id, name, status, date)
+
+
+class TestHomeworkStateIndex:
+    def test_only_transitions_are_emitted(self):
+        index = state_index.HomeworkStateIndex()
+        first = [record('reviewing', homework_id=2), record('reviewing')]
+        assert index.apply('42:abc', first) == first
+        assert index.apply('42:abc', first) == [], (
+            'Повторный ответ без смены статуса не должен давать уведомлений.'
+        )
+        changed = record('approved', '2020-02-14T10:00:00Z')
+        assert index.apply('42:abc', [changed, first[0]]) == [changed]
+        assert index.get('42:abc', 1) == ('approved', 1581674400)
+        assert index.apply('43:def', first) == first, (
+            'Индекс не должен смешивать подписчиков.'
+        )
+        assert len(index) == 4
+
+    def test_stale_records_are_ignored(self):
+        index = state_index.HomeworkStateIndex()
+        index.apply('42:abc', [record('approved', '2020-02-14T10:00:00Z')])
+        assert index.apply('42:abc', [record('reviewing')]) == []
+        assert index.get('42:abc', 1)[0] == 'approved'
+        assert index.stats()['stale'] == 1
+
+    def test_homework_without_id_is_keyed_by_name(self):
+        index = state_index.HomeworkStateIndex()
+        index.apply('42:abc', [record('reviewing', None, None)])
+        assert index.get('42:abc', 'hw1') == ('reviewing', 0)
+        index.forget('42:abc')
+        assert len(index) == 0
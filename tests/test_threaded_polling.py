@@ -0,0 +1,144 @@
+import threading
+import time
+from http import HTTPStatus
+
+import checkpoints
+import homework
+import threaded_polling
+import utils
+from error_aggregator import ErrorAggregator
+from exceptions import (
+    MissingHomeworkName,
+    NotAvailableEndpoint,
+    RequestRejected,
+)
+from scheduler import AdaptiveScheduler
+from subscribers import Subscriber
+
+
+class FakeSession:
+    def __init__(self, data):
+        self.data = data
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def get(self, url, headers=None, params=None, **kwargs):
+        with self._lock:
+            self.calls.append((headers['Authorization'], params['from_date']))
+        response = utils.MockResponseGET(http_status=HTTPStatus.OK)
+        response.json = lambda: self.data
+        return response
+
+
+class RecordingBot:
+    def __init__(self):
+        self.sent = []
+        self._lock = threading.Lock()
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        with self._lock:
+            self.sent.append((chat_id, text))
+
+
+class TestThreadedPoller:
+    SUBSCRIBERS = [Subscriber(f'token{i}', str(i)) for i in range(5)]
+
+    def make_poller(self, data):
+        bot = RecordingBot()
+        session = FakeSession(data)
+        poller = threaded_polling.ThreadedPoller(
+            bot, self.SUBSCRIBERS, workers=3, session=session
+        )
+        return poller, bot, session
+
+    def test_round_polls_every_subscriber(self, random_timestamp):
+        data = {
+            'homeworks': [{'homework_name': 'hw', 'status': 'approved'}],
+            'current_date': random_timestamp,
+        }
+        poller, bot, session = self.make_poller(data)
+        poller.run_round()
+        poller.shutdown()
+        assert sorted(chat for chat, _ in bot.sent) == [
+            subscriber.chat_id for subscriber in self.SUBSCRIBERS
+        ], 'Каждый подписчик должен получить сообщение в своём чате.'
+        assert len(session.calls) == len(self.SUBSCRIBERS)
+        assert set(poller.timestamps.values()) == {random_timestamp}, (
+            'После успешного цикла timestamp берётся из `current_date`.'
+        )
+
+    def test_errors_are_sent_once(self):
+        poller, bot, _ = self.make_poller({'current_date': 1})
+        poller.run_round()
+        poller.run_round()
+        poller.shutdown()
+        assert len(bot.sent) == len(self.SUBSCRIBERS), (
+            'Одинаковая ошибка не должна отправляться повторно.'
+        )
+
+    def test_stats(self):
+        poller, _, _ = self.make_poller({'homeworks': [], 'current_date': 1})
+        poller.run_round()
+        stats = poller.stats()
+        poller.shutdown()
+        assert stats['queue_depth'] == 0
+        assert sum(
+            worker['tasks'] for worker in stats['workers'].values()
+        ) == len(self.SUBSCRIBERS)
+        assert all(
+            worker['avg_latency'] >= 0 for worker in stats['workers'].values()
+        )
+
+    def test_next_poll_is_scheduled(self):
+        data = {
+            'homeworks': [{'homework_name': 'hw', 'status': 'reviewing'}],
+            'current_date': 1,
+        }
+        poller, _, _ = self.make_poller(data)
+        poller._scheduled_poll(0)
+        poller.shutdown()
+        (due, index), = poller._due
+        assert index == 0
+        assert due - time.monotonic() <= poller.scheduler.reviewing_period, (
+            'Работу на ревью нужно опрашивать чаще базового интервала.'
+        )
+
+    def test_malformed_homework_does_not_block_checkpoint(
+            self, random_timestamp):
+        data = {
+            'homeworks': [{'homework_name': 'hw', 'status': 'unknown'}],
+            'current_date': random_timestamp,
+        }
+        poller, bot, _ = self.make_poller(data)
+        poller.run_round()
+        poller.shutdown()
+        assert set(poller.timestamps.values()) == {random_timestamp}, (
+            'Битая домашка не должна держать from_date на месте.'
+        )
+        assert bot.sent == []
+
+
+class TestPollingContext:
+    def test_outcomes_are_handled_in_one_place(self):
+        sent = []
+        store = checkpoints.CheckpointStore()
+        polling = homework.PollingContext(
+            lambda chat_id, text: sent.append((chat_id, text)),
+            store,
+            AdaptiveScheduler(600),
+            ErrorAggregator(lambda text: None),
+        )
+        subscriber = Subscriber('token', '1')
+        record = homework.HomeworkRecord(1, 'hw1', 'approved', None)
+        assert polling.record_homeworks(subscriber, [record], 42) == 42
+        assert store.load(subscriber.key) == 42
+        assert sent == [('1', homework.status_message(record))]
+        for _ in range(2):
+            polling.record_error(subscriber, RequestRejected())
+        polling.record_error(subscriber, NotAvailableEndpoint())
+        assert sent[1:] == [
+            ('1', homework.describe_error(RequestRejected()))
+        ], 'Подписчику — сбои его запроса и только по одному разу.'
+        polling.notify_errors = False
+        polling.record_error(subscriber, MissingHomeworkName())
+        assert len(sent) == 2
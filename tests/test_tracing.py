@@ -0,0 +1,96 @@
+import os
+import signal
+
+import pytest
+
+import tracing
+
+
+class TestStageTracer:
+    def test_disabled_tracer_records_nothing(self):
+        tracer = tracing.StageTracer(enabled=False)
+
+        @tracer.trace()
+        def stage():
+            return 42
+
+        assert stage() == 42
+        assert len(tracer.records) == 0, (
+            'Выключенная трассировка не должна ничего записывать.'
+        )
+
+    def test_nested_stages_are_folded(self):
+        tracer = tracing.StageTracer(enabled=True)
+
+        @tracer.trace('check_response')
+        def check():
+            pass
+
+        with tracer.stage('cycle'):
+            check()
+            check()
+        summary = tracer.summary()
+        assert summary['cycle;check_response']['count'] == 2
+        assert summary['cycle']['count'] == 1
+        folded = dict(line.rsplit(' ', 1) for line in tracer.folded())
+        assert set(folded) == {'cycle', 'cycle;check_response'}, (
+            'Стеки должны быть в формате folded stacks.'
+        )
+
+    def test_ring_buffer_is_bounded(self):
+        tracer = tracing.StageTracer(enabled=True, size=3)
+        for _ in range(10):
+            with tracer.stage('parse_status'):
+                pass
+        assert len(tracer.records) == 3
+
+    def test_wrapper_keeps_metadata(self):
+        tracer = tracing.StageTracer(enabled=True)
+
+        @tracer.trace()
+        def parse_status(homework: dict) -> str:
+            """Документация."""
+            return homework['status']
+
+        assert parse_status.__name__ == 'parse_status'
+        assert parse_status.__doc__ == 'Документация.'
+        assert parse_status({'status': 'approved'}) == 'approved'
+        assert 'parse_status' in tracer.summary()
+
+    def test_exception_is_still_recorded(self):
+        tracer = tracing.StageTracer(enabled=True)
+        with pytest.raises(ValueError):
+            with tracer.stage('get_api_answer'):
+                raise ValueError
+        assert tracer.summary()['get_api_answer']['count'] == 1
+
+    @pytest.mark.skipif(
+        not hasattr(signal, 'SIGUSR1'), reason='SIGUSR1 недоступен'
+    )
+    def test_signal_enables_then_dumps(self, tmp_path, monkeypatch):
+        tracer = tracing.StageTracer(enabled=False)
+        dump_path = tmp_path / 'trace.folded'
+        monkeypatch.setattr(
+            tracer, 'dump', lambda: dump_path.write_text('\n'.join(
+                tracer.folded()
+            ))
+        )
+        previous = signal.getsignal(signal.SIGUSR1)
+        tracing.install_signal_handler(tracer)
+        try:
+            os.kill(os.getpid(), signal.SIGUSR1)
+            assert tracer.enabled, 'Первый сигнал включает трассировку.'
+            with tracer.stage('send_message'):
+                pass
+            os.kill(os.getpid(), signal.SIGUSR1)
+        finally:
+            signal.signal(signal.SIGUSR1, previous)
+        assert dump_path.read_text().startswith('send_message ')
+
+    def test_dump_writes_file(self, tmp_path):
+        tracer = tracing.StageTracer(enabled=True)
+        with tracer.stage('cycle'):
+            pass
+        path = tracer.dump(str(tmp_path / 'stacks.folded'))
+        with open(path, encoding='utf-8') as file:
+            assert file.read().startswith('cycle ')
@@ -0,0 +1,289 @@
+import heapq
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import List
+
+import homework
+import metrics
+import tracing
+from checkpoints import CheckpointStore, open_checkpoint_store
+from circuit_breaker import CircuitBreaker
+from commands import BOT_COMMANDS, CommandListener, StatusBoard
+from deadlines import STAGES, Deadline
+from error_aggregator import ErrorAggregator, operator_notifier
+from exceptions import NoNewStatuses
+from http_client import build_session
+from log_config import setup_logging
+from notification_cache import NotificationCache
+from rate_limit import TokenBucket
+from scheduler import API_REQUESTS_PER_SECOND, AdaptiveScheduler
+from send_queue import OutboundQueue
+from settings import getenv
+from state_index import HomeworkStateIndex
+from subscribers import Subscriber, load_subscribers
+
+WORKERS = int(getenv("POLLING_WORKERS", 16))
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerStats:
+    """Счётчики одного рабочего потока пула."""
+
+    __slots__ = ("tasks", "busy", "total_latency", "last_latency")
+
+    def __init__(self) -> None:
+        """Создаёт пустые счётчики."""
+        self.tasks = 0
+        self.busy = 0
+        self.total_latency = 0.0
+        self.last_latency = 0.0
+
+    def as_dict(self) -> dict:
+        """Возвращает счётчики в виде словаря."""
+        average = self.total_latency / self.tasks if self.tasks else 0.0
+        return {
+            "tasks": self.tasks,
+            "in_flight": self.busy,
+            "avg_latency": average,
+            "last_latency": self.last_latency,
+        }
+
+
+class ThreadedPoller:
+    """Опрашивает API для списка подписчиков пулом потоков.
+
+    Все потоки делят одну HTTP-сессию с пулом соединений и одного бота,
+    поэтому раунд опроса N подписчиков занимает примерно одно обращение
+    к API на поток, а не N последовательных.
+    """
+
+    def __init__(
+        self,
+        bot: object,
+        subscribers: List[Subscriber],
+        workers: int = WORKERS,
+        session: object = None,
+        store: CheckpointStore = None,
+        cache: NotificationCache = None,
+        scheduler: AdaptiveScheduler = None,
+        budget: TokenBucket = None,
+        outbox: OutboundQueue = None,
+        breaker: CircuitBreaker = None,
+        errors: ErrorAggregator = None,
+        board: StatusBoard = None,
+        states: HomeworkStateIndex = None,
+    ) -> None:
+        """Готовит пул потоков и состояние подписчиков."""
+        self.bot = bot
+        self.subscribers = subscribers
+        self.session = session or build_session(
+            pool_maxsize=workers, status_retries=False
+        )
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="poller"
+        )
+        self.budget = budget or TokenBucket(API_REQUESTS_PER_SECOND)
+        self.breaker = breaker or CircuitBreaker()
+        if outbox is None:
+            outbox = OutboundQueue(bot)
+            outbox.start()
+        self.outbox = outbox
+        self.polling = homework.PollingContext(
+            lambda chat_id, text: self.outbox.put(chat_id, text),
+            store or CheckpointStore(),
+            scheduler or AdaptiveScheduler(homework.RETRY_PERIOD),
+            errors or ErrorAggregator(operator_notifier(outbox)),
+            board,
+            states,
+            cache,
+        )
+        self.store = self.polling.store
+        self.cache = self.polling.cache
+        self.responses = self.polling.responses
+        self.scheduler = self.polling.scheduler
+        self.errors = self.polling.errors
+        self.board = self.polling.board
+        self.states = self.polling.states
+        now = int(time.time())
+        self.timestamps = {
+            subscriber.key: self.store.load(subscriber.key, now)
+            for subscriber in subscribers
+        }
+        self._workers = {}
+        self._lock = threading.Lock()
+        self._due = []
+        self._wakeup = threading.Condition()
+
+    def poll_subscriber(
+        self, subscriber: Subscriber, deadline: Deadline = None
+    ) -> None:
+        """Выполняет один цикл опроса для подписчика.
+
+        Срок запроса к API отсчитывается после ожидания в лимите запросов;
+        срок раунда deadline, если он передан, ограничивает его сверху.
+        """
+        try:
+            if deadline is not None:
+                deadline.check("queue")
+            self.budget.acquire()
+            api_answer = homework.fetch_api_answer(
+                self.session,
+                subscriber.headers,
+                self.timestamps[subscriber.key],
+                cache=self.responses,
+                cache_key=subscriber.key,
+                breaker=self.breaker,
+                deadline=Deadline() if deadline is None else deadline.child(),
+            )
+            self.timestamps[subscriber.key] = self.polling.record_homeworks(
+                subscriber,
+                homework.check_response(api_answer),
+                api_answer.get("current_date"),
+            )
+        except NoNewStatuses:
+            self.polling.record_no_new_statuses(subscriber)
+        except Exception as error:
+            self.polling.record_error(subscriber, error)
+
+    def _timed_poll(
+        self, subscriber: Subscriber, deadline: Deadline = None
+    ) -> None:
+        """Опрашивает подписчика и записывает задержку в статистику потока."""
+        name = threading.current_thread().name
+        with self._lock:
+            stats = self._workers.setdefault(name, WorkerStats())
+            stats.busy = 1
+        started = time.perf_counter()
+        try:
+            with tracing.TRACER.stage("cycle"):
+                self.poll_subscriber(subscriber, deadline)
+        finally:
+            latency = time.perf_counter() - started
+            with self._lock:
+                stats.busy = 0
+                stats.tasks += 1
+                stats.total_latency += latency
+                stats.last_latency = latency
+
+    def run_round(self, deadline: Deadline = None) -> None:
+        """Опрашивает всех подписчиков и ждёт завершения раунда.
+
+        Со сроком deadline опросы, не начавшиеся до его конца, отменяются,
+        а начатые укладываются в остаток срока.
+        """
+        futures = [
+            self.executor.submit(self._timed_poll, subscriber, deadline)
+            for subscriber in self.subscribers
+        ]
+        if deadline is not None:
+            _, pending = wait(futures, timeout=deadline.remaining())
+            cancelled = sum(future.cancel() for future in pending)
+            if cancelled:
+                metrics.DEADLINE_EXCEEDED.inc("queue", amount=cancelled)
+                logger.warning(
+                    "Раунд не уложился в срок, отменено опросов: %s",
+                    cancelled,
+                )
+        wait(futures)
+        self.store.maybe_flush()
+        self.errors.flush()
+
+    def stats(self) -> dict:
+        """Возвращает глубину очереди задач и статистику по потокам."""
+        with self._lock:
+            workers = {
+                name: stats.as_dict()
+                for name, stats in self._workers.items()
+            }
+        return {
+            "queue_depth": self.executor._work_queue.qsize(),
+            "workers": workers,
+            "notifications": self.cache.stats(),
+            "messages": homework.RENDERER.stats(),
+            "states": self.states.stats(),
+            "deadline_exceeded": {
+                stage: metrics.DEADLINE_EXCEEDED.value(stage)
+                for stage in STAGES
+            },
+            "outbox": self.outbox.stats(),
+        }
+
+    def _scheduled_poll(self, index: int) -> None:
+        """Опрашивает подписчика и ставит его следующий опрос в очередь."""
+        subscriber = self.subscribers[index]
+        try:
+            self._timed_poll(subscriber)
+        finally:
+            due = time.monotonic() + self.scheduler.next_delay(subscriber.key)
+            with self._wakeup:
+                heapq.heappush(self._due, (due, index))
+                self._wakeup.notify()
+
+    def run_forever(self) -> None:
+        """Опрашивает каждого подписчика в его собственном ритме."""
+        started = time.monotonic()
+        with self._wakeup:
+            self._due = [
+                (started, index) for index in range(len(self.subscribers))
+            ]
+        last_report = started
+        while True:
+            with self._wakeup:
+                while True:
+                    now = time.monotonic()
+                    if self._due and self._due[0][0] <= now:
+                        break
+                    timeout = self._due[0][0] - now if self._due else None
+                    self._wakeup.wait(timeout)
+                _, index = heapq.heappop(self._due)
+            self.executor.submit(self._scheduled_poll, index)
+            self.errors.flush()
+            if now - last_report >= homework.RETRY_PERIOD:
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Статистика пула: %s", self.stats())
+                self.store.maybe_flush()
+                last_report = now
+
+    def shutdown(self) -> None:
+        """Останавливает пул, досылает сообщения и сохраняет точки."""
+        self.executor.shutdown(wait=True)
+        self.errors.flush(force=True)
+        self.outbox.stop()
+        self.store.close()
+
+
+def main() -> None:
+    """Запускает опрос API пулом потоков для всех подписчиков."""
+    subscribers = load_subscribers()
+    if not homework.TELEGRAM_TOKEN or not subscribers:
+        logger.critical(
+            "Не заданы токен бота или подписчики. "
+            "Нет смысла продолжать работу дальше."
+        )
+        sys.exit()
+    metrics.maybe_start_metrics_server()
+    tracing.install_signal_handler()
+    bot = homework.build_bot()
+    poller = ThreadedPoller(bot, subscribers, store=open_checkpoint_store())
+    if BOT_COMMANDS:
+        CommandListener(
+            bot,
+            poller.board,
+            poller.outbox.put,
+            [subscriber.chat_id for subscriber in subscribers],
+            homework.RENDERER,
+        ).start()
+    try:
+        poller.run_forever()
+    finally:
+        poller.shutdown()
+
+
+if __name__ == "__main__":
+    homework.init()
+    setup_logging()
+    main()
@@ -0,0 +1,138 @@
+import functools
+import logging
+import os
+import signal
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+from settings import getenv
+
+TRACE_STAGES = getenv("TRACE_STAGES", "") == "1"
+TRACE_BUFFER_SIZE = int(getenv("TRACE_BUFFER_SIZE", 10_000))
+TRACE_DUMP_PATH = getenv("TRACE_DUMP_PATH")
+
+logger = logging.getLogger(__name__)
+
+
+class StageTracer:
+    """Меряет время стадий цикла опроса и хранит последние замеры.
+
+    Пока трассировка выключена, обёртки стадий сводятся к одной проверке
+    флага. Замеры копятся в кольцевом буфере и выгружаются сводкой и
+    стеками в формате flamegraph.pl (folded stacks).
+    """
+
+    def __init__(
+        self, enabled: bool = TRACE_STAGES, size: int = TRACE_BUFFER_SIZE
+    ) -> None:
+        """Создаёт трассировщик с буфером на size замеров."""
+        self.enabled = enabled
+        self.records = deque(maxlen=size)
+        self._local = threading.local()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Меряет стену и процессорное время блока кода."""
+        if not self.enabled:
+            yield
+            return
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        frame = [name, 0.0]
+        stack.append(frame)
+        wall_started = time.perf_counter()
+        cpu_started = time.thread_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_started
+            cpu = time.thread_time() - cpu_started
+            path = ";".join(item[0] for item in stack)
+            stack.pop()
+            if stack:
+                stack[-1][1] += wall
+            self.records.append((path, wall, wall - frame[1], cpu))
+
+    def trace(self, name: Optional[str] = None) -> Callable:
+        """Декоратор, который оборачивает функцию в stage."""
+        def decorator(func: Callable) -> Callable:
+            stage_name = name or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with self.stage(stage_name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def summary(self) -> Dict[str, dict]:
+        """Сводит замеры по стадиям: количество, сумма, среднее, максимум."""
+        result = {}
+        for path, wall, _, cpu in list(self.records):
+            stats = result.setdefault(path, {
+                "count": 0, "wall_total": 0.0, "wall_max": 0.0,
+                "cpu_total": 0.0,
+            })
+            stats["count"] += 1
+            stats["wall_total"] += wall
+            stats["wall_max"] = max(stats["wall_max"], wall)
+            stats["cpu_total"] += cpu
+        for stats in result.values():
+            stats["wall_avg"] = stats["wall_total"] / stats["count"]
+        return result
+
+    def folded(self) -> List[str]:
+        """Возвращает стеки с собственным временем в микросекундах."""
+        totals = {}
+        for path, _, self_wall, _ in list(self.records):
+            totals[path] = totals.get(path, 0.0) + self_wall
+        return [
+            f"{path} {int(seconds * 1_000_000)}"
+            for path, seconds in sorted(totals.items())
+        ]
+
+    def dump(self, path: Optional[str] = TRACE_DUMP_PATH) -> str:
+        """Пишет сводку в лог, а стеки — в файл, и возвращает его путь."""
+        import tempfile
+
+        path = path or os.path.join(
+            tempfile.gettempdir(), f"homework-trace-{os.getpid()}.folded"
+        )
+        for stage, stats in sorted(self.summary().items()):
+            logger.info(
+                "%s: %d раз, в среднем %.1f мс, максимум %.1f мс, "
+                "CPU %.1f мс",
+                stage,
+                stats["count"],
+                stats["wall_avg"] * 1000,
+                stats["wall_max"] * 1000,
+                stats["cpu_total"] * 1000,
+            )
+        with open(path, "w", encoding="utf-8") as file:
+            file.write("\n".join(self.folded()) + "\n")
+        logger.info("Стеки стадий записаны в %s", path)
+        return path
+
+    def handle_signal(self, signum: int, frame: object) -> None:
+        """Первый сигнал включает трассировку, следующие её выгружают."""
+        if not self.enabled:
+            self.enabled = True
+            logger.info("Трассировка стадий включена")
+            return
+        self.dump()
+
+
+TRACER = StageTracer()
+trace_stage = TRACER.trace
+
+
+def install_signal_handler(tracer: StageTracer = TRACER) -> None:
+    """Вешает выгрузку трассировки на SIGUSR1, если он есть в системе."""
+    if hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, tracer.handle_signal)